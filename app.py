@@ -1,10 +1,11 @@
 import os
+import re
 import cv2
 import numpy as np
-from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for, flash, send_from_directory
+from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for, flash, send_from_directory, Response, stream_with_context, session
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from werkzeug.utils import secure_filename
-from werkzeug.security import generate_password_hash
+from werkzeug.middleware.proxy_fix import ProxyFix
 import tensorflow as tf
 from tensorflow.keras.models import load_model
 import pickle
@@ -14,16 +15,30 @@ import threading
 import time
 import base64
 import json
-from datetime import datetime
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
 from bson.objectid import ObjectId
 
 # Import from new structure
 from config import config
 from utils.database import db
-from utils.user import User, get_user_sessions
+from utils.user import User, get_user_sessions, get_user_sessions_page, iter_user_sessions, decode_session_cursor
+from utils.user import SESSION_PAGE_SIZE, MAX_SESSION_PAGE_SIZE
 from utils.pose_utils import PoseUtils
-from services.tts_service import AdvancedIndianTTSSystem
-from utils.user import log_user_activity, get_user_activity_stats, get_user_streak
+from utils.pose_catalog import get_traditional_name, get_pose_names, get_activity_pose_name, get_pose_id
+from services.tts_service import AdvancedIndianTTSSystem, WELCOME_TEXT
+from services.tts_jobs import TTSJobService, TTSQueueFullError
+from services.audio_cache import AudioCache
+from services.audio_composer import get_template
+from utils.user import build_activity, insert_activities, get_user_activity_stats, get_user_streak
+from services.activity_buffer import ActivityWriteBuffer, ActivityBufferFullError
+from services.password_hasher import PasswordHasher, HashingBusyError
+from services.account_purge import AccountPurger
+from services.job_runner import JobRunner
+from utils.leaderboard import leaderboard
+from utils.analytics import analytics
+from utils.user_cache import user_cache
+from utils.export import iter_export_rows, stream_csv, stream_ndjson, gzip_chunks
 
 # Initialize Flask app with CORRECT paths
 app = Flask(__name__, 
@@ -35,6 +50,10 @@ app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 # Configuration
 app.config.from_object(config['development'])
 
+# Rate limits key on the client IP, so trust X-Forwarded-For from the configured proxies only
+if app.config['PROXY_FIX_HOPS']:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_HOPS'], x_proto=app.config['PROXY_FIX_HOPS'])
+
 # Initialize extensions
 db.init_app(app)
 
@@ -55,6 +74,34 @@ gemini_model = genai.GenerativeModel('gemini-2.5-flash')
 
 # Initialize TTS system
 tts_system = AdvancedIndianTTSSystem()
+tts_jobs = TTSJobService(tts_system, max_workers=app.config['TTS_WORKERS'], max_pending=app.config['TTS_MAX_PENDING'])
+activity_buffer = ActivityWriteBuffer(
+    flush_size=app.config['ACTIVITY_FLUSH_SIZE'],
+    flush_interval=app.config['ACTIVITY_FLUSH_SECONDS'],
+    max_pending=app.config['ACTIVITY_BUFFER_MAX'],
+    enqueue_timeout=app.config['ACTIVITY_ENQUEUE_TIMEOUT']
+) if app.config['ACTIVITY_WRITE_BEHIND'] else None
+password_hasher = PasswordHasher(
+    max_workers=app.config['PASSWORD_HASH_WORKERS'],
+    max_pending=app.config['PASSWORD_HASH_MAX_PENDING'],
+    per_client_limit=app.config['PASSWORD_HASH_PER_CLIENT'],
+    admission_wait=app.config['PASSWORD_HASH_ADMISSION_WAIT']
+)
+job_runner = JobRunner(workers=app.config['JOB_WORKERS'], max_attempts=app.config['JOB_MAX_ATTEMPTS'])
+account_purger = AccountPurger(
+    job_runner,
+    batch_size=app.config['ACCOUNT_PURGE_BATCH'],
+    pause=app.config['ACCOUNT_PURGE_PAUSE'],
+    # The grace period only lets buffered activities land
+    grace_seconds=60 if app.config['ACTIVITY_WRITE_BEHIND'] else 0
+)
+if app.config['BACKGROUND_JOBS']:
+    leaderboard.schedule(job_runner)
+    analytics.schedule(job_runner)
+    job_runner.start()
+BUSY_MESSAGE = 'Too many sign-in requests right now. Please try again in a moment.'
+TTS_KEY_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+TTS_CLIP_MAX_AGE = 365 * 24 * 3600
 
 # Load asana data
 asana_data = None
@@ -101,203 +148,187 @@ def load_model_and_encoder():
         model = None
         le = None
 
-# Traditional Sanskrit pose names mapping
-traditional_names = {
-    "Akarna_Dhanurasana": "Akarna Dhanurasana",
-    "Bharadvajas_Twist_pose_or_Bharadvajasana_I_": "Bharadvajasana I",
-    "Boat_Pose_or_Paripurna_Navasana_": "Paripurna Navasana",
-    "Bound_Angle_Pose_or_Baddha_Konasana_": "Baddha Konasana",
-    "Bow_Pose_or_Dhanurasana_": "Dhanurasana",
-    "Bridge_Pose_or_Setu_Bandha_Sarvangasana_": "Setu Bandha Sarvangasana",
-    "Camel_Pose_or_Ustrasana_": "Ustrasana",
-    "Cat_Cow_Pose_or_Marjaryasana_": "Marjaryasana",
-    "Chair_Pose_or_Utkatasana_": "Utkatasana",
-    "Child_Pose_or_Balasana_": "Balasana",
-    "Cobra_Pose_or_Bhujangasana_": "Bhujangasana",
-    "Cockerel_Pose": "Kukkutasana",
-    "Corpse_Pose_or_Savasana_": "Savasana",
-    "Cow_Face_Pose_or_Gomukhasana_": "Gomukhasana",
-    "Crane_(Crow)_Pose_or_Bakasana_": "Bakasana",
-    "Dolphin_Plank_Pose_or_Makara_Adho_Mukha_Svanasana_": "Makara Adho Mukha Svanasana",
-    "Dolphin_Pose_or_Ardha_Pincha_Mayurasana_": "Ardha Pincha Mayurasana",
-    "Downward-Facing_Dog_pose_or_Adho_Mukha_Svanasana_": "Adho Mukha Svanasana",
-    "Eagle_Pose_or_Garudasana_": "Garudasana",
-    "Eight-Angle_Pose_or_Astavakrasana_": "Astavakrasana",
-    "Extended_Puppy_Pose_or_Uttana_Shishosana_": "Uttana Shishosana",
-    "Extended_Revolved_Side_Angle_Pose_or_Utthita_Parsvakonasana_": "Utthita Parsvakonasana",
-    "Extended_Revolved_Triangle_Pose_or_Utthita_Trikonasana_": "Utthita Trikonasana",
-    "Feathered_Peacock_Pose_or_Pincha_Mayurasana_": "Pincha Mayurasana",
-    "Firefly_Pose_or_Tittibhasana_": "Tittibhasana",
-    "Fish_Pose_or_Matsyasana_": "Matsyasana",
-    "Four-Limbed_Staff_Pose_or_Chaturanga_Dandasana_": "Chaturanga Dandasana",
-    "Frog_Pose_or_Bhekasana": "Bhekasana",
-    "Garland_Pose_or_Malasana_": "Malasana",
-    "Gate_Pose_or_Parighasana_": "Parighasana",
-    "Half_Lord_of_the_Fishes_Pose_or_Ardha_Matsyendrasana_": "Ardha Matsyendrasana",
-    "Half_Moon_Pose_or_Ardha_Chandrasana_": "Ardha Chandrasana",
-    "Handstand_pose_or_Adho_Mukha_Vrksasana_": "Adho Mukha Vrksasana",
-    "Happy_Baby_Pose_or_Ananda_Balasana_": "Ananda Balasana",
-    "Head-to-Knee_Forward_Bend_pose_or_Janu_Sirsasana_": "Janu Sirsasana",
-    "Heron_Pose_or_Krounchasana_": "Krounchasana",
-    "Intense_Side_Stretch_Pose_or_Parsvottanasana_": "Parsvottanasana",
-    "Legs-Up-the-Wall_Pose_or_Viparita_Karani_": "Viparita Karani",
-    "Locust_Pose_or_Salabhasana_": "Salabhasana",
-    "Lord_of_the_Dance_Pose_or_Natarajasana_": "Natarajasana",
-    "Low_Lunge_pose_or_Anjaneyasana_": "Anjaneyasana",
-    "Noose_Pose_or_Pasasana_": "Pasasana",
-    "Peacock_Pose_or_Mayurasana_": "Mayurasana",
-    "Pigeon_Pose_or_Kapotasana_": "Kapotasana",
-    "Plank_Pose_or_Kumbhakasana_": "Kumbhakasana",
-    "Plow_Pose_or_Halasana_": "Halasana",
-    "Pose_Dedicated_to_the_Sage_Koundinya_or_Eka_Pada_Koundinyanasana_I_and_II": "Eka Pada Koundinyanasana",
-    "Rajakapotasana": "Rajakapotasana",
-    "Reclining_Hand-to-Big-Toe_Pose_or_Supta_Padangusthasana_": "Supta Padangusthasana",
-    "Revolved_Head-to-Knee_Pose_or_Parivrtta_Janu_Sirsasana_": "Parivrtta Janu Sirsasana",
-    "Scale_Pose_or_Tolasana_": "Tolasana",
-    "Scorpion_pose_or_vrischikasana": "Vrischikasana",
-    "Seated_Forward_Bend_pose_or_Paschimottanasana_": "Paschimottanasana",
-    "Shoulder-Pressing_Pose_or_Bhujapidasana_": "Bhujapidasana",
-    "Side-Reclining_Leg_Lift_pose_or_Anantasana_": "Anantasana",
-    "Side_Crane_(Crow)_Pose_or_Parsva_Bakasana_": "Parsva Bakasana",
-    "Side_Plank_Pose_or_Vasisthasana_": "Vasisthasana",
-    "Sitting pose 1 (normal)": "Sukhasana",
-    "Split pose": "Hanumanasana",
-    "Staff_Pose_or_Dandasana_": "Dandasana",
-    "Standing_Forward_Bend_pose_or_Uttanasana_": "Uttanasana",
-    "Standing_Split_pose_or_Urdhva_Prasarita_Eka_Padasana_": "Urdhva Prasarita Eka Padasana",
-    "Standing_big_toe_hold_pose_or_Utthita_Padangusthasana": "Utthita Padangusthasana",
-    "Supported_Headstand_pose_or_Salamba_Sirsasana_": "Salamba Sirsasana",
-    "Supported_Shoulderstand_pose_or_Salamba_Sarvangasana_": "Salamba Sarvangasana",
-    "Supta_Baddha_Konasana_": "Supta Baddha Konasana",
-    "Supta_Virasana_Vajrasana": "Supta Virasana",
-    "Tortoise_Pose": "Kurmasana",
-    "Tree_Pose_or_Vrksasana_": "Vrksasana",
-    "Upward_Bow_(Wheel)_Pose_or_Urdhva_Dhanurasana_": "Urdhva Dhanurasana",
-    "Upward_Facing_Two-Foot_Staff_Pose_or_Dwi_Pada_Viparita_Dandasana_": "Dwi Pada Viparita Dandasana",
-    "Upward_Plank_Pose_or_Purvottanasana_": "Purvottanasana",
-    "Virasana_or_Vajrasana": "Vajrasana",
-    "Warrior_III_Pose_or_Virabhadrasana_III_": "Virabhadrasana III",
-    "Warrior_II_Pose_or_Virabhadrasana_II_": "Virabhadrasana II",
-    "Warrior_I_Pose_or_Virabhadrasana_I_": "Virabhadrasana I",
-    "Wide-Angle_Seated_Forward_Bend_pose_or_Upavistha_Konasana_": "Upavistha Konasana",
-    "Wide-Legged_Forward_Bend_pose_or_Prasarita_Padottanasana_": "Prasarita Padottanasana",
-    "Wild_Thing_pose_or_Camatkarasana_": "Camatkarasana",
-    "Wind_Relieving_pose_or_Pawanmuktasana": "Pawanmuktasana",
-    "Yogic_sleep_pose": "Yoga Nidra",
-    "viparita_virabhadrasana_or_reverse_warrior_pose": "Viparita Virabhadrasana"
+# Generated instruction bundles keyed by (pose_name, language), least recently used first
+instruction_cache = OrderedDict()
+instruction_cache_lock = threading.Lock()
+MAX_INSTRUCTION_CACHE = 512
+
+INSTRUCTION_LANGUAGE_NAMES = {
+    "en": "Indian English",
+    "hi": "Hindi",
+    "kn": "Kannada",
+    "ta": "Tamil",
+    "te": "Telugu",
+    "mr": "Marathi"
 }
 
+def get_cached_instructions(pose_name, language):
+    with instruction_cache_lock:
+        bundle = instruction_cache.get((pose_name, language))
+        if bundle:
+            instruction_cache.move_to_end((pose_name, language))
+        return bundle
+
+def cache_instructions(pose_name, language, bundle):
+    with instruction_cache_lock:
+        instruction_cache[(pose_name, language)] = bundle
+        instruction_cache.move_to_end((pose_name, language))
+        while len(instruction_cache) > MAX_INSTRUCTION_CACHE:
+            instruction_cache.popitem(last=False)
+
+def parse_instruction_request(pose_name, language):
+    """Accept only catalog poses, so clients can't drive Gemini calls or cache growth with arbitrary names"""
+    if get_pose_id(pose_name) is None:
+        return None
+    return pose_name, (language if language in INSTRUCTION_LANGUAGE_NAMES else 'en')
+
+FALLBACK_INSTRUCTIONS = """
+        - Arms extended overhead
+        - Legs hip-width apart
+        - Head neutral
+        - Engage core
+        - Breathe steadily
+        """
 
-def get_traditional_name(pose_name):
-    """Get traditional Sanskrit name for a pose"""
-    return traditional_names.get(pose_name, pose_name)
+def get_fallback_instructions_and_feedback(traditional_name):
+    """Static instructions used when Gemini is unavailable"""
+    fallback_feedback = f"Focus on your breathing and maintain steady alignment while performing {traditional_name}."
+    return FALLBACK_INSTRUCTIONS, fallback_feedback
 
-def get_pose_names(pose_name):
-    """Get both English and Sanskrit names for a pose"""
-    # Get Sanskrit name from mapping
-    sanskrit_name = traditional_names.get(pose_name, pose_name)
+def build_instruction_prompts(traditional_name, language="en"):
+    """Build the Gemini prompts for pose instructions and feedback"""
+    target_lang_name = INSTRUCTION_LANGUAGE_NAMES.get(language, "Indian English")
     
-    # Extract English name from the original pose_name
-    # Format: "English_Name_or_Sanskrit_Name_" or just "Sanskrit_Name"
-    english_name = pose_name.replace('_', ' ').strip()
+    instructions_prompt = f"""
+    Provide very brief, key-point instructions for the yoga pose: {traditional_name}
+    Language: {target_lang_name}
     
-    # If the pose name contains "or", split and get the English part
-    if '_or_' in pose_name:
-        parts = pose_name.split('_or_')
-        english_name = parts[0].replace('_', ' ').strip()
-    else:
-        # If no "or", use the cleaned up version
-        english_name = english_name.rstrip('_').strip()
+    Focus ONLY on the most essential elements:
+    - Arms position (up, down, extended, etc.)
+    - Legs position (straight, bent, apart, etc.) 
+    - Head position (neutral, looking up/down, etc.)
+    - Core engagement
+    - Breathing
     
-    return {
-        'sanskrit': sanskrit_name,
-        'english': english_name
-    }
+    Format as simple bullet points. Keep each point under 8 words.
+    Make it suitable for text-to-speech - clear and concise.
+    
+    Example format:
+    - Arms extended overhead
+    - Legs hip-width apart
+    - Head neutral
+    - Engage core
+    - Breathe steadily
+    """
+    
+    feedback_prompt = f"""
+    Provide a very brief feedback tip for the yoga pose: {traditional_name}
+    Language: {target_lang_name}
+    
+    Give ONE key tip focusing on the most common mistake or important alignment point.
+    Keep it under 15 words and make it encouraging.
+    
+    Example: "Keep your spine straight and shoulders relaxed"
+    """
+    return instructions_prompt, feedback_prompt
+
+def clean_instruction_texts(instructions_text, feedback_text):
+    """Strip section headers Gemini sometimes adds to its responses"""
+    if "INSTRUCTIONS:" in instructions_text:
+        instructions_text = instructions_text.split("INSTRUCTIONS:")[1].strip()
+    if "FEEDBACK:" in feedback_text:
+        feedback_text = feedback_text.split("FEEDBACK:")[1].strip()
+    return instructions_text, feedback_text
 
 def get_pose_instructions_and_feedback(pose_name, language="en"):
     """Get instructions and feedback for a yoga pose using Gemini API"""
+    traditional_name = get_traditional_name(pose_name)
+    
+    cached = get_cached_instructions(pose_name, language)
+    if cached:
+        return cached
+    
     try:
-        traditional_name = get_traditional_name(pose_name)
-        
         if not gemini_model:
-            fallback_instructions = f"""
-            - Arms extended overhead
-            - Legs hip-width apart
-            - Head neutral
-            - Engage core
-            - Breathe steadily
-            """
-            fallback_feedback = f"Focus on your breathing and maintain steady alignment while performing {traditional_name}."
-            return fallback_instructions, fallback_feedback
-        
-        language_names = {
-            "en": "Indian English",
-            "hi": "Hindi",
-            "kn": "Kannada", 
-            "ta": "Tamil",
-            "te": "Telugu",
-            "mr": "Marathi"
-        }
-        
-        target_lang_name = language_names.get(language, "Indian English")
-        
-        instructions_prompt = f"""
-        Provide very brief, key-point instructions for the yoga pose: {traditional_name}
-        Language: {target_lang_name}
-        
-        Focus ONLY on the most essential elements:
-        - Arms position (up, down, extended, etc.)
-        - Legs position (straight, bent, apart, etc.) 
-        - Head position (neutral, looking up/down, etc.)
-        - Core engagement
-        - Breathing
-        
-        Format as simple bullet points. Keep each point under 8 words.
-        Make it suitable for text-to-speech - clear and concise.
-        
-        Example format:
-        - Arms extended overhead
-        - Legs hip-width apart
-        - Head neutral
-        - Engage core
-        - Breathe steadily
-        """
-        
-        feedback_prompt = f"""
-        Provide a very brief feedback tip for the yoga pose: {traditional_name}
-        Language: {target_lang_name}
+            return get_fallback_instructions_and_feedback(traditional_name)
         
-        Give ONE key tip focusing on the most common mistake or important alignment point.
-        Keep it under 15 words and make it encouraging.
-        
-        Example: "Keep your spine straight and shoulders relaxed"
-        """
+        instructions_prompt, feedback_prompt = build_instruction_prompts(traditional_name, language)
         instructions_response = gemini_model.generate_content(instructions_prompt)
         feedback_response = gemini_model.generate_content(feedback_prompt)
         
-        instructions_text = instructions_response.text
-        feedback_text = feedback_response.text
+        bundle = clean_instruction_texts(instructions_response.text, feedback_response.text)
+        cache_instructions(pose_name, language, bundle)
+        return bundle
         
-        # Clean up the responses
-        if "INSTRUCTIONS:" in instructions_text:
-            instructions_text = instructions_text.split("INSTRUCTIONS:")[1].strip()
-        if "FEEDBACK:" in feedback_text:
-            feedback_text = feedback_text.split("FEEDBACK:")[1].strip()
-            
-        return instructions_text, feedback_text
-        
-          
     except Exception as e:
         print(f"Error getting Gemini response: {e}")
-        fallback_instructions = f"""
-        - Arms extended overhead
-        - Legs hip-width apart
-        - Head neutral
-        - Engage core
-        - Breathe steadily
-        """
-        fallback_feedback = f"Focus on your breathing and maintain steady alignment while performing {traditional_name}."
-        return fallback_instructions, fallback_feedback
+        return get_fallback_instructions_and_feedback(traditional_name)
+
+def format_sse(event, payload):
+    """Format a payload as a Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+def stream_pose_instructions_and_feedback(pose_name, language="en"):
+    """Yield SSE messages with instruction bullets as Gemini generates them.
+    
+    Cached bundles are sent as a single 'bundle' event. On a cache miss each
+    completed bullet line is sent as an 'instruction' event, followed by a
+    'feedback' event and a final 'done' event.
+    """
+    traditional_name = get_traditional_name(pose_name)
+    
+    cached = get_cached_instructions(pose_name, language)
+    if cached:
+        yield format_sse('bundle', {'instructions': cached[0], 'feedback': cached[1]})
+        return
+    
+    if not gemini_model:
+        instructions, feedback = get_fallback_instructions_and_feedback(traditional_name)
+        yield format_sse('bundle', {'instructions': instructions, 'feedback': feedback})
+        return
+    
+    instructions_prompt, feedback_prompt = build_instruction_prompts(traditional_name, language)
+    
+    # Generate the feedback tip alongside the streamed bullets
+    feedback_result = {}
+    def generate_feedback():
+        try:
+            feedback_result['text'] = gemini_model.generate_content(feedback_prompt).text
+        except Exception as e:
+            print(f"Error getting Gemini feedback: {e}")
+    feedback_thread = threading.Thread(target=generate_feedback, daemon=True)
+    feedback_thread.start()
+    
+    instructions_text = ""
+    pending = ""
+    try:
+        for chunk in gemini_model.generate_content(instructions_prompt, stream=True):
+            instructions_text += chunk.text
+            pending += chunk.text
+            # Only emit complete lines; the last piece may still be growing
+            *lines, pending = pending.split('\n')
+            for line in lines:
+                if line.strip():
+                    yield format_sse('instruction', {'text': line.strip()})
+        if pending.strip():
+            yield format_sse('instruction', {'text': pending.strip()})
+    except Exception as e:
+        print(f"Error streaming Gemini response: {e}")
+        instructions, feedback = get_fallback_instructions_and_feedback(traditional_name)
+        yield format_sse('bundle', {'instructions': instructions, 'feedback': feedback})
+        return
+    
+    feedback_thread.join()
+    if 'text' not in feedback_result:
+        _, feedback_result['text'] = get_fallback_instructions_and_feedback(traditional_name)
+        yield format_sse('feedback', {'text': feedback_result['text']})
+        yield format_sse('done', {})
+        return
+    
+    bundle = clean_instruction_texts(instructions_text, feedback_result['text'])
+    cache_instructions(pose_name, language, bundle)
+    yield format_sse('feedback', {'text': bundle[1]})
+    yield format_sse('done', {})
 
 # Flask-Login setup
 login_manager = LoginManager()
@@ -317,8 +348,8 @@ def index():
     user_info = None
     if current_user.is_authenticated:
         try:
-            # Get user data from database
-            user_doc = db.db.users.find_one({'_id': ObjectId(current_user.id)})
+            # The user loader already fetched the document for this request
+            user_doc = current_user.user_data
             if user_doc:
                 profile = user_doc.get('profile', {})
                 user_info = {
@@ -366,7 +397,12 @@ def register():
             return render_template('register.html')
         
         # Create new user
-        User.create_user(username, email, password)
+        try:
+            password_hash = password_hasher.hash(password, request.remote_addr)
+        except HashingBusyError:
+            flash(BUSY_MESSAGE, 'error')
+            return render_template('register.html'), 429
+        User.create_user(username, email, password, password_hash=password_hash)
         flash('Registration successful! Please login.', 'success')
         return redirect(url_for('login'))
     
@@ -397,7 +433,13 @@ def login():
         
         user = User.find_by_username(username)
         
-        if user and user.check_password(password):
+        try:
+            password_ok = user is not None and password_hasher.verify(user.password_hash, password, request.remote_addr)
+        except HashingBusyError:
+            flash(BUSY_MESSAGE, 'error')
+            return render_template('login.html'), 429
+        
+        if password_ok:
             login_user(user, remember=True)
             user.update_login_stats()
             
@@ -446,7 +488,7 @@ def forgot_password():
         
         try:
             # Update password
-            new_password_hash = generate_password_hash(new_password)
+            new_password_hash = password_hasher.hash(new_password, request.remote_addr)
             result = db.db.users.update_one(
                 {'_id': ObjectId(user.id)},
                 {'$set': {
@@ -454,6 +496,7 @@ def forgot_password():
                     'security.password_changed_at': datetime.utcnow()
                 }}
             )
+            user_cache.invalidate(user.id)
             
             if result.modified_count > 0:
                 flash('Password reset successfully! You can now login with your new password.', 'success')
@@ -461,6 +504,9 @@ def forgot_password():
             else:
                 flash('Failed to reset password. Please try again.', 'error')
                 
+        except HashingBusyError:
+            flash(BUSY_MESSAGE, 'error')
+            return render_template('forgot-password.html'), 429
         except Exception as e:
             print(f"Error resetting password: {e}")
             flash('An error occurred. Please try again.', 'error')
@@ -471,8 +517,8 @@ def forgot_password():
 @login_required
 def dashboard():
     try:
-        # Get complete user data from database including profile
-        user_doc = db.db.users.find_one({'_id': ObjectId(current_user.id)})
+        # Complete user data including profile, as loaded for this request
+        user_doc = current_user.user_data
         if user_doc:
             # Create a user object with all data
             user_data = {
@@ -493,8 +539,55 @@ def dashboard():
 @app.route('/api/user/progress')
 @login_required
 def user_progress():
-    user_sessions = get_user_sessions(current_user.id)
-    return jsonify(user_sessions)
+    """Get session history: the full list by default, {sessions, next_cursor} pages with ?limit= or
+    ?cursor=, or a stream of every session as NDJSON (?format=ndjson)"""
+    try:
+        cursor = request.args.get('cursor')
+        after = decode_session_cursor(cursor) if cursor else None
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    
+    if request.args.get('format') == 'ndjson':
+        user_id = current_user.id
+        
+        def generate():
+            for session_data in iter_user_sessions(user_id, after):
+                yield json.dumps(session_data) + '\n'
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    
+    if cursor is None and 'limit' not in request.args:
+        # Existing clients expect a bare list of every session
+        return jsonify(get_user_sessions(current_user.id))
+    
+    limit = request.args.get('limit', SESSION_PAGE_SIZE, type=int)
+    limit = min(max(limit, 1), MAX_SESSION_PAGE_SIZE)
+    user_sessions, next_cursor = get_user_sessions_page(current_user.id, limit, after)
+    return jsonify({'sessions': user_sessions, 'next_cursor': next_cursor})
+
+EXPORT_FORMATS = {
+    'csv': (stream_csv, 'text/csv'),
+    'ndjson': (stream_ndjson, 'application/x-ndjson')
+}
+
+@app.route('/api/user/export')
+@login_required
+def export_practice_history():
+    """Stream the user's full practice history as CSV or NDJSON (?format=), gzipped when accepted"""
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': 'Format must be csv or ndjson'}), 400
+    
+    render, mimetype = EXPORT_FORMATS[export_format]
+    chunks = render(iter_export_rows(current_user.id))
+    headers = {
+        'Content-Disposition': f'attachment; filename=practice-history.{export_format}',
+        'Vary': 'Accept-Encoding'
+    }
+    if request.accept_encodings['gzip']:
+        chunks = gzip_chunks(chunks)
+        headers['Content-Encoding'] = 'gzip'
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
 
 @app.route('/logout')
 @login_required
@@ -575,13 +668,36 @@ def get_instructions():
     
     if not pose_name:
         return jsonify({'error': 'No pose name provided'})
+    parsed = parse_instruction_request(pose_name, language)
+    if not parsed:
+        return jsonify({'error': 'Unknown pose'}), 400
     
-    instructions, feedback = get_pose_instructions_and_feedback(pose_name, language)
+    instructions, feedback = get_pose_instructions_and_feedback(*parsed)
     
     return jsonify({
         'instructions': instructions,
         'feedback': feedback
     })
+
+@app.route('/get_instructions/stream')
+@login_required
+def get_instructions_stream():
+    """Stream instructions and feedback for a pose as Server-Sent Events"""
+    pose_name = request.args.get('pose_name', '')
+    language = request.args.get('language', 'en')
+    
+    if not pose_name:
+        return jsonify({'error': 'No pose name provided'}), 400
+    parsed = parse_instruction_request(pose_name, language)
+    if not parsed:
+        return jsonify({'error': 'Unknown pose'}), 400
+    
+    return Response(
+        stream_with_context(stream_pose_instructions_and_feedback(*parsed)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 #actual webcam application request handling
 @app.route('/webcam')
 @login_required
@@ -589,6 +705,45 @@ def webcam():
     """Webcam pose detection page"""
     return render_template('webcam.html')
 
+def get_tts_clip_url(key):
+    """Build the immutable URL of a cached clip"""
+    path = tts_system.get_clip_path(key)
+    if not path:
+        return None
+    ext = os.path.splitext(path)[1].lstrip('.')
+    return url_for('serve_tts_clip', key=key, ext=ext)
+
+def tts_job_response(job, status_code=200):
+    """Serialize a TTS job, adding the clip URL once synthesis is done"""
+    payload = dict(job)
+    payload['success'] = job['status'] not in ('failed', 'cancelled')
+    payload['status_url'] = url_for('get_tts_job', job_id=job['job_id'])
+    if job['clip_key']:
+        payload['audio_url'] = get_tts_clip_url(job['clip_key'])
+    return jsonify(payload), status_code
+
+def enqueue_tts_job(kind, text, language, template=None):
+    """Queue synthesis for the current user and return 202 with the job"""
+    # Pre-rendered clips need no synthesis at all
+    bundled = None if template else tts_system.get_bundled_clip(text, language)
+    if bundled:
+        return jsonify({
+            'success': True,
+            'kind': kind,
+            'status': 'done',
+            'audio_url': url_for('serve_bundled_tts_clip', filename=bundled)
+        })
+    
+    try:
+        job = tts_jobs.submit(current_user.id, kind, text, language, template=template)
+    except TTSQueueFullError:
+        return jsonify({'success': False, 'message': 'TTS is busy, please retry'}), 503
+    return tts_job_response(job, 202)
+
+def get_tts_language(data):
+    """Language from the request, falling back to the user's session choice"""
+    return data.get('language') or session.get('tts_language', 'en')
+
 @app.route('/speak_feedback', methods=['POST'])
 @login_required
 def speak_feedback():
@@ -597,11 +752,15 @@ def speak_feedback():
         data = request.get_json()
         pose_name = data.get('pose_name', '')
         feedback = data.get('feedback', '')
-        language = data.get('language', 'en')
+        language = get_tts_language(data)
         
         if not pose_name:
             return jsonify({'success': False, 'message': 'No pose name provided'})
         
+        # Without server playback, queue a clip for the browser instead
+        if not tts_system.server_playback:
+            return enqueue_tts_job('pose', pose_name, language)
+        
         # Use TTS system to speak
         success = tts_system.speak_pose_feedback(pose_name, feedback, language)
         
@@ -620,7 +779,11 @@ def speak_welcome():
     """Speak welcome message using TTS"""
     try:
         data = request.get_json()
-        language = data.get('language', 'en')
+        language = get_tts_language(data)
+        
+        # Without server playback, queue a clip for the browser instead
+        if not tts_system.server_playback:
+            return enqueue_tts_job('welcome', WELCOME_TEXT, language)
         
         # Use TTS system to speak welcome
         success = tts_system.speak_welcome(language)
@@ -634,17 +797,95 @@ def speak_welcome():
         print(f"Error in speak_welcome: {e}")
         return jsonify({'success': False, 'message': str(e)})
 
+@app.route('/api/tts/pose', methods=['POST'])
+@login_required
+def get_pose_audio():
+    """Queue synthesis of a pose name clip, optionally inside a feedback template"""
+    try:
+        data = request.get_json()
+        pose_name = data.get('pose_name', '')
+        template = data.get('template')
+        language = get_tts_language(data)
+        
+        if not pose_name:
+            return jsonify({'success': False, 'message': 'No pose name provided'}), 400
+        
+        if template:
+            try:
+                get_template(template, language)
+            except ValueError as e:
+                return jsonify({'success': False, 'message': str(e)}), 400
+            return enqueue_tts_job('pose', pose_name, language, template=template)
+        
+        return enqueue_tts_job('pose', pose_name, language)
+        
+    except Exception as e:
+        print(f"Error in get_pose_audio: {e}")
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@app.route('/api/tts/welcome', methods=['POST'])
+@login_required
+def get_welcome_audio():
+    """Queue synthesis of the welcome message clip"""
+    try:
+        data = request.get_json()
+        language = get_tts_language(data)
+        
+        return enqueue_tts_job('welcome', WELCOME_TEXT, language)
+        
+    except Exception as e:
+        print(f"Error in get_welcome_audio: {e}")
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@app.route('/api/tts/jobs/<job_id>', methods=['GET', 'DELETE'])
+@login_required
+def get_tts_job(job_id):
+    """Get the status of a TTS job, or cancel it"""
+    if request.method == 'DELETE':
+        job = tts_jobs.cancel(job_id, current_user.id)
+    else:
+        job = tts_jobs.get(job_id, current_user.id)
+    
+    if not job:
+        return jsonify({'success': False, 'message': 'Job not found'}), 404
+    return tts_job_response(job)
+
+@app.route('/tts/<key>.<ext>')
+def serve_tts_clip(key, ext):
+    """Serve a synthesized clip by its content hash"""
+    if not TTS_KEY_PATTERN.match(key):
+        return jsonify({'error': 'Invalid clip id'}), 404
+    
+    path = tts_system.get_clip_path(key)
+    if not path or not path.endswith(f'.{ext}'):
+        return jsonify({'error': 'Clip not found'}), 404
+    
+    # Clips are content-addressed, so they never change once published.
+    # conditional=True adds Range and If-None-Match handling.
+    response = send_file(path, mimetype=AudioCache.mimetype_for(path), conditional=True, etag=key, max_age=TTS_CLIP_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+@app.route('/tts/bundle/<path:filename>')
+def serve_bundled_tts_clip(filename):
+    """Serve a pre-rendered clip from the audio bundle"""
+    # Bundle file names contain a content hash, so they are immutable too
+    response = send_from_directory(tts_system.audio_bundle.bundle_dir, filename, conditional=True, max_age=TTS_CLIP_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
 @app.route('/set_language', methods=['POST'])
 @login_required
 def set_tts_language():
-    """Set TTS language"""
+    """Set TTS language for the current user's session"""
     try:
         data = request.get_json()
         language = data.get('language', 'en')
         
-        success = tts_system.set_language(language)
-        
-        if success:
+        if language in tts_system.get_available_languages():
+            session['tts_language'] = language
             return jsonify({'success': True, 'message': f'Language set to {language}'})
         else:
             return jsonify({'success': False, 'message': 'Invalid language'})
@@ -653,6 +894,45 @@ def set_tts_language():
         print(f"Error in set_language: {e}")
         return jsonify({'success': False, 'message': str(e)})
 
+@app.route('/api/tts/stats')
+@login_required
+def get_tts_stats():
+    """Get synthesized-audio cache, translation memory and job queue metrics"""
+    return jsonify({
+        'cache': tts_system.get_cache_stats(),
+        'translations': tts_system.get_translation_stats(),
+        'jobs': tts_jobs.get_stats()
+    })
+
+@app.route('/api/auth/stats')
+@login_required
+def get_auth_stats():
+    """Get password hashing pool load and latency"""
+    return jsonify(password_hasher.get_stats())
+
+@app.route('/api/jobs/stats')
+@login_required
+def get_job_stats():
+    """Get background job queue depth, outcomes and latency"""
+    return jsonify(job_runner.get_stats())
+
+@app.route('/api/jobs/<job_id>')
+@login_required
+def get_job(job_id):
+    """Get the status of one of the current user's background jobs"""
+    job = job_runner.get(job_id)
+    if not job or job.get('user_id') != current_user.id:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.route('/api/activity/stats')
+@login_required
+def get_activity_buffer_stats():
+    """Get write-behind buffer depth and flush latency"""
+    if activity_buffer is None:
+        return jsonify({'write_behind': False})
+    return jsonify(activity_buffer.get_stats())
+
 @app.route('/api/current_user')
 @login_required
 def get_current_user():
@@ -708,32 +988,114 @@ def log_activity():
         confidence = data.get('confidence', 0)
         duration = data.get('duration_seconds', 0)
         session_id = data.get('session_id')
+        record_id = data.get('record_id')
         
         if not pose_name:
             return jsonify({'error': 'Pose name required'}), 400
+        if record_id is not None and not is_valid_record_id(record_id):
+            return jsonify({'error': 'Invalid record id'}), 400
         
-        # Log the activity
-        activity_id = log_user_activity(
+        activity = build_activity(
             current_user.id, 
             pose_name, 
             confidence,
             session_id=session_id,
-            duration_seconds=duration
+            duration_seconds=duration,
+            record_id=record_id
         )
-        
-        if activity_id:
-            return jsonify({
-                'success': True,
-                'activity_id': activity_id,
-                'message': 'Activity logged successfully'
-            })
+        if activity_buffer is not None:
+            # Queue the activity; the write-behind buffer stores it in batches
+            activity_id = activity_buffer.add(activity)
         else:
-            return jsonify({'error': 'Failed to log activity'}), 500
+            # No buffer on serverless hosts: store it before answering
+            activity['_id'] = ObjectId()
+            inserted, duplicates = insert_activities([activity])
+            if not inserted and not duplicates:
+                return jsonify({'error': 'Failed to log activity'}), 500
+            activity_id = str(activity['_id'])
+        
+        return jsonify({
+            'success': True,
+            'activity_id': activity_id,
+            'message': 'Activity logged successfully'
+        })
             
+    except ActivityBufferFullError:
+        response = jsonify({'error': 'Activity logging is busy, please retry'})
+        response.headers['Retry-After'] = '2'
+        return response, 503
     except Exception as e:
         print(f"Error logging activity: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+# Client-generated record ids (UUIDs or similar)
+RECORD_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{8,64}$')
+MAX_ACTIVITY_BATCH = 100
+# Oldest client timestamp accepted for a queued record
+MAX_RECORD_AGE = timedelta(days=1)
+
+def is_valid_record_id(record_id):
+    return isinstance(record_id, str) and bool(RECORD_ID_PATTERN.match(record_id))
+
+def parse_performed_at(value):
+    """Use the client's completion time (epoch ms) when plausible, otherwise now"""
+    now = datetime.now(timezone.utc)
+    if not isinstance(value, (int, float)):
+        return now
+    try:
+        performed_at = datetime.fromtimestamp(value / 1000, timezone.utc)
+    except (OverflowError, OSError, ValueError):
+        return now
+    if now - MAX_RECORD_AGE <= performed_at <= now + timedelta(minutes=1):
+        return performed_at
+    return now
+
+@app.route('/api/log_activity/batch', methods=['POST'])
+@login_required
+def log_activity_batch():
+    """Log several completed asanas in one bulk write, idempotent on record_id"""
+    try:
+        # sendBeacon may not set a JSON content type
+        data = request.get_json(force=True, silent=True) or {}
+        records = data.get('records')
+        
+        if not isinstance(records, list) or not records:
+            return jsonify({'error': 'Records required'}), 400
+        if len(records) > MAX_ACTIVITY_BATCH:
+            return jsonify({'error': f'At most {MAX_ACTIVITY_BATCH} records per batch'}), 413
+        
+        activities = []
+        invalid = []
+        for index, record in enumerate(records):
+            if (not isinstance(record, dict) or not record.get('pose_name')
+                    or not is_valid_record_id(record.get('record_id'))
+                    or not isinstance(record.get('duration_seconds', 0), (int, float))):
+                invalid.append(index)
+                continue
+            try:
+                activities.append(build_activity(
+                    current_user.id,
+                    record['pose_name'],
+                    record.get('confidence', 0),
+                    session_id=record.get('session_id') or data.get('session_id'),
+                    duration_seconds=record.get('duration_seconds', 0),
+                    record_id=record['record_id'],
+                    timestamp=parse_performed_at(record.get('performed_at'))
+                ))
+            except (TypeError, ValueError):
+                invalid.append(index)
+        
+        inserted, duplicates = insert_activities(activities) if activities else (0, 0)
+        return jsonify({
+            'success': True,
+            'inserted': inserted,
+            'duplicates': duplicates,
+            'invalid': invalid
+        })
+    except Exception as e:
+        print(f"Error logging activity batch: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
 @app.route('/api/user/stats')
 @login_required
 def get_user_stats():
@@ -751,53 +1113,50 @@ def get_user_stats():
         print(f"Error getting user stats: {e}")
         return jsonify({'error': 'Failed to get user stats'}), 500
 
+@app.route('/api/analytics/poses')
+@login_required
+def get_pose_analytics():
+    """Get the most practiced poses with their average hold time across all users"""
+    try:
+        days = request.args.get('days', 30, type=int)
+        return jsonify({
+            'poses': analytics.get_pose_summary(days),
+            'processed_through': analytics.get_processed_through()
+        })
+    except Exception as e:
+        print(f"Error getting pose analytics: {e}")
+        return jsonify({'error': 'Failed to get pose analytics'}), 500
+
+@app.route('/api/analytics/daily')
+@login_required
+def get_daily_analytics():
+    """Get activities and active users per day across all users"""
+    try:
+        days = request.args.get('days', 30, type=int)
+        return jsonify({
+            'days': analytics.get_daily_activity(days),
+            'processed_through': analytics.get_processed_through()
+        })
+    except Exception as e:
+        print(f"Error getting daily analytics: {e}")
+        return jsonify({'error': 'Failed to get daily analytics'}), 500
+
 @app.route('/api/leaderboard')
 @login_required
 def get_leaderboard():
     """Get global leaderboard ranked by total asanas (all-time)"""
     try:
-        print(f"Getting leaderboard for user: {current_user.id}")
-        
         # Check if database connection exists
         if db.db is None:
             print("Database connection is None!")
             return jsonify({'error': 'Database not connected'}), 500
         
-        # Get all users who have activities
-        users_with_activities = db.db.user_activities.distinct('user_id')
-        print(f"Users with activities: {len(users_with_activities)}")
-        
-        if not users_with_activities:
-            return jsonify([])
-        
-        leaderboard = []
-        
-        # For each user, count their total activities (same logic as dashboard stats)
-        for user_id in users_with_activities:
-            # Count total asanas for this user (all-time)
-            total_asanas = db.db.user_activities.count_documents({
-                'user_id': user_id
-            })
-            
-            # Get user info
-            user = db.db.users.find_one({'_id': user_id})
-            if user:
-                leaderboard.append({
-                    'user_id': str(user_id),
-                    'username': user['username'],
-                    'total_asanas': total_asanas,
-                    'is_current_user': str(user_id) == current_user.id
-                })
-                print(f"User {user['username']}: {total_asanas} asanas")
-        
-        # Sort by total asanas descending (highest first)
-        leaderboard.sort(key=lambda x: x['total_asanas'], reverse=True)
-        
-        # Limit to top 20
-        leaderboard = leaderboard[:20]
-        
-        print(f"Final leaderboard: {len(leaderboard)} users")
-        return jsonify(leaderboard)
+        # Served from the periodically refreshed, materialized ranking
+        top = leaderboard.get_top()
+        return jsonify([
+            dict(entry, is_current_user=entry['user_id'] == current_user.id)
+            for entry in top
+        ])
         
     except Exception as e:
         print(f"Error getting leaderboard: {e}")
@@ -805,6 +1164,19 @@ def get_leaderboard():
         traceback.print_exc()
         return jsonify({'error': f'Failed to get leaderboard: {str(e)}'}), 500
 
+@app.route('/api/leaderboard/me')
+@login_required
+def get_my_leaderboard_rank():
+    """Get the current user's global rank"""
+    try:
+        rank = leaderboard.get_user_rank(current_user.id)
+        if not rank:
+            return jsonify({'rank': None, 'total_asanas': 0})
+        return jsonify(rank)
+    except Exception as e:
+        print(f"Error getting leaderboard rank: {e}")
+        return jsonify({'error': 'Failed to get leaderboard rank'}), 500
+
 @app.route('/api/debug/activities')
 @login_required
 def debug_activities():
@@ -838,6 +1210,8 @@ def debug_activities():
         for activity in sample_activities:
             activity['_id'] = str(activity['_id'])
             activity['user_id'] = str(activity['user_id'])
+            activity['session_id'] = str(activity['session_id'])
+            activity['pose_name'] = get_activity_pose_name(activity)
         
         return jsonify({
             'database_status': 'connected',
@@ -874,7 +1248,7 @@ def user_profile():
     if request.method == 'GET':
         try:
             # Get current user data
-            user_doc = db.db.users.find_one({'_id': ObjectId(current_user.id)})
+            user_doc = current_user.user_data
             if not user_doc:
                 return jsonify({'error': 'User not found'}), 404
             
@@ -919,6 +1293,7 @@ def user_profile():
                 {'_id': ObjectId(current_user.id)},
                 {'$set': update_data}
             )
+            user_cache.invalidate(current_user.id)
             
             if result.modified_count > 0:
                 return jsonify({'success': True, 'message': 'Profile updated successfully'})
@@ -942,6 +1317,11 @@ def account_settings():
     """Account settings page"""
     return render_template('account-settings.html', user=current_user)
 
+def verify_current_password(password):
+    """Check the signed-in user's password against the stored document, never a cached copy"""
+    user = User.find_by_id(current_user.id, fresh=True)
+    return user is not None and password_hasher.verify(user.password_hash, password, request.remote_addr)
+
 @app.route('/api/user/username', methods=['PUT'])
 @login_required
 def change_username():
@@ -955,8 +1335,7 @@ def change_username():
             return jsonify({'error': 'Username and password are required'}), 400
         
         # Verify current password
-        user = User.find_by_id(current_user.id)
-        if not user or not user.check_password(password):
+        if not verify_current_password(password):
             return jsonify({'error': 'Current password is incorrect'}), 401
         
         # Check if username already exists
@@ -968,12 +1347,15 @@ def change_username():
             {'_id': ObjectId(current_user.id)},
             {'$set': {'username': new_username}}
         )
+        user_cache.invalidate(current_user.id)
         
         if result.modified_count > 0:
             return jsonify({'success': True, 'message': 'Username updated successfully'})
         else:
             return jsonify({'error': 'Failed to update username'}), 500
             
+    except HashingBusyError:
+        return jsonify({'error': BUSY_MESSAGE}), 429
     except Exception as e:
         print(f"Error changing username: {e}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -994,12 +1376,11 @@ def change_password():
             return jsonify({'error': 'New password must be at least 6 characters'}), 400
         
         # Verify current password
-        user = User.find_by_id(current_user.id)
-        if not user or not user.check_password(current_password):
+        if not verify_current_password(current_password):
             return jsonify({'error': 'Current password is incorrect'}), 401
         
         # Update password
-        new_password_hash = generate_password_hash(new_password)
+        new_password_hash = password_hasher.hash(new_password, request.remote_addr)
         result = db.db.users.update_one(
             {'_id': ObjectId(current_user.id)},
             {'$set': {
@@ -1007,12 +1388,15 @@ def change_password():
                 'security.password_changed_at': datetime.utcnow()
             }}
         )
+        user_cache.invalidate(current_user.id)
         
         if result.modified_count > 0:
             return jsonify({'success': True, 'message': 'Password updated successfully'})
         else:
             return jsonify({'error': 'Failed to update password'}), 500
             
+    except HashingBusyError:
+        return jsonify({'error': BUSY_MESSAGE}), 429
     except Exception as e:
         print(f"Error changing password: {e}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -1024,17 +1408,15 @@ def delete_account():
     try:
         user_id = current_user.id
         
-        # Delete user activities
-        db.db.user_activities.delete_many({'user_id': ObjectId(user_id)})
-        
-        # Delete user sessions
-        db.db.sessions.delete_many({'user_id': ObjectId(user_id)})
-        
-        # Delete user account
-        result = db.db.users.delete_one({'_id': ObjectId(user_id)})
+        # Record the purge job first, so a closed account never loses track of its data
+        job_id = account_purger.request(user_id)
         
-        if result.deleted_count > 0:
+        if User.mark_deleted(user_id):
             logout_user()
+            if not app.config['BACKGROUND_JOBS']:
+                # No worker threads here; if the instance stops midway, the job's lease runs out
+                # and `python -m scripts.jobs work` finishes it
+                job_runner.run_now(job_id)
             return jsonify({'success': True, 'message': 'Account deleted successfully'})
         else:
             return jsonify({'error': 'Failed to delete account'}), 500
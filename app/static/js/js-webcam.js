@@ -19,6 +19,14 @@ let sessionStartTime = null;
 let detectedPoses = new Map(); // Track poses and their durations
 let loggedPosesInSession = []; // Track all logged poses with timestamps for debugging
 
+// Completed poses waiting to be uploaded in one batch
+let pendingActivityRecords = [];
+let activityFlushTimer = null;
+let activityFlushInFlight = false;
+const ACTIVITY_FLUSH_INTERVAL_MS = 10000; // Upload queued poses at least every 10 seconds
+const ACTIVITY_FLUSH_SIZE = 10; // ...or as soon as this many are waiting
+const MAX_ACTIVITY_BATCH = 100; // Server limit per request
+
 const CAPTURE_MS = 1500; // Reduced to 1.5 seconds for faster detection
 const POSE_CONFIRMATION_TIME = 1500; // Reduced to 1.5 seconds for faster voice feedback
 const MIN_CONFIDENCE_FOR_LOGGING = 0.85; // Only log poses with 85%+ confidence
@@ -1244,14 +1252,14 @@ function stopCamera() {
 
 
 
-async function getInstructionsAndFeedback(poseName) {
+async function getInstructionsAndFeedback(poseName, language = 'en') {
     try {
         const response = await fetch('/get_instructions', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ 
                 pose_name: poseName,
-                language: 'en'
+                language: language
             })
         });
         
@@ -1268,6 +1276,65 @@ async function getInstructionsAndFeedback(poseName) {
     }
 }
 
+// Stream instructions over SSE so bullets render as Gemini generates them.
+// Falls back to the JSON endpoint if EventSource is unavailable or fails early.
+function streamInstructionsAndFeedback(poseName, language = 'en') {
+    if (typeof EventSource === 'undefined') {
+        return getInstructionsAndFeedback(poseName, language).then(data => {
+            if (data) updateInstructions(data.instructions);
+            return data;
+        });
+    }
+    
+    return new Promise(resolve => {
+        const params = new URLSearchParams({ pose_name: poseName, language: language });
+        const source = new EventSource(`/get_instructions/stream?${params}`);
+        const lines = [];
+        let feedback = '';
+        let receivedAny = false;
+        
+        const finish = () => {
+            source.close();
+            resolve({ instructions: lines.join('\n'), feedback: feedback });
+        };
+        
+        source.addEventListener('bundle', event => {
+            const data = JSON.parse(event.data);
+            updateInstructions(data.instructions);
+            source.close();
+            resolve({ instructions: data.instructions, feedback: data.feedback });
+        });
+        
+        source.addEventListener('instruction', event => {
+            const data = JSON.parse(event.data);
+            if (!receivedAny) {
+                instructionsList.innerHTML = '';
+                receivedAny = true;
+            }
+            lines.push(data.text);
+            updateInstructions(lines.join('\n'));
+        });
+        
+        source.addEventListener('feedback', event => {
+            feedback = JSON.parse(event.data).text;
+        });
+        
+        source.addEventListener('done', finish);
+        
+        source.onerror = () => {
+            source.close();
+            if (receivedAny) {
+                resolve({ instructions: lines.join('\n'), feedback: feedback });
+                return;
+            }
+            getInstructionsAndFeedback(poseName, language).then(data => {
+                if (data) updateInstructions(data.instructions);
+                resolve(data);
+            });
+        };
+    });
+}
+
 async function getPoseBenefits(poseName) {
     try {
         console.log('Fetching benefits via Gemini for pose:', poseName);
@@ -1410,7 +1477,40 @@ function formatAsBulletPoints(items) {
     return items.map(item => `• ${item}`).join('\n');
 }
 
-// Voice feedback functions - Using Google TTS (server-side)
+// Voice feedback functions - Google TTS clips synthesized on the server, played in the browser
+let currentAudio = null;
+
+function playAudioClip(audioUrl, onFinished = null) {
+    if (currentAudio) {
+        currentAudio.pause();
+    }
+    
+    // Clips are served from immutable URLs, so repeats come from the browser cache
+    currentAudio = new Audio(audioUrl);
+    if (onFinished) {
+        currentAudio.addEventListener('ended', onFinished);
+        currentAudio.addEventListener('error', onFinished);
+    }
+    return currentAudio.play();
+}
+
+// TTS endpoints queue synthesis and return a job; poll it until the clip is ready
+async function waitForAudioUrl(job, timeoutMs = 10000) {
+    const deadline = Date.now() + timeoutMs;
+    while (!job.audio_url) {
+        if (!job.success || Date.now() > deadline) {
+            return null;
+        }
+        await new Promise(resolve => setTimeout(resolve, 200));
+        const response = await fetch(job.status_url);
+        if (!response.ok) {
+            return null;
+        }
+        job = await response.json();
+    }
+    return job.audio_url;
+}
+
 async function speakPoseName(poseName, language = 'en') {
     if (isSpeaking || poseName === lastSpokenPose) {
         return; // Don't speak if already speaking or same pose
@@ -1423,15 +1523,13 @@ async function speakPoseName(poseName, language = 'en') {
         const traditionalName = getTraditionalName(poseName);
         console.log(`🎤 Speaking pose via Google TTS: ${traditionalName} in ${language}`);
         
-        // Call server-side TTS endpoint
-        const response = await fetch('/speak_feedback', {
+        const response = await fetch('/api/tts/pose', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
             },
             body: JSON.stringify({
                 pose_name: traditionalName,
-                feedback: '',  // Empty feedback, only speak pose name
                 language: language
             })
         });
@@ -1441,20 +1539,18 @@ async function speakPoseName(poseName, language = 'en') {
         }
         
         const data = await response.json();
+        const audioUrl = await waitForAudioUrl(data);
         
-        if (data.success) {
+        if (audioUrl) {
+            await playAudioClip(audioUrl, () => {
+                isSpeaking = false;
+            });
             console.log('✅ Pose name spoken via Google TTS');
         } else {
             console.error('❌ TTS failed:', data.message);
             isSpeaking = false;
         }
         
-        // Reset speaking flag after estimated audio duration
-        // Google TTS typically takes 1-3 seconds for pose names
-        setTimeout(() => {
-            isSpeaking = false;
-        }, 3000);
-        
     } catch (error) {
         console.error('❌ Error calling TTS endpoint:', error);
         isSpeaking = false;
@@ -1469,8 +1565,7 @@ async function speakWelcomeMessage(language = 'en') {
     try {
         console.log(`🎤 Speaking welcome message via Google TTS in ${language}`);
         
-        // Call server-side TTS welcome endpoint
-        const response = await fetch('/speak_welcome', {
+        const response = await fetch('/api/tts/welcome', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -1485,8 +1580,10 @@ async function speakWelcomeMessage(language = 'en') {
         }
         
         const data = await response.json();
+        const audioUrl = await waitForAudioUrl(data);
         
-        if (data.success) {
+        if (audioUrl) {
+            await playAudioClip(audioUrl);
             console.log('✅ Welcome message spoken via Google TTS');
         } else {
             console.error('❌ Welcome TTS failed:', data.message);
@@ -1794,11 +1891,8 @@ async function captureAndPredict() {
                     if (data.pose !== lastAnnouncedPose) {
                         lastAnnouncedPose = data.pose;
                         
-                        // Get instructions and feedback in parallel for speed
-                        const instructionsData = await getInstructionsAndFeedback(data.pose);
-                        if (instructionsData) {
-                            updateInstructions(instructionsData.instructions);
-                        }
+                        // Stream instructions so the first bullets show up without waiting for the full response
+                        await streamInstructionsAndFeedback(data.pose, currentLanguage);
                         
                         // Reset timer for next pose
                         poseStartTime = Date.now();
@@ -1943,6 +2037,7 @@ stopBtn.addEventListener('click', async () => {
         await logFinalPoseOnSessionEnd();
         
         await saveSessionData();
+        await flushActivityRecords();
         sessionActive = false;
         console.log('✅ Session ended and saved');
     } else {
@@ -2176,20 +2271,12 @@ async function logCurrentPoseBeforeExit() {
             meetsMinimumDuration: true
         };
         
-        // Use synchronous approach for beforeunload (async may not complete)
-        // Send beacon API for reliable delivery during page unload
-        const payload = {
-            pose_name: poseData.name,
-            confidence: poseData.averageConfidence,
-            duration_seconds: poseData.duration,
-            session_id: sessionId,
-            timestamp: new Date().toISOString()
-        };
+        // Queue the final pose with everything not yet uploaded and send it all
+        // with sendBeacon, which survives page unload (async fetch may not complete)
+        queueActivityRecord(poseData);
         
         try {
-            // Use sendBeacon for reliable delivery during unload
-            const blob = new Blob([JSON.stringify(payload)], { type: 'application/json' });
-            const sent = navigator.sendBeacon('/api/log_activity', blob);
+            const sent = flushActivityRecords({ useBeacon: true });
             
             if (sent) {
                 console.log(`✅ Final pose logged via beacon: ${poseData.name} (${duration}s, ${Math.round(averageConfidence * 100)}%)`);
@@ -2275,7 +2362,7 @@ window.printSessionSummary = function() {
  *   - duration: Hold duration in seconds (number)
  *   - averageConfidence: Average confidence during hold (0-1)
  *   - meetsMinimumDuration: Boolean indicating if pose meets 2s minimum
- * @returns {Promise<string|null>} Activity ID if logged, null if skipped
+ * @returns {Promise<string|null>} Record ID if queued for upload, null if skipped
  */
 async function logPoseToDatabase(poseData) {
     // Validate session is active
@@ -2312,23 +2399,17 @@ async function logPoseToDatabase(poseData) {
         return null;
     }
     
-    // Format payload with pose name, average confidence, duration, session_id
-    const payload = {
-        pose_name: poseData.name,
-        confidence: poseData.averageConfidence,  // Average confidence over the hold
-        duration_seconds: poseData.duration,      // Total hold duration
-        session_id: sessionId,
-        timestamp: new Date().toISOString()
-    };
-    
     const confidencePercent = Math.round(poseData.averageConfidence * 100);
     
+    // Queue the record; it is uploaded with the next batch
+    const record = queueActivityRecord(poseData);
+    
     console.log(`\n💾 ========== LOGGING TO DATABASE ==========`);
     console.log(`   Pose: ${poseData.name}`);
     console.log(`   Duration: ${poseData.duration}s`);
     console.log(`   Average Confidence: ${confidencePercent}%`);
     console.log(`   Session ID: ${sessionId}`);
-    console.log(`   Timestamp: ${payload.timestamp}`);
+    console.log(`   Record ID: ${record.record_id}`);
     
     // Track this logging attempt
     loggedPosesInSession.push({
@@ -2337,46 +2418,120 @@ async function logPoseToDatabase(poseData) {
         confidence: confidencePercent,
         timestamp: new Date().toISOString()
     });
+    poseDetectionCount++;
     
     console.log(`   Total logged this session: ${loggedPosesInSession.length}`);
+    console.log(`   Waiting for upload: ${pendingActivityRecords.length}`);
     console.log(`==========================================\n`);
     
-    // Implement async logging with error handling
+    // Update showActivityIndicator() to show duration in notification
+    showActivityIndicator(poseData.name, poseData.averageConfidence, poseData.duration);
+    
+    return record.record_id;
+}
+
+/**
+ * Generate a unique id for an activity record
+ * The server ignores records it has already stored, so retries are safe
+ * @returns {string} Record ID
+ */
+function generateRecordId() {
+    if (window.crypto && crypto.randomUUID) {
+        return crypto.randomUUID();
+    }
+    return 'rec_' + Date.now() + '_' + Math.random().toString(36).substr(2, 12);
+}
+
+/**
+ * Add a completed pose to the upload queue and schedule a flush
+ * @param {object} poseData - Pose data object (name, duration, averageConfidence)
+ * @returns {object} The queued record
+ */
+function queueActivityRecord(poseData) {
+    const record = {
+        record_id: generateRecordId(),
+        pose_name: poseData.name,
+        confidence: poseData.averageConfidence,  // Average confidence over the hold
+        duration_seconds: poseData.duration,      // Total hold duration
+        session_id: sessionId,
+        performed_at: Date.now()
+    };
+    pendingActivityRecords.push(record);
+    
+    if (pendingActivityRecords.length >= ACTIVITY_FLUSH_SIZE) {
+        flushActivityRecords();
+    } else if (!activityFlushTimer) {
+        activityFlushTimer = setTimeout(flushActivityRecords, ACTIVITY_FLUSH_INTERVAL_MS);
+    }
+    return record;
+}
+
+/**
+ * Upload queued pose records to /api/log_activity/batch
+ * Failed uploads are put back in the queue and retried with the same record ids.
+ * @param {object} options - useBeacon: send with navigator.sendBeacon (page unload)
+ * @returns {boolean|Promise<void>} With useBeacon, whether every beacon was queued
+ */
+function flushActivityRecords({ useBeacon = false } = {}) {
+    if (activityFlushTimer) {
+        clearTimeout(activityFlushTimer);
+        activityFlushTimer = null;
+    }
+    
+    if (useBeacon) {
+        let allSent = true;
+        while (pendingActivityRecords.length > 0) {
+            const records = pendingActivityRecords.splice(0, MAX_ACTIVITY_BATCH);
+            const blob = new Blob([JSON.stringify({ session_id: sessionId, records })], { type: 'application/json' });
+            if (!navigator.sendBeacon('/api/log_activity/batch', blob)) {
+                pendingActivityRecords.unshift(...records);
+                allSent = false;
+                break;
+            }
+        }
+        return allSent;
+    }
+    
+    return uploadActivityRecords();
+}
+
+async function uploadActivityRecords() {
+    if (activityFlushInFlight || pendingActivityRecords.length === 0) {
+        return;
+    }
+    
+    activityFlushInFlight = true;
+    const records = pendingActivityRecords.splice(0, MAX_ACTIVITY_BATCH);
+    
     try {
-        const response = await fetch('/api/log_activity', {
+        const response = await fetch('/api/log_activity/batch', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
             },
-            body: JSON.stringify(payload)
+            body: JSON.stringify({ session_id: sessionId, records }),
+            keepalive: true
         });
         
-        if (response.ok) {
-            const result = await response.json();
-            poseDetectionCount++;
-            
-            // Add success logging with pose details
-            console.log(`✅ DATABASE RESPONSE: SUCCESS`);
-            console.log(`   Activity ID: ${result.activity_id || result._id || 'unknown'}`);
-            console.log(`   Total logged: ${poseDetectionCount}`);
-            
-            // Update showActivityIndicator() to show duration in notification
-            showActivityIndicator(poseData.name, poseData.averageConfidence, poseData.duration);
-            
-            return result.activity_id || result._id || 'logged';
-        } else {
-            // Add failure logging with pose details
-            console.error(`❌ DATABASE RESPONSE: FAILED`);
-            console.error(`   HTTP Status: ${response.status}`);
-            
-            const errorText = await response.text();
-            console.error(`   Error details: ${errorText}`);
-            return null;
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}: ${await response.text()}`);
+        }
+        
+        const result = await response.json();
+        console.log(`✅ DATABASE RESPONSE: ${result.inserted} poses stored, ${result.duplicates} already stored`);
+        if (result.invalid && result.invalid.length > 0) {
+            console.warn(`⚠️ ${result.invalid.length} pose records were rejected as invalid`);
         }
     } catch (error) {
-        // Add failure logging with pose details
+        // Put the records back; the same record ids make the retry safe
+        pendingActivityRecords.unshift(...records);
         console.error(`❌ DATABASE ERROR: ${error.message}`);
-        return null;
+    } finally {
+        activityFlushInFlight = false;
+    }
+    
+    if (pendingActivityRecords.length > 0 && !activityFlushTimer) {
+        activityFlushTimer = setTimeout(flushActivityRecords, ACTIVITY_FLUSH_INTERVAL_MS);
     }
 }
 
@@ -2660,6 +2815,16 @@ window.addEventListener('beforeunload', async (event) => {
         
         // Note: We don't show a confirmation dialog as it would interrupt the user
         // The beacon API will handle sending the data reliably
+    } else if (pendingActivityRecords.length > 0) {
+        // Upload poses that are still waiting for the next batch
+        flushActivityRecords({ useBeacon: true });
+    }
+});
+
+// Mobile browsers may discard a hidden tab without firing beforeunload
+document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'hidden' && pendingActivityRecords.length > 0) {
+        flushActivityRecords({ useBeacon: true });
     }
 });
 
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 
 class Config:
@@ -12,6 +13,64 @@ class Config:
     # Security settings
     MAX_LOGIN_ATTEMPTS = 5
     LOCKOUT_TIME = 900
+    
+    # Apply pending schema/index migrations at boot instead of via scripts.migrate_db
+    AUTO_MIGRATE = os.environ.get('AUTO_MIGRATE', 'false').lower() == 'true'
+    
+    # Seconds between recomputations of the global leaderboard
+    LEADERBOARD_REFRESH_SECONDS = int(os.environ.get('LEADERBOARD_REFRESH_SECONDS') or 60)
+    # Serve stats, streaks and the leaderboard from user_daily_stats (run the backfill first)
+    STATS_FROM_ROLLUPS = os.environ.get('STATS_FROM_ROLLUPS', 'false').lower() == 'true'
+    # 'standard' or 'timeseries' (MongoDB time-series collection bucketed by user)
+    ACTIVITY_STORAGE = os.environ.get('ACTIVITY_STORAGE') or 'standard'
+    # Dedicated pool for password hashing, so login bursts can't starve inference
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS') or 2)
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING') or 16)
+    # Per client IP; a classroom behind one NAT shares it, so keep this well above one user
+    PASSWORD_HASH_PER_CLIENT = int(os.environ.get('PASSWORD_HASH_PER_CLIENT') or 8)
+    # Seconds a sign-in waits for a hashing slot before it is answered with 429
+    PASSWORD_HASH_ADMISSION_WAIT = float(os.environ.get('PASSWORD_HASH_ADMISSION_WAIT') or 2.0)
+    # Reverse proxies in front of the app; request.remote_addr is read past them. Only Vercel is
+    # assumed to have one: trusting X-Forwarded-For without a proxy lets clients pick their own IP
+    PROXY_FIX_HOPS = int(os.environ.get('PROXY_FIX_HOPS') or (1 if os.environ.get('VERCEL') else 0))
+    # Per-process cache of user documents for the login loader
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL') or 60)
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE') or 1024)
+    # Write-behind buffer for logged activities. Serverless hosts (Vercel sets VERCEL) freeze or
+    # recycle instances without running atexit, so there activities are written synchronously
+    ACTIVITY_WRITE_BEHIND = (os.environ.get('ACTIVITY_WRITE_BEHIND')
+                             or ('false' if os.environ.get('VERCEL') else 'true')).lower() == 'true'
+    ACTIVITY_FLUSH_SIZE = int(os.environ.get('ACTIVITY_FLUSH_SIZE') or 200)
+    ACTIVITY_FLUSH_SECONDS = float(os.environ.get('ACTIVITY_FLUSH_SECONDS') or 1.0)
+    ACTIVITY_BUFFER_MAX = int(os.environ.get('ACTIVITY_BUFFER_MAX') or 5000)
+    ACTIVITY_ENQUEUE_TIMEOUT = float(os.environ.get('ACTIVITY_ENQUEUE_TIMEOUT') or 2.0)
+    # Seconds between incremental analytics refreshes (utils/analytics.py)
+    ANALYTICS_REFRESH_SECONDS = int(os.environ.get('ANALYTICS_REFRESH_SECONDS') or 300)
+    # Durable background jobs (services/job_runner.py). Serverless hosts freeze idle instances, so there
+    # no worker threads start: account purges run inline and `python -m scripts.jobs work` runs the rest
+    BACKGROUND_JOBS = (os.environ.get('BACKGROUND_JOBS')
+                       or ('false' if os.environ.get('VERCEL') else 'true')).lower() == 'true'
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS') or 2)
+    JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS') or 5)
+    # Background purge of closed accounts: documents per delete and seconds between deletes
+    ACCOUNT_PURGE_BATCH = int(os.environ.get('ACCOUNT_PURGE_BATCH') or 500)
+    ACCOUNT_PURGE_PAUSE = float(os.environ.get('ACCOUNT_PURGE_PAUSE') or 0.2)
+    
+    # TTS audio cache settings; the default temp dir is the only writable place on serverless hosts
+    TTS_CACHE_DIR = os.environ.get('TTS_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'yoga-trainer', 'tts')
+    TTS_CACHE_MAX_BYTES = int(os.environ.get('TTS_CACHE_MAX_BYTES') or 200 * 1024 * 1024)
+    # Pre-rendered clips for catalog pose names and fixed prompts
+    TTS_BUNDLE_DIR = os.environ.get('TTS_BUNDLE_DIR') or 'app/static/audio'
+    # Persistent translation memory for non-English speech
+    TRANSLATION_MEMORY_PATH = (os.environ.get('TRANSLATION_MEMORY_PATH')
+                               or os.path.join(tempfile.gettempdir(), 'yoga-trainer', 'translations.sqlite3'))
+    # Play speech through the server's speakers instead of sending clips to the browser
+    TTS_SERVER_PLAYBACK = os.environ.get('TTS_SERVER_PLAYBACK', 'false').lower() == 'true'
+    # Synthesis engine per language, e.g. 'en:espeak,hi:gtts'; others use gTTS
+    TTS_ENGINES = os.environ.get('TTS_ENGINES') or 'en:gtts,hi:gtts'
+    # Background synthesis pool
+    TTS_WORKERS = int(os.environ.get('TTS_WORKERS') or 4)
+    TTS_MAX_PENDING = int(os.environ.get('TTS_MAX_PENDING') or 64)
 
 class DevelopmentConfig(Config):
     DEBUG = True
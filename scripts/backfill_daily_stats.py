@@ -0,0 +1,86 @@
+"""Build user_daily_stats rollups from existing activity history.
+
+The app rolls up every activity it logs, and its first rollup write records
+`live_since` in the `meta` collection. Deploy the app before running this.
+This script replays only the activities inserted before that moment, one
+user at a time, so it never double counts live writes. Progress is saved
+after each user and a rerun resumes where the last one stopped.
+
+Usage (from the repository root):
+    python -m scripts.backfill_daily_stats [--batch-size 5000] [--mongodb-uri mongodb://localhost:27017/]
+
+Once it finishes, set STATS_FROM_ROLLUPS=true to serve reads from the rollups.
+"""
+import argparse
+import sys
+
+from bson.objectid import ObjectId
+from pymongo import MongoClient, ASCENDING
+
+from config import Config
+from utils.database import db
+from utils.daily_stats import RollupAccumulator
+
+def backfill_user(user_id, live_since, batch_size):
+    """Roll up one user's pre-rollup activities; returns the number replayed"""
+    activities = db.db.user_activities.find(
+        {'user_id': user_id, '_id': {'$lt': ObjectId.from_datetime(live_since)}},
+        {'user_id': 1, 'pose_id': 1, 'pose_name': 1, 'session_id': 1, 'duration_seconds': 1, 'timestamp': 1}
+    ).batch_size(batch_size)
+
+    # Accumulate the whole user first: one upsert per day, written after the scan
+    accumulator = RollupAccumulator()
+    count = 0
+    for activity in activities:
+        accumulator.add(activity)
+        count += 1
+
+    operations = accumulator.operations()
+    for start in range(0, len(operations), batch_size):
+        db.db.user_daily_stats.bulk_write(operations[start:start + batch_size], ordered=False)
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batch-size', type=int, default=5000, help='activities per cursor batch and upserts per bulk write')
+    parser.add_argument('--mongodb-uri', default=Config.MONGODB_URI)
+    args = parser.parse_args()
+
+    client = MongoClient(args.mongodb_uri)
+    db.client = client
+    db.db = client[Config.DATABASE_NAME]
+    db.create_indexes()
+
+    state = db.db.meta.find_one({'_id': 'daily_stats'})
+    if not state or not state.get('live_since'):
+        print("❌ The app has not written any rollups yet; deploy it and log an activity first")
+        sys.exit(1)
+    live_since = state['live_since']
+    if state.get('backfill_completed_at'):
+        print("✅ Backfill already completed")
+        return
+    query = {}
+    if state.get('backfilled_user_id'):
+        query['user_id'] = {'$gt': state['backfilled_user_id']}
+        print(f"⏩ Resuming after user {state['backfilled_user_id']}")
+
+    print(f"📦 Replaying activities inserted before {live_since.isoformat()}")
+    user_ids = db.db.user_activities.aggregate([
+        {'$match': {'_id': {'$lt': ObjectId.from_datetime(live_since)}, **query}},
+        {'$group': {'_id': '$user_id'}},
+        {'$sort': {'_id': ASCENDING}}
+    ], allowDiskUse=True)
+
+    users = activities = 0
+    for entry in user_ids:
+        activities += backfill_user(entry['_id'], live_since, args.batch_size)
+        db.db.meta.update_one({'_id': 'daily_stats'}, {'$set': {'backfilled_user_id': entry['_id']}})
+        users += 1
+        if users % 100 == 0:
+            print(f"   {users} users, {activities} activities")
+
+    db.db.meta.update_one({'_id': 'daily_stats'}, {'$currentDate': {'backfill_completed_at': True}})
+    print(f"✅ Backfilled {activities} activities for {users} users")
+
+if __name__ == '__main__':
+    main()
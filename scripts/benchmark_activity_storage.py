@@ -0,0 +1,62 @@
+"""Compare the standard and time-series layouts of user_activities.
+
+Seeds identical activity histories into two throwaway databases, one
+with a plain collection and one with a time-series collection, then
+times the dashboard stats and streak pipelines against each and reports
+storage and index sizes.
+
+Usage (from the repository root, with MongoDB 6.0+ running locally):
+    python -m scripts.benchmark_activity_storage [--sizes 10000 100000] [--runs 10] [--mongodb-uri mongodb://localhost:27017/]
+"""
+import argparse
+import random
+
+from pymongo import MongoClient
+
+from utils.database import db
+from utils.migrations import apply_migrations
+from utils import user as user_stats
+from scripts.benchmark_user_stats import seed_user, time_calls
+
+LAYOUTS = ('standard', 'timeseries')
+
+def use_layout(client, layout):
+    """Point the global database handle at the benchmark database for a layout"""
+    db.client = client
+    db.db = client[f'yoga-trainer-benchmark-{layout}']
+    db.activity_storage = layout
+
+def storage_size(collection):
+    stats = next(collection.aggregate([{'$collStats': {'storageStats': {}}}]))['storageStats']
+    return stats.get('storageSize', 0), stats.get('totalIndexSize', 0)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=int, default=[10000, 100000])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--mongodb-uri', default='mongodb://localhost:27017/')
+    parser.add_argument('--keep', action='store_true', help='keep the benchmark databases afterwards')
+    args = parser.parse_args()
+
+    client = MongoClient(args.mongodb_uri)
+    print(f"{'activities':>10} {'layout':<11} {'stats ms':>9} {'streak ms':>10} {'data MB':>8} {'index MB':>9}")
+    try:
+        for size in args.sizes:
+            for layout in LAYOUTS:
+                use_layout(client, layout)
+                client.drop_database(db.db.name)
+                apply_migrations(db)
+                random.seed(size)  # Same history in both layouts
+                user_id = seed_user(size)
+                stats_ms, _ = time_calls(user_stats.get_user_activity_stats, user_id, args.runs)
+                streak_ms, _ = time_calls(user_stats.get_user_streak, user_id, args.runs)
+                data_bytes, index_bytes = storage_size(db.db.user_activities)
+                print(f"{size:>10} {layout:<11} {stats_ms:>9.1f} {streak_ms:>10.1f} "
+                      f"{data_bytes / 2 ** 20:>8.1f} {index_bytes / 2 ** 20:>9.1f}")
+    finally:
+        if not args.keep:
+            for layout in LAYOUTS:
+                client.drop_database(f'yoga-trainer-benchmark-{layout}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Compare time-to-audio of the TTS engines for each language.
+
+Usage (from the repository root):
+    python -m scripts.benchmark_tts_engines --engines gtts espeak stub --languages en hi --runs 3
+"""
+import argparse
+import time
+
+from services.tts_engines import ENGINES
+from services.tts_service import WELCOME_TEXT
+from utils.metrics import LatencyTracker
+
+SAMPLE_UTTERANCES = [
+    "Vrksasana",
+    "Adho Mukha Svanasana",
+    "Utthita Parsvakonasana",
+    "Virabhadrasana II",
+    WELCOME_TEXT
+]
+
+def benchmark_engine(engine, language, runs):
+    """Synthesize every sample utterance `runs` times and collect latencies"""
+    tracker = LatencyTracker()
+    total_bytes = 0
+    errors = 0
+    for _ in range(runs):
+        for text in SAMPLE_UTTERANCES:
+            start = time.perf_counter()
+            try:
+                audio = engine.synthesize(text, language)
+            except Exception as e:
+                print(f"  {engine.name}/{language} failed on '{text}': {e}")
+                errors += 1
+                continue
+            tracker.record(time.perf_counter() - start)
+            total_bytes += len(audio)
+    summary = tracker.summary()
+    summary['avg_bytes'] = total_bytes // summary['count'] if summary['count'] else 0
+    summary['errors'] = errors
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--engines', nargs='+', default=list(ENGINES), choices=list(ENGINES))
+    parser.add_argument('--languages', nargs='+', default=['en', 'hi'])
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'engine':<8} {'lang':<5} {'n':>4} {'p50 ms':>9} {'p90 ms':>9} {'max ms':>9} {'avg KB':>8} {'errors':>6}")
+    for engine_name in args.engines:
+        engine = ENGINES[engine_name]()
+        if not engine.is_available():
+            print(f"{engine_name:<8} skipped: not available on this host")
+            continue
+        for language in args.languages:
+            if not engine.supports(language):
+                print(f"{engine_name:<8} {language:<5} skipped: language not supported")
+                continue
+            result = benchmark_engine(engine, language, args.runs)
+            print(f"{engine_name:<8} {language:<5} {result['count']:>4} {result['p50_ms']:>9} "
+                  f"{result['p90_ms']:>9} {result['max_ms']:>9} {result['avg_bytes'] / 1024:>8.1f} {result['errors']:>6}")
+
+if __name__ == '__main__':
+    main()
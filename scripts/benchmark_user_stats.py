@@ -0,0 +1,136 @@
+"""Benchmark dashboard statistics queries against a seeded local MongoDB.
+
+Seeds a throwaway database with one user per requested size, then times
+the original multi-query implementation of get_user_activity_stats
+against the current single-pass $facet aggregation.
+
+Usage (from the repository root, with MongoDB running locally):
+    python -m scripts.benchmark_user_stats [--sizes 10000 100000] [--runs 10] [--mongodb-uri mongodb://localhost:27017/]
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from bson.objectid import ObjectId
+from pymongo import MongoClient
+
+from utils.database import db
+from utils.migrations import apply_migrations
+from utils.pose_catalog import traditional_names
+from utils import user as user_stats
+from utils.user import build_activity
+
+BENCH_DATABASE_NAME = 'yoga-trainer-benchmark'
+
+def legacy_get_user_activity_stats(user_id, days=30):
+    """The original implementation: about 11 round trips per call"""
+    start_date = datetime.utcnow() - timedelta(days=days)
+    total_asanas = db.db.user_activities.count_documents({
+        'user_id': ObjectId(user_id),
+        'timestamp': {'$gte': start_date}
+    })
+    unique_asanas = db.db.user_activities.distinct('pose_name', {
+        'user_id': ObjectId(user_id),
+        'timestamp': {'$gte': start_date}
+    })
+    daily_activity = []
+    for i in range(7):
+        day = datetime.utcnow() - timedelta(days=i)
+        day_start = day.replace(hour=0, minute=0, second=0, microsecond=0)
+        day_end = day.replace(hour=23, minute=59, second=59, microsecond=999999)
+        daily_activity.append(db.db.user_activities.count_documents({
+            'user_id': ObjectId(user_id),
+            'timestamp': {'$gte': day_start, '$lte': day_end}
+        }))
+    top_asanas = list(db.db.user_activities.aggregate([
+        {'$match': {'user_id': ObjectId(user_id), 'timestamp': {'$gte': start_date}}},
+        {'$group': {'_id': '$pose_name', 'count': {'$sum': 1},
+                    'traditional_name': {'$first': '$traditional_name'},
+                    'last_practiced': {'$max': '$timestamp'}}},
+        {'$sort': {'count': -1}},
+        {'$limit': 5}
+    ]))
+    sessions = list(db.db.user_activities.aggregate([
+        {'$match': {'user_id': ObjectId(user_id), 'timestamp': {'$gte': start_date}}},
+        {'$group': {'_id': '$session_id', 'asanas_count': {'$sum': 1},
+                    'total_duration': {'$sum': '$duration_seconds'},
+                    'session_date': {'$first': '$timestamp'}}},
+        {'$sort': {'session_date': -1}},
+        {'$limit': 10}
+    ]))
+    return total_asanas, len(unique_asanas), daily_activity, top_asanas, sessions
+
+def seed_user(activity_count, days=60, batch_size=5000, compact=False):
+    """Insert activity_count activities spread over `days` days for a new user.
+    
+    Documents use the original layout unless `compact` is set.
+    """
+    user_id = ObjectId()
+    poses = list(traditional_names)
+    now = datetime.now(timezone.utc)
+    batch = []
+    for i in range(activity_count):
+        pose_name = random.choice(poses)
+        timestamp = now - timedelta(seconds=random.uniform(0, days * 86400))
+        if compact:
+            batch.append(build_activity(user_id, pose_name, random.uniform(0.85, 1.0),
+                                        session_id=f"session_{i // 20}",
+                                        duration_seconds=random.randint(5, 120),
+                                        timestamp=timestamp))
+        else:
+            batch.append({
+                'user_id': user_id,
+                'pose_name': pose_name,
+                'traditional_name': traditional_names[pose_name],
+                'confidence': random.uniform(0.85, 1.0),
+                'session_id': f"session_{i // 20}",
+                'duration_seconds': random.randint(5, 120),
+                'timestamp': timestamp
+            })
+        if len(batch) >= batch_size:
+            db.db.user_activities.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        db.db.user_activities.insert_many(batch, ordered=False)
+    return str(user_id)
+
+def time_calls(fn, user_id, runs):
+    fn(user_id)  # Warm up caches
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(user_id)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=int, default=[10000, 100000])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--mongodb-uri', default='mongodb://localhost:27017/')
+    parser.add_argument('--keep', action='store_true', help='keep the benchmark database afterwards')
+    args = parser.parse_args()
+
+    client = MongoClient(args.mongodb_uri)
+    client.drop_database(BENCH_DATABASE_NAME)
+    db.client = client
+    db.db = client[BENCH_DATABASE_NAME]
+    apply_migrations(db)
+
+    print(f"{'activities':>10} {'implementation':<16} {'median ms':>10} {'max ms':>10}")
+    try:
+        for size in args.sizes:
+            print(f"Seeding {size} activities...")
+            user_id = seed_user(size)
+            for name, fn in (('legacy', legacy_get_user_activity_stats),
+                             ('facet', user_stats.get_user_activity_stats)):
+                median_ms, max_ms = time_calls(fn, user_id, args.runs)
+                print(f"{size:>10} {name:<16} {median_ms:>10.1f} {max_ms:>10.1f}")
+    finally:
+        if not args.keep:
+            client.drop_database(BENCH_DATABASE_NAME)
+
+if __name__ == '__main__':
+    main()
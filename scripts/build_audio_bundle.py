@@ -0,0 +1,116 @@
+"""Pre-render every catalog pose name and fixed prompt into an audio bundle.
+
+The bundle is a directory of clips plus a manifest.json that maps
+(utterance, language) to a file. At runtime the TTS system serves these
+clips directly, so the common utterances never need synthesis.
+
+Usage (from the repository root):
+    python -m scripts.build_audio_bundle [--languages en hi] [--output app/static/audio] [--force]
+"""
+import argparse
+import hashlib
+import json
+import os
+
+from config import Config
+from services.audio_bundle import AudioBundle
+from services.tts_service import AdvancedIndianTTSSystem, WELCOME_TEXT
+from utils.pose_catalog import get_catalog_utterances
+
+FIXED_PROMPTS = [WELCOME_TEXT]
+
+def load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, AudioBundle.MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'version': 1, 'clips': {}}
+
+def write_manifest(output_dir, manifest):
+    """Write the manifest atomically so the app never reads a partial file"""
+    path = os.path.join(output_dir, AudioBundle.MANIFEST_NAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def render_clip(tts, text, language, output_dir):
+    """Render one utterance and return its manifest entry"""
+    engine = tts.get_engine(language)
+    spoken_text = tts.prepare_text(text, language)
+    audio = engine.synthesize(spoken_text, language)
+
+    # Content-hashed names let the files be cached as immutable
+    digest = hashlib.sha256(audio).hexdigest()[:16]
+    filename = f"{language}/{digest}.{engine.audio_format}"
+    os.makedirs(os.path.join(output_dir, language), exist_ok=True)
+    with open(os.path.join(output_dir, filename), 'wb') as f:
+        f.write(audio)
+
+    return {
+        'file': filename,
+        'engine': engine.name,
+        'voice': engine.voice_id(language),
+        'spoken_text': spoken_text,
+        'bytes': len(audio)
+    }
+
+def prune_unreferenced(output_dir, manifest):
+    """Delete clips that are no longer referenced by the manifest"""
+    referenced = {clip['file'] for clips in manifest['clips'].values() for clip in clips.values()}
+    removed = 0
+    for language in manifest['clips']:
+        language_dir = os.path.join(output_dir, language)
+        if not os.path.isdir(language_dir):
+            continue
+        for filename in os.listdir(language_dir):
+            if f"{language}/{filename}" not in referenced:
+                os.unlink(os.path.join(language_dir, filename))
+                removed += 1
+    return removed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--languages', nargs='+', default=None,
+                        help='languages to render (default: all TTS languages)')
+    parser.add_argument('--output', default=Config.TTS_BUNDLE_DIR)
+    parser.add_argument('--force', action='store_true', help='re-render clips that are already bundled')
+    args = parser.parse_args()
+
+    tts = AdvancedIndianTTSSystem(server_playback=False)
+    languages = args.languages or tts.get_available_languages()
+    utterances = get_catalog_utterances() + FIXED_PROMPTS
+
+    os.makedirs(args.output, exist_ok=True)
+    manifest = load_manifest(args.output)
+    rendered = skipped = failed = 0
+
+    for language in languages:
+        engine = tts.get_engine(language)
+        clips = manifest['clips'].setdefault(language, {})
+        for text in utterances:
+            existing = clips.get(text)
+            if (not args.force and existing
+                    and existing.get('engine') == engine.name
+                    and existing.get('voice') == engine.voice_id(language)
+                    and os.path.exists(os.path.join(args.output, existing['file']))):
+                skipped += 1
+                continue
+            try:
+                clips[text] = render_clip(tts, text, language, args.output)
+                rendered += 1
+                print(f"🎵 {language}: {text} -> {clips[text]['file']}")
+            except Exception as e:
+                failed += 1
+                print(f"❌ {language}: {text}: {e}")
+
+        # Persist progress after each language so an interrupted build can resume
+        write_manifest(args.output, manifest)
+
+    removed = prune_unreferenced(args.output, manifest)
+    total_bytes = sum(clip['bytes'] for clips in manifest['clips'].values() for clip in clips.values())
+    print(f"✅ Audio bundle: {rendered} rendered, {skipped} up to date, {failed} failed, "
+          f"{removed} stale files removed, {total_bytes / 1024:.1f} KB total")
+
+if __name__ == '__main__':
+    main()
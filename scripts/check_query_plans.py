@@ -0,0 +1,142 @@
+"""Assert that the stats, streak and session queries use their intended plans.
+
+Seeds a throwaway database with compact activities and sessions, then
+runs explain() on the exact pipelines from utils/user.py:
+
+  - stats and streak must be covered by the activity_stats_covering
+    index (an index scan that examines no documents)
+  - session history must walk the (user_id, created_at, _id) index
+    without an in-memory sort
+
+Exits non-zero when a plan regresses. With --compare it also times the
+stats pipeline covered by that index against the same pipeline forced
+onto a plain (user_id, timestamp) index that has to fetch documents.
+
+Usage (from the repository root, with MongoDB running locally):
+    python -m scripts.check_query_plans [--activities 50000] [--compare --runs 10] [--mongodb-uri mongodb://localhost:27017/]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from bson.objectid import ObjectId
+from pymongo import MongoClient, ASCENDING, DESCENDING
+
+from utils.database import db, COVERING_INDEX_NAME
+from utils.migrations import apply_migrations
+from utils.user import build_activity_stats_pipeline, build_streak_pipeline, find_user_sessions
+from scripts.benchmark_user_stats import seed_user
+
+CHECK_DATABASE_NAME = 'yoga-trainer-plan-check'
+FETCHING_INDEX_NAME = 'user_id_1_timestamp_-1'
+
+def explain_aggregate(pipeline, hint=None):
+    command = {'aggregate': 'user_activities', 'pipeline': pipeline, 'cursor': {}}
+    if hint:
+        command['hint'] = hint
+    return db.db.command('explain', command, verbosity='executionStats')
+
+def find_values(node, key):
+    """Yield every value stored under `key` anywhere in an explain document"""
+    if isinstance(node, dict):
+        for name, value in node.items():
+            if name == key:
+                yield value
+            yield from find_values(value, key)
+    elif isinstance(node, list):
+        for item in node:
+            yield from find_values(item, key)
+
+def check_covered(name, plan):
+    """A covered plan scans the covering index and examines no documents"""
+    text = json.dumps(plan, default=str)
+    problems = []
+    if COVERING_INDEX_NAME not in text:
+        problems.append(f"does not use {COVERING_INDEX_NAME}")
+    if '"FETCH"' in text or 'COLLSCAN' in text:
+        problems.append("fetches documents")
+    if any(examined for examined in find_values(plan, 'totalDocsExamined')):
+        problems.append("examines documents")
+    return report(name, problems)
+
+def check_sessions(user_id):
+    plan = find_user_sessions(user_id).limit(50).explain()
+    text = json.dumps(plan, default=str)
+    problems = []
+    if 'IXSCAN' not in text:
+        problems.append("does not use an index")
+    if '"SORT"' in text:
+        problems.append("sorts in memory")
+    return report('session history', problems)
+
+def report(name, problems):
+    if problems:
+        print(f"❌ {name}: {', '.join(problems)}")
+        return False
+    print(f"✅ {name}")
+    return True
+
+def seed_sessions(user_id, count=500):
+    now = datetime.utcnow()
+    db.db.sessions.insert_many([{
+        'user_id': user_id,
+        'session_type': 'practice',
+        'progress': {},
+        'activity': {},
+        'created_at': now - timedelta(hours=i)
+    } for i in range(count)])
+
+def time_pipeline(pipeline, hint, runs):
+    list(db.db.user_activities.aggregate(pipeline, hint=hint))  # Warm up caches
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        list(db.db.user_activities.aggregate(pipeline, hint=hint))
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--activities', type=int, default=50000)
+    parser.add_argument('--compare', action='store_true', help='also time covered against fetching plans')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--mongodb-uri', default='mongodb://localhost:27017/')
+    args = parser.parse_args()
+
+    client = MongoClient(args.mongodb_uri)
+    client.drop_database(CHECK_DATABASE_NAME)
+    db.client = client
+    db.db = client[CHECK_DATABASE_NAME]
+    apply_migrations(db)
+
+    try:
+        print(f"Seeding {args.activities} activities...")
+        user_id = seed_user(args.activities, compact=True)
+        seed_sessions(ObjectId(user_id))
+
+        now = datetime.utcnow()
+        stats_pipeline = build_activity_stats_pipeline(user_id, now - timedelta(days=30), now - timedelta(days=7))
+        passed = all([
+            check_covered('activity stats', explain_aggregate(stats_pipeline)),
+            check_covered('streak', explain_aggregate(build_streak_pipeline(user_id))),
+            check_sessions(ObjectId(user_id)),
+        ])
+
+        if args.compare:
+            # The index the covering one replaced, for comparison only
+            db.db.user_activities.create_index([('user_id', ASCENDING), ('timestamp', DESCENDING)])
+            covered_ms = time_pipeline(stats_pipeline, COVERING_INDEX_NAME, args.runs)
+            fetching_ms = time_pipeline(stats_pipeline, FETCHING_INDEX_NAME, args.runs)
+            print(f"{'plan':<10} {'median ms':>10}")
+            print(f"{'covered':<10} {covered_ms:>10.1f}")
+            print(f"{'fetching':<10} {fetching_ms:>10.1f}")
+    finally:
+        client.drop_database(CHECK_DATABASE_NAME)
+
+    sys.exit(0 if passed else 1)
+
+if __name__ == '__main__':
+    main()
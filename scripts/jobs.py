@@ -0,0 +1,106 @@
+"""Inspect, retry and run background jobs.
+
+Jobs are stored in the `jobs` collection (account purges, leaderboard
+refreshes, ...) and run by services/job_runner.py, inside the app unless
+BACKGROUND_JOBS is off (the default on Vercel). There, run `work` on a
+long-lived host instead.
+
+Commands:
+    list     pending, running and failed jobs with their progress (the default)
+    show     one job in full
+    retry    queue a failed job again with a fresh set of attempts
+    work     run the job workers and recurring refreshes until interrupted
+
+Usage (from the repository root):
+    python -m scripts.jobs [list|show|retry|work] [job_id] [--kind purge_account] [--all] [--limit 50] [--mongodb-uri mongodb://localhost:27017/]
+"""
+import argparse
+import json
+import time
+from datetime import datetime
+
+from bson.objectid import ObjectId
+from pymongo import MongoClient, ASCENDING
+
+from config import Config
+from services.account_purge import AccountPurger
+from services.job_runner import JobRunner
+from utils.analytics import analytics
+from utils.database import db
+from utils.leaderboard import leaderboard
+
+def describe_progress(progress):
+    return ', '.join(f"{name} {count}" for name, count in progress.items()) or '-'
+
+def list_jobs(args):
+    query = {} if args.all else {'state': {'$in': ['pending', 'running', 'failed']}}
+    if args.kind:
+        query['kind'] = args.kind
+    jobs = list(db.db.jobs.find(query, {'payload': 0}).sort('created_at', ASCENDING).limit(args.limit))
+    if not jobs:
+        print("✅ No jobs queued")
+        return
+
+    now = datetime.utcnow()
+    for job in jobs:
+        state = job['state']
+        if state == 'running' and job.get('lease_until') and job['lease_until'] < now:
+            state = 'stalled'
+        print(f"{job['_id']}  {job['kind']:<20} {state:<8} attempts {job['attempts']}/{job['max_attempts']}  "
+              f"run at {job['run_at']:%Y-%m-%d %H:%M:%S}  {job.get('owner', '')}")
+        print(f"    progress: {describe_progress(job.get('progress', {}))}")
+        if job.get('error'):
+            print(f"    error:    {job['error']}")
+
+def work():
+    # Learn the activity storage layout the handlers read from
+    db.check_schema_version()
+    runner = JobRunner(workers=Config.JOB_WORKERS, max_attempts=Config.JOB_MAX_ATTEMPTS)
+    AccountPurger(runner, batch_size=Config.ACCOUNT_PURGE_BATCH, pause=Config.ACCOUNT_PURGE_PAUSE)
+    leaderboard.schedule(runner)
+    analytics.schedule(runner)
+    runner.start()
+    print(f"👷 Running {runner.workers} job workers; press Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        runner.close()
+        print("✅ Job workers stopped")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', nargs='?', default='list', choices=['list', 'show', 'retry', 'work'])
+    parser.add_argument('job_id', nargs='?')
+    parser.add_argument('--kind', help='only list jobs of this kind')
+    parser.add_argument('--all', action='store_true', help='include finished jobs')
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--mongodb-uri', default=Config.MONGODB_URI)
+    args = parser.parse_args()
+
+    client = MongoClient(args.mongodb_uri)
+    db.client = client
+    db.db = client[Config.DATABASE_NAME]
+
+    if args.command == 'list':
+        list_jobs(args)
+        return
+    if args.command == 'work':
+        work()
+        return
+    if not args.job_id:
+        parser.error(f"{args.command} needs a job id")
+
+    if args.command == 'show':
+        job = db.db.jobs.find_one({'_id': ObjectId(args.job_id)})
+        print(json.dumps(job, default=str, indent=2) if job else f"❌ No job {args.job_id}")
+    else:
+        result = db.db.jobs.update_one(
+            {'_id': ObjectId(args.job_id), 'state': 'failed'},
+            {'$set': {'state': 'pending', 'run_at': datetime.utcnow(), 'attempts': 0},
+             '$unset': {'error': '', 'finished_at': ''}}
+        )
+        print("✅ Job queued again" if result.modified_count else f"❌ No failed job {args.job_id}")
+
+if __name__ == '__main__':
+    main()
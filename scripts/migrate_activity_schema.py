@@ -0,0 +1,85 @@
+"""Rewrite legacy user_activities documents into the compact schema.
+
+Legacy documents store the pose label, a duplicated traditional_name and
+a string session id. Compact documents store the catalog pose_id and an
+ObjectId session id (see utils.user.build_activity). Poses outside the
+catalog keep their label. Documents are converted in _id order, in
+batches, and the last converted _id is checkpointed in the `meta`
+collection, so the command can be stopped and rerun at any time. The app
+reads both layouts, so it can stay online throughout.
+
+Usage (from the repository root):
+    python -m scripts.migrate_activity_schema [--batch-size 1000] [--pause 0.1] [--mongodb-uri mongodb://localhost:27017/]
+"""
+import argparse
+import time
+
+from pymongo import MongoClient, UpdateOne, ASCENDING
+
+from config import Config
+from utils.database import db
+from utils.pose_catalog import get_pose_id
+from utils.user import to_session_key
+
+CHECKPOINT_ID = 'activity_schema'
+
+def compact_update(activity):
+    """Return the update that converts one legacy document, or None if it is already compact"""
+    update = {'$set': {}, '$unset': {}}
+    if 'traditional_name' in activity:
+        update['$unset']['traditional_name'] = ''
+    if isinstance(activity.get('session_id'), str):
+        update['$set']['session_id'] = to_session_key(activity['session_id'])
+    pose_id = get_pose_id(activity.get('pose_name'))
+    if 'pose_name' in activity and pose_id is not None:
+        update['$set']['pose_id'] = pose_id
+        update['$unset']['pose_name'] = ''
+
+    update = {operator: fields for operator, fields in update.items() if fields}
+    return update or None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--pause', type=float, default=0.1, help='seconds to sleep between batches')
+    parser.add_argument('--mongodb-uri', default=Config.MONGODB_URI)
+    args = parser.parse_args()
+
+    client = MongoClient(args.mongodb_uri)
+    db.client = client
+    db.db = client[Config.DATABASE_NAME]
+
+    state = db.db.meta.find_one({'_id': CHECKPOINT_ID}) or {}
+    last_id = state.get('last_id')
+    if last_id:
+        print(f"⏩ Resuming after {last_id}")
+
+    scanned = converted = 0
+    while True:
+        query = {'_id': {'$gt': last_id}} if last_id else {}
+        batch = list(db.db.user_activities.find(
+            query,
+            {'pose_name': 1, 'traditional_name': 1, 'session_id': 1}
+        ).sort('_id', ASCENDING).limit(args.batch_size))
+        if not batch:
+            break
+
+        operations = []
+        for activity in batch:
+            update = compact_update(activity)
+            if update:
+                operations.append(UpdateOne({'_id': activity['_id']}, update))
+        if operations:
+            db.db.user_activities.bulk_write(operations, ordered=False)
+
+        last_id = batch[-1]['_id']
+        db.db.meta.update_one({'_id': CHECKPOINT_ID}, {'$set': {'last_id': last_id}}, upsert=True)
+        scanned += len(batch)
+        converted += len(operations)
+        print(f"   {scanned} scanned, {converted} converted")
+        time.sleep(args.pause)
+
+    print(f"✅ Migration complete: {converted} of {scanned} documents converted")
+
+if __name__ == '__main__':
+    main()
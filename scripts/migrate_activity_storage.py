@@ -0,0 +1,102 @@
+"""Move user_activities into a MongoDB time-series collection.
+
+Steps, each safe to rerun:
+  1. rename the plain collection to user_activities_legacy
+  2. create user_activities as a time-series collection (timeField
+     `timestamp`, metaField `user_id`) with its indexes
+  3. copy the legacy documents across in _id order, checkpointing the
+     last copied _id in the `meta` collection
+
+Stop the app for steps 1-2 (a few seconds), then restart it with
+ACTIVITY_STORAGE=timeseries while the copy runs. New activities land in the
+new collection straight away. Until the copy finishes, history reads are
+incomplete unless STATS_FROM_ROLLUPS=true, because the rollups are not
+affected. Time-series collections can't be renamed, so to roll back drop
+the new collection and rename user_activities_legacy back.
+
+Usage (from the repository root):
+    python -m scripts.migrate_activity_storage [--batch-size 5000] [--drop-legacy] [--mongodb-uri mongodb://localhost:27017/]
+"""
+import argparse
+
+from pymongo import MongoClient, ASCENDING
+
+from config import Config
+from utils.database import db
+
+LEGACY_NAME = 'user_activities_legacy'
+CHECKPOINT_ID = 'activity_storage'
+
+def collection_type(name):
+    info = next(db.db.list_collections(filter={'name': name}), None)
+    return info.get('type', 'collection') if info else None
+
+def copy_batch(batch):
+    """Insert a batch into the time-series collection, skipping documents an interrupted run already copied"""
+    timestamps = [activity['timestamp'] for activity in batch]
+    copied = {activity['_id'] for activity in db.db.user_activities.find(
+        {'_id': {'$in': [activity['_id'] for activity in batch]},
+         'timestamp': {'$gte': min(timestamps), '$lte': max(timestamps)}},
+        {'_id': 1}
+    )}
+    pending = [activity for activity in batch if activity['_id'] not in copied]
+    if pending:
+        db.db.user_activities.insert_many(pending, ordered=False)
+    return len(pending)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--drop-legacy', action='store_true', help='drop user_activities_legacy once the copy is complete')
+    parser.add_argument('--mongodb-uri', default=Config.MONGODB_URI)
+    args = parser.parse_args()
+
+    client = MongoClient(args.mongodb_uri)
+    db.client = client
+    db.db = client[Config.DATABASE_NAME]
+    db.activity_storage = 'timeseries'
+
+    current = collection_type('user_activities')
+    if current == 'collection':
+        if collection_type(LEGACY_NAME):
+            print(f"❌ Both user_activities and {LEGACY_NAME} are plain collections; "
+                  f"a writer recreated user_activities. Stop the app and merge them first.")
+            return
+        db.db.user_activities.rename(LEGACY_NAME)
+        print(f"✅ Renamed user_activities to {LEGACY_NAME}")
+        current = None
+    if current is None:
+        db.create_activity_collection()
+    db.create_indexes()
+    db.create_covering_indexes()
+
+    if not collection_type(LEGACY_NAME):
+        print("✅ Nothing to copy")
+        return
+
+    state = db.db.meta.find_one({'_id': CHECKPOINT_ID}) or {}
+    last_id = state.get('last_id')
+    if last_id:
+        print(f"⏩ Resuming after {last_id}")
+
+    legacy = db.db[LEGACY_NAME]
+    total = legacy.estimated_document_count()
+    copied = 0
+    while True:
+        query = {'_id': {'$gt': last_id}} if last_id else {}
+        batch = list(legacy.find(query).sort('_id', ASCENDING).limit(args.batch_size))
+        if not batch:
+            break
+        copied += copy_batch(batch)
+        last_id = batch[-1]['_id']
+        db.db.meta.update_one({'_id': CHECKPOINT_ID}, {'$set': {'last_id': last_id}}, upsert=True)
+        print(f"   {copied} of ~{total} copied")
+
+    print(f"✅ Copied {copied} activities into the time-series collection")
+    if args.drop_legacy:
+        legacy.drop()
+        db.db.meta.delete_one({'_id': CHECKPOINT_ID})
+        print(f"🗑️ Dropped {LEGACY_NAME}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Apply versioned schema and index migrations, or audit query plans.
+
+The app only checks the applied version at boot (see utils/migrations.py);
+this command is what actually creates collections and indexes.
+
+Commands:
+    status   show the applied and expected schema versions
+    apply    apply every pending migration (the default)
+    audit    explain() the app's hot queries, built by the app's own code, and exit
+             non-zero if any scans a whole collection, uses no index, or the
+             schema is behind
+
+Usage (from the repository root):
+    python -m scripts.migrate_db [status|apply|audit] [--mongodb-uri mongodb://localhost:27017/]
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta
+
+from bson.objectid import ObjectId
+from pymongo import MongoClient
+
+from config import Config
+from utils.database import db
+from utils.migrations import SCHEMA_VERSION, MIGRATIONS, get_schema_version, apply_migrations
+from utils.user import build_activity_stats_pipeline, build_streak_pipeline, find_user_sessions, SESSION_PAGE_SIZE
+
+# Stages that show a query was answered from an index
+INDEX_STAGES = ('IXSCAN', 'IDHACK', 'EXPRESS_IXSCAN', 'CLUSTERED_IXSCAN', 'EXPRESS_CLUSTERED_IXSCAN')
+
+def hot_queries(user_id, username):
+    """The per-request queries, built by the same code the app runs"""
+    now = datetime.utcnow()
+    stats_pipeline = build_activity_stats_pipeline(user_id, now - timedelta(days=30), now - timedelta(days=7))
+    return [
+        ('load_user', 'users', 'find', {'filter': {'_id': user_id}}),
+        ('login by username', 'users', 'find', {'filter': {'username': username}}),
+        ('activity stats', 'user_activities', 'aggregate', {'pipeline': stats_pipeline}),
+        ('streak days', 'user_activities', 'aggregate', {'pipeline': build_streak_pipeline(user_id)}),
+        ('record id dedupe', 'user_activities', 'find', {'filter': {'user_id': user_id, 'record_id': {'$in': ['x']}}}),
+        ('user sessions', 'sessions', 'cursor', {'cursor': find_user_sessions(user_id).limit(SESSION_PAGE_SIZE)}),
+        ('daily rollups', 'user_daily_stats', 'find', {'filter': {'user_id': user_id, 'date': {'$gte': '2000-01-01'}}}),
+        ('leaderboard top', 'leaderboard', 'find', {'filter': {}, 'sort': [('rank', 1)], 'limit': 20}),
+    ]
+
+def explain(collection_name, kind, spec):
+    """Return the queryPlanner output for a find, an aggregate or an open cursor"""
+    if kind == 'cursor':
+        return spec['cursor'].explain()
+    if kind == 'find':
+        command = {'find': collection_name, 'filter': spec['filter']}
+        if 'sort' in spec:
+            command['sort'] = dict(spec['sort'])
+        if 'limit' in spec:
+            command['limit'] = spec['limit']
+    else:
+        command = {'aggregate': collection_name, 'pipeline': spec['pipeline'], 'cursor': {}}
+    return db.db.command('explain', command, verbosity='queryPlanner')
+
+def audit():
+    """Explain every hot query; returns the number that scan a collection or use no index"""
+    version = get_schema_version(db)
+    problems = 0
+    if version < SCHEMA_VERSION:
+        problems += 1
+        print(f"❌ Schema version {version} of {SCHEMA_VERSION}: indexes from pending migrations are missing")
+
+    sample = db.db.users.find_one({}, {'username': 1}) or {'_id': ObjectId(), 'username': 'audit'}
+    for name, collection_name, kind, spec in hot_queries(sample['_id'], sample['username']):
+        plan = json.dumps(explain(collection_name, kind, spec), default=str)
+        if 'COLLSCAN' in plan:
+            problems += 1
+            print(f"❌ {name:<20} {collection_name}: collection scan")
+        elif not any(stage in plan for stage in INDEX_STAGES):
+            problems += 1
+            print(f"❌ {name:<20} {collection_name}: no index used (is it missing?)")
+        else:
+            print(f"✅ {name:<20} {collection_name}: uses an index")
+    if problems:
+        print(f"⚠️ {problems} problems found")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', nargs='?', default='apply', choices=['status', 'apply', 'audit'])
+    parser.add_argument('--mongodb-uri', default=Config.MONGODB_URI)
+    args = parser.parse_args()
+
+    client = MongoClient(args.mongodb_uri)
+    db.client = client
+    db.db = client[Config.DATABASE_NAME]
+
+    if args.command == 'status':
+        version = get_schema_version(db)
+        print(f"Schema version {version} of {SCHEMA_VERSION}")
+        for step, description, _ in MIGRATIONS:
+            print(f"  {'✅' if step <= version else '⏳'} {step}: {description}")
+    elif args.command == 'apply':
+        version = apply_migrations(db)
+        print(f"✅ Schema is at version {version}")
+    elif audit():
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
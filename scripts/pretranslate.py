@@ -0,0 +1,46 @@
+"""Fill the translation memory with every catalog string ahead of time.
+
+Translates all catalog pose names and fixed prompts into each target
+language, so the runtime never waits on Gemini for them. Strings that
+are already in the memory are skipped.
+
+Usage (from the repository root):
+    python -m scripts.pretranslate [--languages hi] [--workers 4]
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from services.tts_service import AdvancedIndianTTSSystem, WELCOME_TEXT, TRANSLATION_PROMPT_VERSION
+from utils.pose_catalog import get_catalog_utterances
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--languages', nargs='+', default=['hi'])
+    parser.add_argument('--workers', type=int, default=4, help='concurrent Gemini requests')
+    args = parser.parse_args()
+
+    tts = AdvancedIndianTTSSystem(server_playback=False)
+    if not tts.gemini_model:
+        print("❌ GEMINI_API_KEY is not set; nothing to translate with")
+        return
+
+    memory = tts.translation_memory
+    strings = get_catalog_utterances() + [WELCOME_TEXT]
+
+    for language in args.languages:
+        pending = [text for text in strings
+                   if memory.get(text, language, TRANSLATION_PROMPT_VERSION) is None]
+        print(f"🌍 {language}: {len(strings) - len(pending)} already translated, {len(pending)} to go")
+
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            list(executor.map(lambda text: tts.translate_with_gemini(text, language), pending))
+
+        missing = [text for text in pending
+                   if memory.get(text, language, TRANSLATION_PROMPT_VERSION) is None]
+        if missing:
+            print(f"⚠️ {language}: {len(missing)} strings failed, rerun to retry")
+
+    print(f"✅ Translation memory: {memory.get_stats()['entries']} entries")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+import time
+
+from bson.objectid import ObjectId
+
+from utils.analytics import analytics
+from utils.database import db
+
+# Per-user data removed when an account is closed, in purge order
+PURGE_COLLECTIONS = ['user_activities', 'user_daily_stats', 'analytics_daily_users', 'sessions', 'predictions',
+                     'login_attempts']
+PURGE_JOB = 'purge_account'
+
+
+class AccountPurger:
+    """Delete the data of closed accounts as background jobs.
+
+    Closing an account only marks the user document and queues a
+    `purge_account` job (see services/job_runner.py); the handler deletes
+    the data `batch_size` documents at a time with a `pause` between
+    batches, so a large history never holds a request or starves other
+    queries. Each batch is a job checkpoint: progress per collection is
+    recorded on the job, and deleting is idempotent, so a job interrupted by
+    a restart carries on with what is left.
+    """
+
+    def __init__(self, jobs, batch_size=500, pause=0.2, grace_seconds=60):
+        self.jobs = jobs
+        self.batch_size = batch_size
+        self.pause = pause
+        # Lets activities already sitting in the write-behind buffer land before they are purged
+        self.grace_seconds = grace_seconds
+        jobs.register(PURGE_JOB, self.purge)
+
+    def request(self, user_id):
+        """Queue the purge of a closed account and return the job id"""
+        return self.jobs.enqueue(
+            PURGE_JOB, {'user_id': user_id},
+            dedupe_key=f'{PURGE_JOB}:{user_id}', priority=-1, delay=self.grace_seconds, user_id=user_id
+        )
+
+    def _delete_batch(self, collection_name, user_id):
+        """Delete up to one batch of a user's documents and return how many went"""
+        collection = db.db[collection_name]
+        if collection_name == 'user_activities' and db.activities_are_timeseries:
+            # Time-series deletes can only filter on the metaField, and they drop whole buckets
+            return collection.delete_many({'user_id': user_id}).deleted_count
+        ids = [doc['_id'] for doc in collection.find({'user_id': user_id}, {'_id': 1}).limit(self.batch_size)]
+        if not ids:
+            return 0
+        return collection.delete_many({'_id': {'$in': ids}}).deleted_count
+
+    def purge(self, job):
+        """Job handler: delete everything a closed account left behind"""
+        user_id = ObjectId(job.payload['user_id'])
+        user_doc = db.db.users.find_one({'_id': user_id}, {'status.deleted_at': 1})
+        if user_doc and not user_doc.get('status', {}).get('deleted_at'):
+            # The account was never closed (the request failed after queueing the job)
+            print(f"⚠️ Skipping purge of {user_id}: account is still open")
+            return {'cancelled': True}
+
+        print(f"🗑️ Purging data for closed account {user_id}")
+        # Active user counts on these days drop once the user's rows are gone; other totals are
+        # kept as anonymous historical aggregates
+        active_days = db.db.analytics_daily_users.distinct('date', {'user_id': user_id})
+        for collection_name in PURGE_COLLECTIONS:
+            while True:
+                deleted = self._delete_batch(collection_name, user_id)
+                if not deleted:
+                    break
+                job.checkpoint(**{collection_name: deleted})
+                time.sleep(self.pause)
+
+        analytics.recount_active_users(active_days)
+        db.db.leaderboard.delete_one({'_id': user_id})
+        db.db.users.delete_one({'_id': user_id, 'status.deleted_at': {'$exists': True}})
+        print(f"✅ Purged closed account {user_id}")
+        return {'cancelled': False}
@@ -0,0 +1,170 @@
+import atexit
+import queue
+import threading
+import time
+
+from bson.objectid import ObjectId
+from pymongo.errors import BulkWriteError
+
+from utils.database import db
+from utils.daily_stats import write_rollups
+from utils.metrics import LatencyTracker
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+class ActivityBufferFullError(Exception):
+    """Raised when the buffer stays full for longer than the enqueue timeout"""
+
+
+class ActivityWriteBuffer:
+    """Write-behind buffer for user activities.
+
+    Requests hand over a ready-made activity document and return at once.
+    A single flusher thread writes batches with insert_many(ordered=False)
+    when `flush_size` records are waiting or `flush_interval` seconds have
+    passed, then folds them into the daily rollups. Ids are assigned on
+    enqueue, so a retried batch can't insert a record twice. When MongoDB
+    falls behind the bounded queue fills up and `add` pushes back on callers.
+    Pending records are flushed on interpreter exit; a hard crash loses at
+    most what is still queued, although callers were already told the
+    record was logged. That trade-off only holds for long-lived processes:
+    with ACTIVITY_WRITE_BEHIND off (the default on serverless hosts) the
+    app skips the buffer and writes each activity before answering.
+    """
+
+    def __init__(self, flush_size=200, flush_interval=1.0, max_pending=5000, enqueue_timeout=2.0):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.flushes = 0
+        self.flush_time = LatencyTracker()
+        self.thread = threading.Thread(target=self._run, name='activity-flusher', daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def add(self, activity):
+        """Queue an activity for writing and return its id"""
+        activity.setdefault('_id', ObjectId())
+        try:
+            self.queue.put(activity, timeout=self.enqueue_timeout)
+        except queue.Full:
+            with self.lock:
+                self.rejected += 1
+            raise ActivityBufferFullError("Activity buffer is full")
+        return str(activity['_id'])
+
+    def _collect(self):
+        """Wait for the first record, then gather a batch until it is full or the interval ends"""
+        try:
+            batch = [self.queue.get(timeout=0 if self.stopping.is_set() else self.flush_interval)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.flush_size:
+            remaining = 0 if self.stopping.is_set() else deadline - time.monotonic()
+            try:
+                batch.append(self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _insert(self, batch):
+        """Insert a batch, retrying until it lands; returns the records now stored"""
+        attempt = 0
+        stored_earlier = []
+        while True:
+            try:
+                if attempt and db.activities_are_timeseries:
+                    # Time-series collections don't reject duplicate _ids, so drop what already landed
+                    already_stored, batch = self._split_stored(batch)
+                    stored_earlier += already_stored
+                if batch:
+                    db.db.user_activities.insert_many(batch, ordered=False)
+                return stored_earlier + batch
+            except BulkWriteError as e:
+                # A duplicate _id was stored by an earlier attempt; a duplicate
+                # record_id is a client retry that is already counted
+                failed = set()
+                dropped = 0
+                for error in e.details['writeErrors']:
+                    duplicate = error['code'] == DUPLICATE_KEY_ERROR
+                    if not duplicate or 'record_id' in error.get('keyPattern', {}):
+                        failed.add(error['index'])
+                    if not duplicate:
+                        dropped += 1
+                if dropped:
+                    print(f"❌ Dropping {dropped} activities that could not be written")
+                    with self.lock:
+                        self.dropped += dropped
+                return stored_earlier + [activity for index, activity in enumerate(batch) if index not in failed]
+            except Exception as e:
+                attempt += 1
+                if self.stopping.is_set() and attempt >= 3:
+                    print(f"❌ Giving up on {len(batch)} activities at shutdown: {e}")
+                    with self.lock:
+                        self.dropped += len(batch)
+                    return stored_earlier
+                print(f"⚠️ Activity flush failed (attempt {attempt}), retrying: {e}")
+                time.sleep(min(0.5 * 2 ** attempt, 10))
+
+    def _split_stored(self, batch):
+        """Split a batch into records that are already stored and records still to insert"""
+        timestamps = [activity['timestamp'] for activity in batch]
+        stored_ids = {activity['_id'] for activity in db.db.user_activities.find(
+            {'_id': {'$in': [activity['_id'] for activity in batch]},
+             'timestamp': {'$gte': min(timestamps), '$lte': max(timestamps)}},
+            {'_id': 1}
+        )}
+        return ([activity for activity in batch if activity['_id'] in stored_ids],
+                [activity for activity in batch if activity['_id'] not in stored_ids])
+
+    def _flush(self, batch):
+        start = time.perf_counter()
+        stored = self._insert(batch)
+        if stored:
+            try:
+                write_rollups(stored)
+            except Exception as e:
+                print(f"Error updating daily rollups: {e}")
+        self.flush_time.record(time.perf_counter() - start)
+        with self.lock:
+            self.written += len(stored)
+            self.flushes += 1
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch:
+                self._flush(batch)
+            elif self.stopping.is_set():
+                return
+
+    def close(self, timeout=30):
+        """Flush everything still queued and stop the flusher thread"""
+        if self.stopping.is_set():
+            return
+        self.stopping.set()
+        self.thread.join(timeout)
+        if self.queue.qsize():
+            print(f"⚠️ {self.queue.qsize()} activities were not flushed before shutdown")
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                'depth': self.queue.qsize(),
+                'max_pending': self.queue.maxsize,
+                'written': self.written,
+                'dropped': self.dropped,
+                'rejected': self.rejected,
+                'flushes': self.flushes,
+                'average_batch': round(self.written / self.flushes, 1) if self.flushes else 0.0,
+                'flush_time': self.flush_time.summary()
+            }
@@ -0,0 +1,49 @@
+import json
+import os
+import threading
+
+
+class AudioBundle:
+    """Read-only set of pre-rendered clips produced by scripts/build_audio_bundle.py.
+
+    The manifest maps (utterance, language) to a file in the bundle
+    directory, along with the engine and voice that rendered it so a
+    change of engine configuration never serves stale audio.
+    """
+
+    MANIFEST_NAME = 'manifest.json'
+
+    def __init__(self, bundle_dir):
+        self.bundle_dir = bundle_dir
+        self.clips = {}
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """(Re)load the manifest; a missing bundle simply means no clips"""
+        manifest_path = os.path.join(self.bundle_dir, self.MANIFEST_NAME)
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            manifest = {}
+        except Exception as e:
+            print(f"⚠️ Could not load audio bundle manifest: {e}")
+            manifest = {}
+
+        with self.lock:
+            self.clips = manifest.get('clips', {})
+        if self.clips:
+            count = sum(len(entries) for entries in self.clips.values())
+            print(f"✅ Audio bundle loaded: {count} clips")
+
+    def find(self, text, language, engine_name, voice):
+        """Return the bundle-relative file of a clip, or None if it is not bundled"""
+        with self.lock:
+            clip = self.clips.get(language, {}).get(text)
+        if not clip or clip.get('engine') != engine_name or clip.get('voice') != voice:
+            return None
+        return clip['file']
+
+    def path_for(self, filename):
+        return os.path.join(self.bundle_dir, filename)
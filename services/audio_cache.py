@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+AUDIO_MIMETYPES = {
+    'mp3': 'audio/mpeg',
+    'wav': 'audio/wav',
+    'ogg': 'audio/ogg'
+}
+
+
+class AudioCache:
+    """Disk-backed, size-capped LRU store for synthesized audio clips.
+
+    Clips are content-addressed: the key is a hash of everything that
+    affects the synthesized audio, so the same utterance is only ever
+    synthesized once per cache directory. The directory is created on
+    first use; if it can't be (a read-only filesystem), disk caching is
+    turned off and every lookup misses instead of failing the import.
+    """
+
+    def __init__(self, cache_dir, max_bytes=200 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> (filename, size), least recently used first
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.ready = False
+        self.enabled = True
+
+    def _ensure_ready(self):
+        """Create the cache directory and index its files on first use"""
+        if self.ready:
+            return self.enabled
+        with self.lock:
+            if not self.ready:
+                try:
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    self._load_existing()
+                except OSError as e:
+                    print(f"⚠️ Audio cache disabled, {self.cache_dir} is not writable: {e}")
+                    self.enabled = False
+                self.ready = True
+        return self.enabled
+
+    @staticmethod
+    def make_key(text, lang, voice, engine):
+        """Build the content address for an utterance.
+
+        `voice` is the engine-specific voice setting, e.g. the gTTS tld.
+        """
+        payload = json.dumps([text, lang, voice, engine], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def make_composite_key(segment_keys):
+        """Address a clip joined from cached segments by the segments it is made of"""
+        return hashlib.sha256('-'.join(segment_keys).encode('ascii')).hexdigest()
+
+    def _load_existing(self):
+        """Rebuild the LRU index from files left by previous runs"""
+        files = []
+        for filename in os.listdir(self.cache_dir):
+            key, ext = os.path.splitext(filename)
+            if not ext or filename.endswith('.tmp'):
+                continue
+            path = os.path.join(self.cache_dir, filename)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, key, filename, stat.st_size))
+
+        # Oldest modification time first; hits refresh the mtime
+        for _, key, filename, size in sorted(files):
+            self.entries[key] = (filename, size)
+            self.total_bytes += size
+        self._evict()
+
+    def _evict(self):
+        """Drop least recently used clips until the store fits max_bytes"""
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            key, (filename, size) = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+            try:
+                os.unlink(os.path.join(self.cache_dir, filename))
+            except OSError:
+                pass
+
+    def get(self, key):
+        """Return the file path of a cached clip, or None on a miss"""
+        if not self._ensure_ready():
+            return None
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+
+        path = os.path.join(self.cache_dir, entry[0])
+        try:
+            # Persist recency so the LRU order survives restarts
+            os.utime(path)
+        except OSError:
+            with self.lock:
+                if self.entries.pop(key, None):
+                    self.total_bytes -= entry[1]
+            return None
+        return path
+
+    def lookup(self, key):
+        """Return the file path of a cached clip without touching metrics or recency"""
+        if not self._ensure_ready():
+            return None
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is None:
+            return None
+        path = os.path.join(self.cache_dir, entry[0])
+        return path if os.path.exists(path) else None
+
+    def put(self, key, data, ext='mp3'):
+        """Store clip bytes under key and return the file path, or None when disk caching is off"""
+        if not self._ensure_ready():
+            return None
+        filename = f"{key}.{ext}"
+        path = os.path.join(self.cache_dir, filename)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous:
+                self.total_bytes -= previous[1]
+            self.entries[key] = (filename, len(data))
+            self.total_bytes += len(data)
+            self._evict()
+        return path
+
+    @staticmethod
+    def mimetype_for(path):
+        """Get the Content-Type for a cached clip"""
+        return AUDIO_MIMETYPES.get(os.path.splitext(path)[1].lstrip('.'), 'application/octet-stream')
+
+    def get_stats(self):
+        """Return hit ratio and disk usage metrics"""
+        self._ensure_ready()
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self.entries),
+                'bytes_on_disk': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions
+            }
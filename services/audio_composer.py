@@ -0,0 +1,121 @@
+import io
+import os
+import wave
+
+# Spoken feedback templates per language; {pose} is replaced by the pose name clip
+FEEDBACK_TEMPLATES = {
+    'en': {
+        'hold': "Now hold {pose}",
+        'great_job': "Great job on {pose}",
+        'next': "Next, move into {pose}",
+        'release': "Slowly release {pose} and relax"
+    },
+    'hi': {
+        'hold': "अब {pose} में रुकें",
+        'great_job': "{pose} बहुत बढ़िया किया",
+        'next': "अब {pose} करें",
+        'release': "धीरे से {pose} छोड़ें और आराम करें"
+    }
+}
+
+POSE_PLACEHOLDER = '{pose}'
+
+# MPEG audio header lookup tables
+MPEG_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),   # MPEG-1
+    2: (22050, 24000, 16000),   # MPEG-2
+    0: (11025, 12000, 8000)     # MPEG-2.5
+}
+
+
+class IncompatibleSegmentsError(Exception):
+    """Raised when clips cannot be joined without re-encoding"""
+
+
+def get_template(template_name, language):
+    """Get a feedback template, falling back to English"""
+    templates = FEEDBACK_TEMPLATES.get(language, FEEDBACK_TEMPLATES['en'])
+    if template_name not in templates:
+        raise ValueError(f"Unknown feedback template: {template_name}")
+    return templates[template_name]
+
+def split_template(template):
+    """Split a template into ('text', fragment) and ('pose', None) segments"""
+    segments = []
+    before, _, after = template.partition(POSE_PLACEHOLDER)
+    if before.strip():
+        segments.append(('text', before.strip()))
+    segments.append(('pose', None))
+    if after.strip():
+        segments.append(('text', after.strip()))
+    return segments
+
+def _strip_id3(data):
+    """Remove ID3v2 and ID3v1 tags so only MPEG frames remain"""
+    if data[:3] == b'ID3' and len(data) >= 10:
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        data = data[10 + size:]
+    if len(data) >= 128 and data[-128:-125] == b'TAG':
+        data = data[:-128]
+    return data
+
+def _mp3_stream_params(data):
+    """Return (version, layer, sample_rate, channel_mode) of the first MPEG frame"""
+    for i in range(len(data) - 3):
+        if data[i] == 0xFF and (data[i + 1] & 0xE0) == 0xE0:
+            version = (data[i + 1] >> 3) & 0x03
+            layer = (data[i + 1] >> 1) & 0x03
+            rate_index = (data[i + 2] >> 2) & 0x03
+            if version == 1 or layer == 0 or rate_index == 3:
+                continue  # Reserved values: not a real frame header
+            channel_mode = (data[i + 3] >> 6) & 0x03
+            return version, layer, MPEG_SAMPLE_RATES[version][rate_index], channel_mode
+    raise IncompatibleSegmentsError("No MPEG frame found")
+
+def concat_mp3(chunks):
+    """Join MP3 clips frame-to-frame; all clips must share codec parameters"""
+    frames = [_strip_id3(chunk) for chunk in chunks]
+    params = {_mp3_stream_params(chunk) for chunk in frames}
+    if len(params) != 1:
+        raise IncompatibleSegmentsError(f"MP3 segments differ: {params}")
+    return b''.join(frames)
+
+def concat_wav(chunks):
+    """Join WAV clips sample-to-sample; all clips must share PCM parameters"""
+    params = None
+    pcm = []
+    for chunk in chunks:
+        with wave.open(io.BytesIO(chunk), 'rb') as wav:
+            chunk_params = (wav.getnchannels(), wav.getsampwidth(), wav.getframerate(), wav.getcomptype())
+            if params and chunk_params != params:
+                raise IncompatibleSegmentsError(f"WAV segments differ: {params} vs {chunk_params}")
+            params = chunk_params
+            pcm.append(wav.readframes(wav.getnframes()))
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as out:
+        out.setnchannels(params[0])
+        out.setsampwidth(params[1])
+        out.setframerate(params[2])
+        out.writeframes(b''.join(pcm))
+    return buffer.getvalue()
+
+CONCATENATORS = {
+    'mp3': concat_mp3,
+    'wav': concat_wav
+}
+
+def concatenate_files(paths):
+    """Losslessly join cached clips of the same format; returns (bytes, ext)"""
+    extensions = {os.path.splitext(path)[1].lstrip('.') for path in paths}
+    if len(extensions) != 1:
+        raise IncompatibleSegmentsError(f"Mixed clip formats: {extensions}")
+    ext = extensions.pop()
+    if ext not in CONCATENATORS:
+        raise IncompatibleSegmentsError(f"Cannot join {ext} clips")
+
+    chunks = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            chunks.append(f.read())
+    return CONCATENATORS[ext](chunks), ext
@@ -0,0 +1,285 @@
+import atexit
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+
+from bson.objectid import ObjectId
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from utils.database import db
+from utils.metrics import LatencyTracker
+
+
+class JobInterrupted(Exception):
+    """Raised by Job.checkpoint when the runner is stopping or lost the job's lease"""
+
+
+class Job:
+    """The running job as seen by its handler"""
+
+    def __init__(self, runner, doc):
+        self.runner = runner
+        self.id = doc['_id']
+        self.kind = doc['kind']
+        self.payload = doc.get('payload', {})
+        self.attempts = doc['attempts']
+        self.owner = doc['owner']
+
+    def checkpoint(self, **progress):
+        """Add to the job's progress counters and renew its lease; long handlers call this between steps"""
+        update = {'$set': {'lease_until': datetime.utcnow() + timedelta(seconds=self.runner.lease_seconds)}}
+        if progress:
+            update['$inc'] = {f'progress.{name}': count for name, count in progress.items()}
+        result = db.db.jobs.update_one({'_id': self.id, 'state': 'running', 'owner': self.owner}, update)
+        if self.runner.stopping.is_set() or not result.matched_count:
+            raise JobInterrupted(f"Job {self.id} interrupted")
+
+
+class JobRunner:
+    """Durable background jobs stored in the `jobs` MongoDB collection.
+
+    Handlers are registered per job kind. `enqueue` inserts a pending job
+    and returns at once; a pool of worker threads claims due jobs highest
+    priority first, leasing each so a job left by a crashed or restarted
+    process is picked up again once its lease runs out. A failing job is
+    retried with exponential backoff up to `max_attempts` and then kept as
+    failed for operators. A `dedupe_key` allows only one unfinished
+    (pending or running) job per key, so repeated requests for the same work
+    collapse into one; `enqueue_recurring` keys each run by its interval
+    slot so a running job can queue its successor. Finished jobs expire
+    after a week (see Database.create_job_indexes).
+    """
+
+    def __init__(self, workers=2, poll_interval=5, lease_seconds=120, max_attempts=5, retry_delay=30):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.handlers = {}
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+        self.interrupted = 0
+        self.queue_wait = LatencyTracker()
+        self.run_time = LatencyTracker()
+        self.threads = []
+
+    def register(self, kind, handler):
+        """Run `handler(job)` for jobs of this kind; its return value is stored as the result"""
+        self.handlers[kind] = handler
+
+    def start(self):
+        """Start the worker threads once every handler is registered"""
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f'jobs-{index}', daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        atexit.register(self.close)
+
+    def enqueue(self, kind, payload=None, dedupe_key=None, priority=0, delay=0, user_id=None, max_attempts=None):
+        """Queue a job and return its id; with a dedupe_key, an unfinished job with that key is reused"""
+        now = datetime.utcnow()
+        job = {
+            'kind': kind,
+            'payload': payload or {},
+            'state': 'pending',
+            'priority': priority,
+            'run_at': now + timedelta(seconds=delay),
+            'attempts': 0,
+            'max_attempts': max_attempts or self.max_attempts,
+            'progress': {},
+            'created_at': now,
+            'lease_until': None
+        }
+        if user_id:
+            job['user_id'] = ObjectId(user_id)
+        if dedupe_key:
+            # Pending and running jobs hold the key; finishing a job releases it
+            job['dedupe_key'] = dedupe_key
+        try:
+            job_id = db.db.jobs.insert_one(job).inserted_id
+        except DuplicateKeyError:
+            existing = db.db.jobs.find_one({'dedupe_key': dedupe_key}, {'_id': 1})
+            if existing is None:
+                # Finished in the meantime; queue a fresh one
+                return self.enqueue(kind, payload, dedupe_key, priority, delay, user_id, max_attempts)
+            return str(existing['_id'])
+        if not delay:
+            self.wakeup.set()
+        return str(job_id)
+
+    def enqueue_recurring(self, kind, interval, delay=0, priority=0):
+        """Queue one run of a recurring job, due in `delay` seconds.
+
+        The dedupe key names the interval slot the run falls in, so every
+        process scheduling the same run collapses into one job, while a
+        running job can still queue its successor for the next slot.
+        """
+        slot = int((time.time() + delay) // interval)
+        return self.enqueue(kind, dedupe_key=f'{kind}:{slot}', priority=priority, delay=delay)
+
+    def get(self, job_id):
+        """Return a job's status, or None if it is unknown or has expired"""
+        try:
+            job = db.db.jobs.find_one({'_id': ObjectId(job_id)}, {'payload': 0})
+        except Exception:
+            return None
+        return self.describe(job) if job else None
+
+    @staticmethod
+    def describe(job):
+        return {
+            'job_id': str(job['_id']),
+            'kind': job['kind'],
+            'user_id': str(job['user_id']) if job.get('user_id') else None,
+            'state': job['state'],
+            'priority': job['priority'],
+            'attempts': job['attempts'],
+            'progress': job.get('progress', {}),
+            'result': job.get('result'),
+            'error': job.get('error'),
+            'created_at': job['created_at'].isoformat() + 'Z',
+            'run_at': job['run_at'].isoformat() + 'Z',
+            'finished_at': job['finished_at'].isoformat() + 'Z' if job.get('finished_at') else None
+        }
+
+    def _claim(self, job_id=None):
+        """Lease the highest-priority due job (or the given one if it is due), or one whose worker
+        stopped renewing its lease"""
+        now = datetime.utcnow()
+        owner = f"{self.owner}/{threading.current_thread().name}"
+        query = {'kind': {'$in': list(self.handlers)},
+                 '$or': [{'state': 'pending', 'run_at': {'$lte': now}},
+                         {'state': 'running', 'lease_until': {'$lt': now},
+                          '$expr': {'$lt': ['$attempts', '$max_attempts']}}]}
+        if job_id:
+            query['_id'] = ObjectId(job_id)
+        return db.db.jobs.find_one_and_update(
+            query,
+            {'$set': {'state': 'running', 'owner': owner, 'started_at': now,
+                      'lease_until': now + timedelta(seconds=self.lease_seconds)},
+             '$inc': {'attempts': 1}},
+            sort=[('priority', DESCENDING), ('run_at', ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    def _fail_abandoned(self):
+        """Fail jobs whose worker died during their last attempt; the claim no longer retries them"""
+        now = datetime.utcnow()
+        result = db.db.jobs.update_many(
+            {'state': 'running', 'lease_until': {'$lt': now}, '$expr': {'$gte': ['$attempts', '$max_attempts']}},
+            {'$set': {'state': 'failed', 'error': 'Lease expired during the last attempt', 'lease_until': None,
+                      'finished_at': now},
+             '$unset': {'dedupe_key': ''}}
+        )
+        if result.modified_count:
+            print(f"❌ {result.modified_count} jobs failed: their worker stopped during the last attempt")
+            with self.lock:
+                self.failed += result.modified_count
+
+    def _finish(self, job, update):
+        # A worker that lost its lease must not overwrite the new owner's outcome
+        db.db.jobs.update_one({'_id': job.id, 'owner': job.owner}, update)
+
+    def _execute(self, doc):
+        job = Job(self, doc)
+        started = time.perf_counter()
+        self.queue_wait.record(max((datetime.utcnow() - doc['run_at']).total_seconds(), 0))
+        try:
+            result = self.handlers[doc['kind']](job)
+        except JobInterrupted:
+            # Not the job's fault: put it back without spending an attempt
+            self._finish(job, {'$set': {'state': 'pending', 'lease_until': None}, '$inc': {'attempts': -1}})
+            with self.lock:
+                self.interrupted += 1
+            return
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if doc['attempts'] >= doc['max_attempts']:
+                print(f"❌ Job {job.id} ({doc['kind']}) failed after {doc['attempts']} attempts: {error}")
+                self._finish(job, {'$set': {'state': 'failed', 'error': error, 'lease_until': None,
+                                               'finished_at': datetime.utcnow()},
+                                   '$unset': {'dedupe_key': ''}})
+                with self.lock:
+                    self.failed += 1
+            else:
+                delay = self.retry_delay * 2 ** (doc['attempts'] - 1)
+                print(f"⚠️ Job {job.id} ({doc['kind']}) failed, retrying in {delay}s: {error}")
+                self._finish(job, {'$set': {'state': 'pending', 'error': error, 'lease_until': None,
+                                               'run_at': datetime.utcnow() + timedelta(seconds=delay)}})
+                with self.lock:
+                    self.retried += 1
+            return
+        finally:
+            self.run_time.record(time.perf_counter() - started)
+
+        self._finish(job, {'$set': {'state': 'done', 'result': result, 'lease_until': None,
+                                       'finished_at': datetime.utcnow()},
+                           '$unset': {'dedupe_key': ''}})
+        with self.lock:
+            self.completed += 1
+
+    def run_now(self, job_id):
+        """Run one due job in the calling thread, for hosts without worker threads; returns whether it ran"""
+        doc = self._claim(job_id)
+        if not doc:
+            return False
+        self._execute(doc)
+        return True
+
+    def _run(self):
+        while not self.stopping.is_set():
+            doc = None
+            try:
+                if db.db is not None and self.handlers:
+                    doc = self._claim()
+                    if not doc:
+                        self._fail_abandoned()
+            except Exception as e:
+                print(f"⚠️ Could not claim a job: {e}")
+            if doc:
+                try:
+                    self._execute(doc)
+                except Exception as e:
+                    # The job's lease runs out and another worker retries it
+                    print(f"⚠️ Could not record the outcome of job {doc['_id']}: {e}")
+                continue
+            self.wakeup.wait(self.poll_interval)
+            self.wakeup.clear()
+
+    def close(self, timeout=10):
+        """Stop claiming jobs; running handlers are interrupted at their next checkpoint"""
+        if self.stopping.is_set():
+            return
+        self.stopping.set()
+        self.wakeup.set()
+        for thread in self.threads:
+            thread.join(timeout)
+
+    def get_stats(self):
+        counts = {}
+        if db.db is not None:
+            for entry in db.db.jobs.aggregate([
+                {'$match': {'state': {'$in': ['pending', 'running', 'failed']}}},
+                {'$group': {'_id': {'kind': '$kind', 'state': '$state'}, 'count': {'$sum': 1}}}
+            ]):
+                counts.setdefault(entry['_id']['kind'], {})[entry['_id']['state']] = entry['count']
+        with self.lock:
+            return {
+                'workers': self.workers,
+                'queued': counts,
+                'completed': self.completed,
+                'retried': self.retried,
+                'failed': self.failed,
+                'interrupted': self.interrupted,
+                'queue_wait': self.queue_wait.summary(),
+                'run_time': self.run_time.summary()
+            }
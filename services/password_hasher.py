@@ -0,0 +1,95 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from utils.metrics import LatencyTracker
+
+
+class HashingBusyError(Exception):
+    """Raised when the hashing pool, or one client's share of it, is full"""
+
+
+class PasswordHasher:
+    """Run password hashing and verification on a small dedicated thread pool.
+
+    Key derivation in hashlib releases the GIL, so the pool caps how many
+    CPU cores hashing can take at once while other requests keep running.
+    Work beyond `max_pending` queued hashes, or beyond `per_client_limit`
+    from one client address, waits up to `admission_wait` seconds for a
+    slot and is refused after that. Clients behind one NAT share an
+    address, so the per-client limit is set well above one person's needs.
+    """
+
+    def __init__(self, max_workers=2, max_pending=16, per_client_limit=8, timeout=10, admission_wait=2.0):
+        self.max_pending = max_pending
+        self.per_client_limit = per_client_limit
+        self.timeout = timeout
+        self.admission_wait = admission_wait
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='pwhash')
+        self.lock = threading.Lock()
+        self.slot_freed = threading.Condition(self.lock)
+        self.pending = 0
+        self.per_client = {}
+        self.rejected = 0
+        self.queue_wait = LatencyTracker()
+        self.hash_time = LatencyTracker()
+
+    def _admit(self, client):
+        with self.lock:
+            admitted = self.slot_freed.wait_for(
+                lambda: self.pending < self.max_pending and self.per_client.get(client, 0) < self.per_client_limit,
+                timeout=self.admission_wait
+            )
+            if not admitted:
+                self.rejected += 1
+                raise HashingBusyError("Password hashing is busy")
+            self.pending += 1
+            self.per_client[client] = self.per_client.get(client, 0) + 1
+
+    def _release(self, client):
+        with self.lock:
+            self.pending -= 1
+            self.per_client[client] -= 1
+            if not self.per_client[client]:
+                del self.per_client[client]
+            self.slot_freed.notify_all()
+
+    def _run(self, client, fn, *args):
+        self._admit(client)
+        submitted = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            self.queue_wait.record(started - submitted)
+            try:
+                return fn(*args)
+            finally:
+                self.hash_time.record(time.perf_counter() - started)
+
+        future = self.executor.submit(task)
+        # Release the slot when the work really ends, even if the caller gave up waiting
+        future.add_done_callback(lambda _: self._release(client))
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise HashingBusyError("Password hashing timed out")
+
+    def hash(self, password, client):
+        """Hash a new password for storage"""
+        return self._run(client, generate_password_hash, password)
+
+    def verify(self, password_hash, password, client):
+        """Check a password against a stored hash"""
+        return self._run(client, check_password_hash, password_hash, password)
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                'pending': self.pending,
+                'max_pending': self.max_pending,
+                'rejected': self.rejected,
+                'queue_wait': self.queue_wait.summary(),
+                'hash_time': self.hash_time.summary()
+            }
@@ -0,0 +1,110 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class TranslationMemory:
+    """Persistent translation store with an in-memory hot tier.
+
+    Entries are keyed by (source text, target language, prompt version),
+    so changing the translation prompt naturally invalidates old results.
+    The SQLite file is shared by every worker process on the host. It is
+    opened on first use; if it can't be (a read-only filesystem), only the
+    in-memory tier is kept.
+    """
+
+    def __init__(self, db_path, hot_size=2048):
+        self.db_path = db_path
+        self.hot_size = hot_size
+        self.hot = OrderedDict()
+        self.lock = threading.Lock()
+        self.hot_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self.conn = None
+        self.opened = False
+
+    def _connection(self):
+        """Open the SQLite store on first use (caller holds the lock); None if it is unavailable"""
+        if self.opened:
+            return self.conn
+        self.opened = True
+        try:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS translations (
+                    source TEXT NOT NULL,
+                    target_language TEXT NOT NULL,
+                    prompt_version INTEGER NOT NULL,
+                    translation TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (source, target_language, prompt_version)
+                )
+            """)
+            conn.commit()
+            self.conn = conn
+        except (sqlite3.OperationalError, OSError) as e:
+            print(f"⚠️ Translation memory at {self.db_path} is unavailable, keeping translations in memory: {e}")
+        return self.conn
+
+    def _remember(self, key, translation):
+        """Add to the hot tier (caller holds the lock)"""
+        self.hot[key] = translation
+        self.hot.move_to_end(key)
+        while len(self.hot) > self.hot_size:
+            self.hot.popitem(last=False)
+
+    def get(self, source, target_language, prompt_version):
+        """Return a stored translation, or None if it was never translated"""
+        key = (source, target_language, prompt_version)
+        with self.lock:
+            if key in self.hot:
+                self.hot.move_to_end(key)
+                self.hot_hits += 1
+                return self.hot[key]
+
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT translation FROM translations WHERE source = ? AND target_language = ? AND prompt_version = ?",
+                key
+            ).fetchone() if conn else None
+            if row is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, row[0])
+            return row[0]
+
+    def put(self, source, target_language, prompt_version, translation):
+        key = (source, target_language, prompt_version)
+        with self.lock:
+            conn = self._connection()
+            if conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?)",
+                    key + (translation, time.time())
+                )
+                conn.commit()
+            self._remember(key, translation)
+
+    def get_stats(self):
+        with self.lock:
+            conn = self._connection()
+            entries = conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0] if conn else len(self.hot)
+            lookups = self.hot_hits + self.disk_hits + self.misses
+            return {
+                'persistent': conn is not None,
+                'entries': entries,
+                'hot_entries': len(self.hot),
+                'hot_hits': self.hot_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_ratio': (self.hot_hits + self.disk_hits) / lookups if lookups else 0.0
+            }
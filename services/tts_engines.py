@@ -0,0 +1,162 @@
+import io
+import math
+import shutil
+import struct
+import subprocess
+import wave
+
+try:
+    from gtts import gTTS
+except ImportError:
+    gTTS = None
+
+
+class TTSEngine:
+    """Interface every TTS backend implements.
+
+    Engines turn text into encoded audio bytes. `voice_id` identifies
+    everything besides the text and language that changes the output, so
+    it can be folded into the audio cache key.
+    """
+
+    name = None
+    audio_format = 'mp3'
+    languages = ()
+
+    def is_available(self):
+        return True
+
+    def supports(self, language):
+        return language in self.languages
+
+    def voice_id(self, language):
+        return ''
+
+    def synthesize(self, text, language):
+        raise NotImplementedError
+
+
+class GTTSEngine(TTSEngine):
+    """Google Translate TTS; needs an HTTPS round trip per utterance"""
+
+    name = 'gtts'
+    audio_format = 'mp3'
+    languages = ('en', 'hi', 'kn', 'ta', 'te', 'mr')
+
+    def __init__(self, tld='co.in'):
+        self.tld = tld  # Use Indian domain for more natural Indian English
+
+    def is_available(self):
+        return gTTS is not None
+
+    def voice_id(self, language):
+        return self.tld
+
+    def synthesize(self, text, language):
+        tts = gTTS(
+            text=text,
+            lang=language,
+            slow=False,  # Fast speech
+            tld=self.tld  # Indian domain for more natural pronunciation
+        )
+
+        # Synthesize into memory rather than a temp file
+        buffer = io.BytesIO()
+        tts.write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class EspeakEngine(TTSEngine):
+    """Local, offline synthesis through the espeak-ng command line tool"""
+
+    name = 'espeak'
+    audio_format = 'wav'
+    voices = {
+        'en': 'en-us',
+        'hi': 'hi',
+        'kn': 'kn',
+        'ta': 'ta',
+        'te': 'te',
+        'mr': 'mr'
+    }
+    languages = tuple(voices)
+
+    def __init__(self, executable='espeak-ng', speed=160):
+        self.executable = executable
+        self.speed = speed
+
+    def is_available(self):
+        return shutil.which(self.executable) is not None
+
+    def voice_id(self, language):
+        return f"{self.voices[language]}@{self.speed}"
+
+    def synthesize(self, text, language):
+        result = subprocess.run(
+            [self.executable, '-v', self.voices[language], '-s', str(self.speed), '--stdout', text],
+            capture_output=True,
+            check=True,
+            timeout=30
+        )
+        return result.stdout
+
+
+class StubEngine(TTSEngine):
+    """Deterministic tone clips for tests and benchmarks; no network or binaries"""
+
+    name = 'stub'
+    audio_format = 'wav'
+    sample_rate = 16000
+
+    def supports(self, language):
+        return True
+
+    def synthesize(self, text, language):
+        # 50 ms of a quiet 440 Hz tone per character
+        frames = int(self.sample_rate * 0.05 * max(len(text), 1))
+        samples = (int(2000 * math.sin(2 * math.pi * 440 * i / self.sample_rate)) for i in range(frames))
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(b''.join(struct.pack('<h', s) for s in samples))
+        return buffer.getvalue()
+
+
+ENGINES = {
+    'gtts': GTTSEngine,
+    'espeak': EspeakEngine,
+    'stub': StubEngine
+}
+
+def parse_engine_config(value):
+    """Parse 'en:gtts,hi:espeak' into {'en': 'gtts', 'hi': 'espeak'}"""
+    mapping = {}
+    for item in (value or '').split(','):
+        if ':' not in item:
+            continue
+        language, engine_name = item.split(':', 1)
+        mapping[language.strip()] = engine_name.strip()
+    return mapping
+
+def build_engines(engine_config, default='gtts'):
+    """Instantiate the engine configured for each language.
+
+    Languages whose engine is unknown, unavailable on this host or does not
+    support the language fall back to the default engine.
+    """
+    instances = {}
+    selected = {}
+    for language, engine_name in parse_engine_config(engine_config).items():
+        if engine_name not in ENGINES:
+            print(f"⚠️ Unknown TTS engine '{engine_name}' for {language}, using {default}")
+            continue
+        engine = instances.setdefault(engine_name, ENGINES[engine_name]())
+        if not engine.is_available() or not engine.supports(language):
+            print(f"⚠️ TTS engine '{engine_name}' unavailable for {language}, using {default}")
+            continue
+        selected[language] = engine
+
+    default_engine = instances.setdefault(default, ENGINES[default]())
+    return selected, default_engine
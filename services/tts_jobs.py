@@ -0,0 +1,186 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.metrics import LatencyTracker
+
+
+class TTSQueueFullError(Exception):
+    """Raised when the synthesis queue has no room for another job"""
+
+
+class _Synthesis:
+    """One unit of synthesis work, shared by every job asking for the same clip"""
+
+    def __init__(self, dedupe_key):
+        self.dedupe_key = dedupe_key
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.clip_key = None
+        self.error = None
+        self.future = None
+        self.job_ids = set()
+
+
+class TTSJobService:
+    """Run TTS synthesis on a bounded thread pool, outside the request.
+
+    Request handlers submit a job and return immediately with its id. Jobs
+    for the same utterance share one synthesis, and each user only keeps
+    their latest job per kind, so a new pose supersedes the one before it.
+    """
+
+    def __init__(self, tts_system, max_workers=4, max_pending=64, job_ttl=300):
+        self.tts_system = tts_system
+        self.max_pending = max_pending
+        self.job_ttl = job_ttl
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='tts')
+        self.lock = threading.Lock()
+        self.jobs = {}        # job_id -> job dict
+        self.inflight = {}    # dedupe key -> _Synthesis
+        self.latest = {}      # (user_id, kind) -> job_id
+        self.pending = 0
+        self.deduplicated = 0
+        self.rejected = 0
+        self.queue_wait = LatencyTracker()
+        self.synthesis_time = LatencyTracker()
+
+    def submit(self, user_id, kind, text, language='en', template=None):
+        """Queue a synthesis job for a user and return its status"""
+        job_id = uuid.uuid4().hex
+        dedupe_key = (text, language, template)
+
+        with self.lock:
+            self._purge_finished()
+            self._supersede(user_id, kind)
+
+            synthesis = self.inflight.get(dedupe_key)
+            if synthesis is not None:
+                self.deduplicated += 1
+            else:
+                if self.pending >= self.max_pending:
+                    self.rejected += 1
+                    raise TTSQueueFullError("TTS queue is full")
+                synthesis = _Synthesis(dedupe_key)
+                self.inflight[dedupe_key] = synthesis
+                self.pending += 1
+                synthesis.future = self.executor.submit(self._run, synthesis)
+
+            synthesis.job_ids.add(job_id)
+            self.jobs[job_id] = {
+                'job_id': job_id,
+                'user_id': user_id,
+                'kind': kind,
+                'synthesis': synthesis,
+                'cancelled': False,
+                'created_at': time.time()
+            }
+            self.latest[(user_id, kind)] = job_id
+            return self._describe(self.jobs[job_id])
+
+    def _run(self, synthesis):
+        synthesis.started_at = time.time()
+        self.queue_wait.record(synthesis.started_at - synthesis.submitted_at)
+        try:
+            text, language, template = synthesis.dedupe_key
+            if template:
+                synthesis.clip_key = self.tts_system.get_feedback_clip(template, text, language)
+            else:
+                synthesis.clip_key = self.tts_system.get_clip(text, language)
+            if not synthesis.clip_key:
+                synthesis.error = "No audio was produced"
+        except Exception as e:
+            print(f"Error synthesizing TTS job: {e}")
+            synthesis.error = str(e)
+        finally:
+            synthesis.finished_at = time.time()
+            self.synthesis_time.record(synthesis.finished_at - synthesis.started_at)
+            with self.lock:
+                self.pending -= 1
+                if self.inflight.get(synthesis.dedupe_key) is synthesis:
+                    del self.inflight[synthesis.dedupe_key]
+
+    def _supersede(self, user_id, kind):
+        """Cancel the user's previous job of the same kind (caller holds the lock)"""
+        previous_id = self.latest.get((user_id, kind))
+        if previous_id and previous_id in self.jobs:
+            self._cancel(self.jobs[previous_id])
+
+    def _cancel(self, job):
+        """Cancel a job and its synthesis if nobody else needs it (caller holds the lock)"""
+        if job['cancelled'] or job['synthesis'].finished_at:
+            return
+        job['cancelled'] = True
+        synthesis = job['synthesis']
+        synthesis.job_ids.discard(job['job_id'])
+        if not synthesis.job_ids and synthesis.future.cancel():
+            self.pending -= 1
+            if self.inflight.get(synthesis.dedupe_key) is synthesis:
+                del self.inflight[synthesis.dedupe_key]
+
+    def _purge_finished(self):
+        """Forget jobs older than job_ttl (caller holds the lock)"""
+        cutoff = time.time() - self.job_ttl
+        expired = [job_id for job_id, job in self.jobs.items() if job['created_at'] < cutoff]
+        for job_id in expired:
+            job = self.jobs.pop(job_id)
+            key = (job['user_id'], job['kind'])
+            if self.latest.get(key) == job_id:
+                del self.latest[key]
+
+    def _describe(self, job):
+        synthesis = job['synthesis']
+        if job['cancelled']:
+            status = 'cancelled'
+        elif synthesis.error:
+            status = 'failed'
+        elif synthesis.clip_key:
+            status = 'done'
+        elif synthesis.finished_at:
+            # Finished without a clip: terminal, so pollers stop waiting
+            status = 'failed'
+        elif synthesis.started_at:
+            status = 'running'
+        else:
+            status = 'queued'
+
+        return {
+            'job_id': job['job_id'],
+            'kind': job['kind'],
+            'status': status,
+            'clip_key': synthesis.clip_key if status == 'done' else None,
+            'error': synthesis.error or ("No audio was produced" if status == 'failed' else None)
+        }
+
+    def get(self, job_id, user_id):
+        """Get a job's status, or None if it does not belong to the user"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if not job or job['user_id'] != user_id:
+                return None
+            return self._describe(job)
+
+    def cancel(self, job_id, user_id):
+        """Cancel one of the user's jobs"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if not job or job['user_id'] != user_id:
+                return None
+            self._cancel(job)
+            return self._describe(job)
+
+    def get_stats(self):
+        """Get queue depth, deduplication and latency metrics"""
+        with self.lock:
+            stats = {
+                'pending': self.pending,
+                'max_pending': self.max_pending,
+                'tracked_jobs': len(self.jobs),
+                'deduplicated': self.deduplicated,
+                'rejected': self.rejected
+            }
+        stats['queue_wait'] = self.queue_wait.summary()
+        stats['synthesis'] = self.synthesis_time.summary()
+        return stats
@@ -1,24 +1,50 @@
-from gtts import gTTS
-import pygame
 import threading
 import time
 import os
 import sys
 import google.generativeai as genai
 from dotenv import load_dotenv
-import io
-import tempfile
+from config import Config
+from services.audio_cache import AudioCache
+from services.tts_engines import build_engines
+from services.audio_bundle import AudioBundle
+from services.translation_memory import TranslationMemory
+from services.audio_composer import get_template, split_template, concatenate_files, IncompatibleSegmentsError
+
+# pygame is only needed when audio is played on the server host
+try:
+    import pygame
+except ImportError:
+    pygame = None
 
 # Load environment variables
 load_dotenv()
 
+WELCOME_TEXT = "Welcome to the yoga session. Let's begin your practice with mindful breathing."
+
+# Bump whenever the translation prompt changes so stored translations are redone
+TRANSLATION_PROMPT_VERSION = 1
+
 class AdvancedIndianTTSSystem:
-    def __init__(self):
+    def __init__(self, audio_cache=None, server_playback=None, engine_config=None):
         self.is_speaking = False
         self.current_language = 'en'
-        self.tld = 'co.in'  # Use Indian domain for more natural Indian English
         self.current_thread = None
-        self.current_temp_file = None
+        
+        # Pick a synthesis backend per language; see services/tts_engines.py
+        self.engines, self.default_engine = build_engines(engine_config or Config.TTS_ENGINES)
+        
+        # Synthesized clips are cached on disk and reused across requests
+        self.audio_cache = audio_cache or AudioCache(Config.TTS_CACHE_DIR, Config.TTS_CACHE_MAX_BYTES)
+        # Pre-rendered pose names and prompts, built by scripts/build_audio_bundle.py
+        self.audio_bundle = AudioBundle(Config.TTS_BUNDLE_DIR)
+        # Translations are remembered so each string is only sent to Gemini once
+        self.translation_memory = TranslationMemory(Config.TRANSLATION_MEMORY_PATH)
+        
+        # By default clips are delivered to the browser; server playback is opt-in
+        if server_playback is None:
+            server_playback = Config.TTS_SERVER_PLAYBACK
+        self.server_playback = False
         
         # Initialize Gemini API
         self.gemini_api_key = os.getenv('GEMINI_API_KEY')
@@ -30,26 +56,32 @@ class AdvancedIndianTTSSystem:
             print("⚠️ GEMINI_API_KEY not found in environment variables")
             self.gemini_model = None
         
-        # Initialize pygame for audio playback with optimized settings
-        try:
-            pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=256)  # Smaller buffer for faster response
-            print("✅ Pygame audio initialized")
-        except Exception as e:
-            print(f"⚠️ Pygame audio initialization failed: {e}")
-        
-        print("✅ gTTS system initialized with non-blocking audio")
+        if server_playback:
+            # Initialize pygame for audio playback with optimized settings
+            try:
+                pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=256)  # Smaller buffer for faster response
+                self.server_playback = True
+                print("✅ Pygame audio initialized")
+            except Exception as e:
+                print(f"⚠️ Pygame audio initialization failed: {e}")
         
+        print("✅ TTS system initialized")
+    
     def translate_with_gemini(self, text, target_language):
         """Use Gemini to translate text to target language"""
+        remembered = self.translation_memory.get(text, target_language, TRANSLATION_PROMPT_VERSION)
+        if remembered is not None:
+            return remembered
+        
         if not self.gemini_model:
             print("⚠️ Gemini model not available, using original text")
             return text
-            
+        
         try:
             language_names = {
                 'en': 'Indian English',
                 'hi': 'Hindi',
-                'kn': 'Kannada', 
+                'kn': 'Kannada',
                 'ta': 'Tamil',
                 'te': 'Telugu',
                 'mr': 'Marathi'
@@ -58,7 +90,7 @@ class AdvancedIndianTTSSystem:
             target_lang_name = language_names.get(target_language, 'English')
             
             prompt = f"""
-            Translate the following text to {target_lang_name}. 
+            Translate the following text to {target_lang_name}.
             Make it natural and easy to understand for voice synthesis.
             Keep it concise and clear.
             
@@ -75,64 +107,108 @@ class AdvancedIndianTTSSystem:
                 translated_text = translated_text.split("Translation:")[1].strip()
             
             print(f"🌍 Translated to {target_lang_name}: {translated_text}")
+            if translated_text:
+                self.translation_memory.put(text, target_language, TRANSLATION_PROMPT_VERSION, translated_text)
             return translated_text
-            
+        
         except Exception as e:
             print(f"Error translating with Gemini: {e}")
             print("Using original text as fallback")
             return text
     
-    def stop_speaking(self):
-        """Stop current speech and clean up"""
+    def prepare_text(self, text, language='en'):
+        """Translate text if needed (only for Hindi)"""
+        if language == 'hi':
+            return self.translate_with_gemini(text, language)
+        return text
+    
+    def get_engine(self, language):
+        """Get the synthesis engine configured for a language"""
+        return self.engines.get(language, self.default_engine)
+    
+    def synthesize(self, text, language='en'):
+        """Make sure a clip for text is cached and return its cache key"""
+        engine = self.get_engine(language)
+        key = AudioCache.make_key(text, language, engine.voice_id(language), engine.name)
+        if self.audio_cache.get(key):
+            return key
+        
+        if self.audio_cache.put(key, engine.synthesize(text, language), ext=engine.audio_format) is None:
+            # Clips are served from the cache, so there is nothing to hand out without it
+            raise RuntimeError("Audio cache is disabled; the clip could not be stored")
+        return key
+    
+    def get_bundled_clip(self, text, language='en'):
+        """Get the bundle file of a pre-rendered clip, or None if it must be synthesized"""
+        engine = self.get_engine(language)
+        return self.audio_bundle.find(text, language, engine.name, engine.voice_id(language))
+    
+    def get_clip(self, text, language='en'):
+        """Translate and synthesize text, returning the clip's cache key"""
+        translated_text = self.prepare_text(text, language)
+        print(f"🎤 Synthesizing ({language}): {translated_text}")
+        return self.synthesize(translated_text, language)
+    
+    def get_feedback_clip(self, template_name, pose_name, language='en'):
+        """Build templated feedback from separately cached segments.
+        
+        Template fragments and pose names are cached on their own, so every
+        template/pose combination reuses the same segments. The joined clip
+        is cached too, under a key derived from the segment keys, and served
+        like any other clip. Returns its cache key.
+        """
+        template = get_template(template_name, language)
+        keys = []
+        for kind, fragment in split_template(template):
+            if kind == 'pose':
+                keys.append(self.get_clip(pose_name, language))
+            else:
+                # Templates are already written in the target language
+                keys.append(self.synthesize(fragment, language))
+        
+        composite_key = AudioCache.make_composite_key(keys)
+        if self.audio_cache.get(composite_key):
+            return composite_key
         try:
-            if self.is_speaking:
-                pygame.mixer.music.stop()
-                self.is_speaking = False
-                
-            # Clean up current temp file
-            if self.current_temp_file and os.path.exists(self.current_temp_file):
-                try:
-                    os.unlink(self.current_temp_file)
-                except:
-                    pass
-                self.current_temp_file = None
-                
-            print("🔇 Speech stopped")
-        except Exception as e:
-            print(f"Error stopping speech: {e}")
-
+            audio, ext = concatenate_files([self.get_clip_path(key) for key in keys])
+        except IncompatibleSegmentsError as e:
+            print(f"⚠️ Cannot join feedback segments ({e}), synthesizing whole sentence")
+            return self.synthesize(template.replace('{pose}', self.prepare_text(pose_name, language)), language)
+        if self.audio_cache.put(composite_key, audio, ext=ext) is None:
+            raise RuntimeError("Audio cache is disabled; the clip could not be stored")
+        return composite_key
+    
+    def get_welcome_clip(self, language='en'):
+        """Get the cache key of the welcome message clip"""
+        return self.get_clip(WELCOME_TEXT, language)
+    
+    def get_pose_clip(self, pose_name, language='en'):
+        """Get the cache key of the pose name clip"""
+        return self.get_clip(pose_name, language)
+    
+    def get_clip_path(self, key):
+        """Get the file path of a cached clip, or None if it is not cached"""
+        return self.audio_cache.lookup(key)
+    
     def speak(self, text, language='en'):
-        """Speak text using gTTS with female voice - NON-BLOCKING version"""
+        """Play text through the server's speakers - NON-BLOCKING version"""
+        if not self.server_playback:
+            print("⚠️ Server playback is disabled, not speaking")
+            return False
+        
         try:
             # Stop any current speech
             self.stop_speaking()
             
-            # Translate text if needed (only for Hindi)
-            if language == 'hi':
-                translated_text = self.translate_with_gemini(text, language)
+            bundled = self.get_bundled_clip(text, language)
+            if bundled:
+                audio_path = self.audio_bundle.path_for(bundled)
             else:
-                translated_text = text
-            
-            print(f"🎤 Speaking ({language}): {translated_text}")
-            
-            # Create gTTS object with optimized settings for speed
-            tts = gTTS(
-                text=translated_text, 
-                lang=language, 
-                slow=False,  # Fast speech
-                tld=self.tld  # Indian domain for more natural pronunciation
-            )
-            
-            # Create a temporary file to store the audio
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as temp_file:
-                temp_filename = temp_file.name
-                tts.save(temp_filename)
-            
-            self.current_temp_file = temp_filename
+                audio_path = self.get_clip_path(self.get_clip(text, language))
             self.is_speaking = True
             
             # Play the audio using pygame (non-blocking)
-            pygame.mixer.music.load(temp_filename)
+            pygame.mixer.music.load(audio_path)
             pygame.mixer.music.play()
             
             # Start a thread to monitor playback completion
@@ -140,13 +216,7 @@ class AdvancedIndianTTSSystem:
                 while pygame.mixer.music.get_busy() and self.is_speaking:
                     time.sleep(0.1)
                 
-                # Clean up when done
-                if self.is_speaking:  # Only clean up if we weren't interrupted
-                    try:
-                        os.unlink(temp_filename)
-                    except:
-                        pass
-                    self.current_temp_file = None
+                if self.is_speaking:  # Only reset if we weren't interrupted
                     self.is_speaking = False
                     print("✅ Speech completed")
             
@@ -155,16 +225,23 @@ class AdvancedIndianTTSSystem:
             self.current_thread.start()
             
             return True
-            
+        
         except Exception as e:
             print(f"Error speaking: {e}")
             self.is_speaking = False
             return False
     
+    def get_cache_stats(self):
+        """Get synthesized-audio cache metrics"""
+        return self.audio_cache.get_stats()
+    
+    def get_translation_stats(self):
+        """Get translation memory metrics"""
+        return self.translation_memory.get_stats()
+    
     def speak_welcome(self, language='en'):
         """Speak welcome message"""
-        welcome_text = "Welcome to the yoga session. Let's begin your practice with mindful breathing."
-        return self.speak(welcome_text, language)
+        return self.speak(WELCOME_TEXT, language)
     
     def speak_pose_feedback(self, pose_name, feedback, language='en'):
         """Speak only the pose name"""
@@ -184,6 +261,8 @@ class AdvancedIndianTTSSystem:
     
     def stop_speaking(self):
         """Stop current speech"""
+        if not self.server_playback:
+            return
         try:
             pygame.mixer.music.stop()
             self.is_speaking = False
@@ -192,7 +271,7 @@ class AdvancedIndianTTSSystem:
             print(f"Error stopping speech: {e}")
 
 if __name__ == "__main__":
-    tts = AdvancedIndianTTSSystem()
+    tts = AdvancedIndianTTSSystem(server_playback=True)
     
     print("\n🧪 Testing welcome messages...")
     tts.speak_welcome('en')
@@ -0,0 +1,247 @@
+from datetime import datetime, timedelta, timezone
+
+from bson.objectid import ObjectId
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from config import Config
+from .database import db
+from .daily_stats import ROLLUP_TIMEZONE_NAME, local_date
+from .pose_catalog import get_pose_names, pose_labels
+
+ANALYTICS_JOB = 'refresh_analytics'
+# Watermark (an ObjectId bound on user_activities._id) lives in meta under this id
+ANALYTICS_META_ID = 'analytics'
+# Activities get their _id when they are queued, so leave the write-behind buffer time to land them
+SETTLE_TIME = timedelta(minutes=5)
+# Each pass covers at most this much new data and then moves the watermark
+WINDOW = timedelta(days=1)
+# Uploaded batches may be stamped up to a day before their _id (MAX_RECORD_AGE in app.py)
+MAX_BACKDATE = timedelta(days=1, hours=1)
+# ...and up to a minute after it, when the client clock runs ahead
+MAX_FORWARD_SKEW = timedelta(minutes=2)
+# One refresh at a time holds the watermark; a crashed holder's lease runs out
+LEASE_TIME = timedelta(minutes=10)
+ADDITIVE_FIELDS = ['count', 'total_duration', 'confidence_sum']
+
+
+def _additive_merge(fields):
+    """$merge update that adds a pass's totals once, even if the pass is replayed after a crash.
+
+    Every summary document remembers the end of the last window folded into
+    it, and a window that has already been added leaves the totals alone.
+    """
+    is_new = {'$lt': ['$merged_through', '$$new.merged_through']}
+    update = {field: {'$cond': [is_new, {'$add': [{'$ifNull': [f'${field}', 0]}, f'$$new.{field}']}, f'${field}']}
+              for field in fields}
+    update['merged_through'] = {'$max': ['$merged_through', '$$new.merged_through']}
+    return [{'$set': update}]
+
+def _local_date(field):
+    return {'$dateToString': {'format': '%Y-%m-%d', 'date': field, 'timezone': ROLLUP_TIMEZONE_NAME}}
+
+def _pose_label(key):
+    """Summaries keep the stored pose key: a catalog id, or a name for legacy and off-catalog poses"""
+    return pose_labels.get(key, str(key)) if isinstance(key, int) else key
+
+
+class Analytics:
+    """Global practice analytics, maintained incrementally in summary collections.
+
+    A recurring job reads only the activities added since the stored
+    watermark, one window at a time, and $merges them into:
+
+      - analytics_pose_daily   (date, pose) -> count, total duration, confidence sum
+      - analytics_daily        date -> activities, total duration, active users
+      - analytics_daily_users  (user_id, date) pairs behind the active user counts
+
+    The watermark moves after each window, so the cost of a refresh follows
+    the amount of new data rather than the size of user_activities. A
+    refresh leases the watermark and advances it with a compare-and-set,
+    so overlapping runs never merge a window twice.
+    """
+
+    def __init__(self, refresh_interval=300):
+        self.refresh_interval = refresh_interval
+        self.jobs = None
+
+    def schedule(self, jobs):
+        """Refresh the summaries as a recurring job on a JobRunner"""
+        self.jobs = jobs
+        jobs.register(ANALYTICS_JOB, self._run_job)
+        try:
+            self._enqueue()
+        except Exception as e:
+            print(f"⚠️ Could not schedule analytics refreshes: {e}")
+
+    def _enqueue(self, delay=0):
+        self.jobs.enqueue_recurring(ANALYTICS_JOB, self.refresh_interval, delay=delay)
+
+    def _run_job(self, job):
+        # Queue the next run first, so the recurrence survives a failed refresh
+        self._enqueue(self.refresh_interval)
+        return self.refresh(job)
+
+    def _initial_watermark(self):
+        """Start just before the oldest activity (timestamps may run a minute ahead of _ids)"""
+        order = 'timestamp' if db.activities_are_timeseries else '_id'
+        first = db.db.user_activities.find_one({}, {'_id': 1, 'timestamp': 1}, sort=[(order, ASCENDING)])
+        if not first:
+            return None
+        started = first['_id'].generation_time if order == '_id' else first['timestamp']
+        return ObjectId.from_datetime(started - timedelta(minutes=2))
+
+    def get_watermark(self):
+        state = db.db.meta.find_one({'_id': ANALYTICS_META_ID}, {'watermark': 1})
+        return state.get('watermark') if state else None
+
+    def _acquire(self):
+        """Lease the watermark so an overlapping run (a retry, another process) can't merge the same windows"""
+        token = ObjectId()
+        now = datetime.utcnow()
+        try:
+            state = db.db.meta.find_one_and_update(
+                {'_id': ANALYTICS_META_ID, '$or': [{'lease_until': None}, {'lease_until': {'$lt': now}}]},
+                {'$set': {'lease_until': now + LEASE_TIME, 'lease_token': token}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # The document exists and its lease is held
+            return None, None
+        return token, state
+
+    def refresh(self, job=None):
+        """Fold every settled window after the watermark into the summaries"""
+        token, state = self._acquire()
+        if token is None:
+            return {'windows': 0, 'skipped': 'another refresh holds the watermark'}
+        try:
+            expected = state.get('watermark')
+            low = expected or self._initial_watermark()
+            if low is None:
+                return {'windows': 0}
+            until = datetime.now(timezone.utc) - SETTLE_TIME
+            windows = 0
+            while low.generation_time < until:
+                high = ObjectId.from_datetime(min(low.generation_time + WINDOW, until))
+                if high == low:
+                    break
+                self._merge_window(low, high)
+                # Compare-and-set: only the lease holder, and only from the watermark it started at
+                moved = db.db.meta.update_one(
+                    {'_id': ANALYTICS_META_ID, 'lease_token': token, 'watermark': expected},
+                    {'$set': {'watermark': high, 'updated_at': datetime.utcnow(),
+                              'lease_until': datetime.utcnow() + LEASE_TIME}}
+                )
+                if not moved.matched_count:
+                    print("⚠️ Analytics watermark moved under this refresh; stopping")
+                    break
+                expected = low = high
+                windows += 1
+                if job:
+                    job.checkpoint(windows=1)
+            return {'windows': windows, 'watermark': low.generation_time.isoformat()}
+        finally:
+            db.db.meta.update_one({'_id': ANALYTICS_META_ID, 'lease_token': token}, {'$set': {'lease_until': None}})
+
+    def _merge_window(self, low, high):
+        """Merge the activities with low <= _id < high into every summary"""
+        match = {'_id': {'$gte': low, '$lt': high}}
+        if db.activities_are_timeseries:
+            # Lets MongoDB skip buckets by time; _id alone is not indexed there
+            match['timestamp'] = {'$gte': low.generation_time - MAX_BACKDATE,
+                                  '$lte': high.generation_time + MAX_FORWARD_SKEW}
+        merged_through = high.generation_time
+
+        db.db.user_activities.aggregate([
+            {'$match': match},
+            {'$group': {'_id': {'user_id': '$user_id', 'date': _local_date('$timestamp')}}},
+            {'$project': {'_id': 0, 'user_id': '$_id.user_id', 'date': '$_id.date'}},
+            {'$merge': {'into': 'analytics_daily_users', 'on': ['user_id', 'date'],
+                        'whenMatched': 'keepExisting', 'whenNotMatched': 'insert'}}
+        ])
+
+        db.db.user_activities.aggregate([
+            {'$match': match},
+            {'$group': {
+                '_id': {'date': _local_date('$timestamp'), 'pose': {'$ifNull': ['$pose_id', '$pose_name']}},
+                'count': {'$sum': 1},
+                'total_duration': {'$sum': {'$ifNull': ['$duration_seconds', 0]}},
+                'confidence_sum': {'$sum': {'$ifNull': ['$confidence', 0]}}
+            }},
+            {'$project': {'_id': 0, 'date': '$_id.date', 'pose': '$_id.pose', 'count': 1,
+                          'total_duration': 1, 'confidence_sum': 1, 'merged_through': merged_through}},
+            {'$merge': {'into': 'analytics_pose_daily', 'on': ['date', 'pose'],
+                        'whenMatched': _additive_merge(ADDITIVE_FIELDS), 'whenNotMatched': 'insert'}}
+        ])
+
+        db.db.user_activities.aggregate([
+            {'$match': match},
+            {'$group': {
+                '_id': _local_date('$timestamp'),
+                'count': {'$sum': 1},
+                'total_duration': {'$sum': {'$ifNull': ['$duration_seconds', 0]}}
+            }},
+            {'$set': {'merged_through': merged_through}},
+            {'$merge': {'into': 'analytics_daily', 'on': '_id',
+                        'whenMatched': _additive_merge(['count', 'total_duration']), 'whenNotMatched': 'insert'}}
+        ])
+
+        # Distinct users are not additive, so recount the days this window touched
+        touched = db.db.analytics_daily.distinct('_id', {'merged_through': merged_through})
+        self.recount_active_users(touched)
+
+    def recount_active_users(self, dates):
+        """Recompute analytics_daily.active_users for the given days from analytics_daily_users"""
+        for date in dates:
+            db.db.analytics_daily.update_one(
+                {'_id': date},
+                {'$set': {'active_users': db.db.analytics_daily_users.count_documents({'date': date})}}
+            )
+
+    def get_pose_summary(self, days=30):
+        """Practice count, average hold and confidence per pose over the last `days` days"""
+        since = local_date(datetime.utcnow() - timedelta(days=days))
+        poses = {}
+        for entry in db.db.analytics_pose_daily.aggregate([
+            {'$match': {'date': {'$gte': since}}},
+            {'$group': {'_id': '$pose', 'count': {'$sum': '$count'},
+                        'total_duration': {'$sum': '$total_duration'},
+                        'confidence_sum': {'$sum': '$confidence_sum'}}}
+        ]):
+            # Legacy names and catalog ids of the same pose end up together
+            pose = poses.setdefault(_pose_label(entry['_id']), {'count': 0, 'total_duration': 0, 'confidence_sum': 0})
+            for field in ADDITIVE_FIELDS:
+                pose[field] += entry[field]
+
+        summary = []
+        for pose_name, totals in poses.items():
+            names = get_pose_names(pose_name)
+            summary.append({
+                'pose': pose_name,
+                'english_name': names['english'],
+                'sanskrit_name': names['sanskrit'],
+                'count': totals['count'],
+                'average_hold_seconds': round(totals['total_duration'] / totals['count'], 1),
+                'average_confidence': round(totals['confidence_sum'] / totals['count'], 4)
+            })
+        summary.sort(key=lambda pose: pose['count'], reverse=True)
+        return summary
+
+    def get_daily_activity(self, days=30):
+        """Activities, practice time and active users per day over the last `days` days"""
+        since = local_date(datetime.utcnow() - timedelta(days=days))
+        return [{
+            'date': day['_id'],
+            'activities': day['count'],
+            'total_duration': day['total_duration'],
+            'active_users': day.get('active_users', 0)
+        } for day in db.db.analytics_daily.find({'_id': {'$gte': since}}).sort('_id', ASCENDING)]
+
+    def get_processed_through(self):
+        """Time up to which activities are included in the summaries, or None before the first run"""
+        watermark = self.get_watermark()
+        return watermark.generation_time.isoformat() if watermark else None
+
+analytics = Analytics(Config.ANALYTICS_REFRESH_SECONDS)
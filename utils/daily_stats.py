@@ -0,0 +1,158 @@
+from datetime import datetime, timedelta
+
+import pytz
+from bson.objectid import ObjectId
+from pymongo import UpdateOne
+
+from .database import db
+from .pose_catalog import get_traditional_name, get_activity_pose_name
+
+# Activities are rolled up by day in Indian Standard Time
+ROLLUP_TIMEZONE_NAME = 'Asia/Kolkata'
+ROLLUP_TIMEZONE = pytz.timezone(ROLLUP_TIMEZONE_NAME)
+# Set once this process has recorded live_since (see write_rollups)
+_marked_live = False
+
+
+def local_date(timestamp):
+    """Return the IST calendar date of a timestamp as 'YYYY-MM-DD'"""
+    if timestamp.tzinfo is None:
+        timestamp = pytz.utc.localize(timestamp)
+    return timestamp.astimezone(ROLLUP_TIMEZONE).strftime('%Y-%m-%d')
+
+def _field_key(value):
+    """Make a value safe to use as a MongoDB field name"""
+    return str(value).replace('.', '_').lstrip('$') or '_'
+
+
+class RollupAccumulator:
+    """Collect activities and turn them into per-(user, day) rollup upserts.
+
+    Used for a single activity on the write path and for many activities
+    at once by the backfill, so both produce identical documents.
+    """
+
+    def __init__(self):
+        self.days = {}
+
+    def add(self, activity):
+        key = (activity['user_id'], local_date(activity['timestamp']))
+        day = self.days.setdefault(key, {'$inc': {}, '$max': {}, '$min': {}, '$set': {}})
+        pose_name = get_activity_pose_name(activity)
+        pose = _field_key(pose_name)
+        session = _field_key(activity['session_id'])
+        duration = activity.get('duration_seconds') or 0
+        timestamp = activity['timestamp']
+
+        for field, amount in (('count', 1),
+                              ('total_duration', duration),
+                              (f'poses.{pose}', 1),
+                              (f'sessions.{session}.count', 1),
+                              (f'sessions.{session}.duration', duration)):
+            day['$inc'][field] = day['$inc'].get(field, 0) + amount
+
+        for field in ('last_at', f'pose_last.{pose}'):
+            if field not in day['$max'] or timestamp > day['$max'][field]:
+                day['$max'][field] = timestamp
+        for field in ('first_at', f'sessions.{session}.start'):
+            if field not in day['$min'] or timestamp < day['$min'][field]:
+                day['$min'][field] = timestamp
+        day['$set'][f'sessions.{session}.id'] = activity['session_id']
+        day['$set'][f'pose_names.{pose}'] = pose_name
+
+    def operations(self):
+        """Return one atomic upsert per (user, day)"""
+        return [
+            UpdateOne({'user_id': user_id, 'date': date}, update, upsert=True)
+            for (user_id, date), update in self.days.items()
+        ]
+
+def write_rollups(activities):
+    """Fold freshly stored activities (with their _id) into user_daily_stats.
+
+    Before its first rollup write, each process lowers `live_since` to the
+    oldest activity it is about to roll up, so the backfill never replays
+    an activity that was already counted live.
+    """
+    global _marked_live
+    if not _marked_live:
+        db.mark_rollups_live(min(activity['_id'].generation_time for activity in activities))
+        _marked_live = True
+    accumulator = RollupAccumulator()
+    for activity in activities:
+        accumulator.add(activity)
+    db.db.user_daily_stats.bulk_write(accumulator.operations(), ordered=False)
+
+def record_activity_rollup(activity):
+    """Fold one freshly logged activity into its user_daily_stats document"""
+    write_rollups([activity])
+
+def get_activity_stats_from_rollups(user_id, days=30):
+    """Build the dashboard statistics from daily rollups: O(days) instead of O(activities)"""
+    today = datetime.now(ROLLUP_TIMEZONE).date()
+    start_date = (today - timedelta(days=days)).strftime('%Y-%m-%d')
+    week_dates = [(today - timedelta(days=i)) for i in range(6, -1, -1)]
+
+    rollups = db.db.user_daily_stats.find({
+        'user_id': ObjectId(user_id),
+        'date': {'$gte': min(start_date, week_dates[0].strftime('%Y-%m-%d'))}
+    })
+
+    total_asanas = 0
+    counts_by_day = {}
+    poses = {}
+    sessions = {}
+    for rollup in rollups:
+        counts_by_day[rollup['date']] = rollup['count']
+        if rollup['date'] < start_date:
+            continue
+        total_asanas += rollup['count']
+        for pose_key, count in rollup.get('poses', {}).items():
+            pose_name = rollup.get('pose_names', {}).get(pose_key, pose_key)
+            entry = poses.setdefault(pose_name, {'count': 0, 'last_practiced': None})
+            entry['count'] += count
+            last = rollup.get('pose_last', {}).get(pose_key)
+            if last and (entry['last_practiced'] is None or last > entry['last_practiced']):
+                entry['last_practiced'] = last
+        for session in rollup.get('sessions', {}).values():
+            entry = sessions.setdefault(str(session['id']), {
+                '_id': str(session['id']), 'asanas_count': 0, 'total_duration': 0, 'session_date': session['start']
+            })
+            entry['asanas_count'] += session['count']
+            entry['total_duration'] += session['duration']
+            entry['session_date'] = min(entry['session_date'], session['start'])
+
+    top_asanas = sorted(poses.items(), key=lambda item: item[1]['count'], reverse=True)[:5]
+    return {
+        'total_asanas': total_asanas,
+        'unique_asanas': len(poses),
+        'daily_activity': [{
+            'date': day.strftime('%Y-%m-%d'),
+            'day_name': day.strftime('%a'),
+            'count': counts_by_day.get(day.strftime('%Y-%m-%d'), 0)
+        } for day in week_dates],
+        'top_asanas': [{
+            '_id': pose_name,
+            'count': entry['count'],
+            'traditional_name': get_traditional_name(pose_name),
+            'last_practiced': entry['last_practiced']
+        } for pose_name, entry in top_asanas],
+        'recent_sessions': sorted(sessions.values(), key=lambda s: s['session_date'], reverse=True)[:10],
+        'period_days': days
+    }
+
+def get_streak_from_rollups(user_id):
+    """Count consecutive active days back from today using the rollup dates"""
+    dates = db.db.user_daily_stats.find(
+        {'user_id': ObjectId(user_id)},
+        {'date': 1, '_id': 0}
+    ).sort('date', -1).batch_size(400)
+
+    expected_day = datetime.now(ROLLUP_TIMEZONE).date()
+    streak = 0
+    for rollup in dates:
+        if rollup['date'] != expected_day.strftime('%Y-%m-%d'):
+            break
+        streak += 1
+        expected_day -= timedelta(days=1)
+    return streak
@@ -1,16 +1,104 @@
 from pymongo import MongoClient, ASCENDING, DESCENDING
 from config import Config
+from .migrations import SCHEMA_VERSION, get_schema_version, apply_migrations
+
+COVERING_INDEX_NAME = 'activity_stats_covering'
 
 class Database:
     def __init__(self):
         self.client = None
         self.db = None
+        self.activity_storage = Config.ACTIVITY_STORAGE
     
     def init_app(self, app):
         """Initialize database connection"""
         self.client = MongoClient(Config.MONGODB_URI)
         self.db = self.client[Config.DATABASE_NAME]
-        self.create_indexes()
+        self.check_schema_version()
+    
+    def check_schema_version(self):
+        """Compare the applied schema version with the code's; indexes are built by scripts.migrate_db"""
+        version = get_schema_version(self)
+        if version < SCHEMA_VERSION:
+            if Config.AUTO_MIGRATE:
+                apply_migrations(self)
+                return
+            print(f"⚠️  Database schema is at version {version}, code expects {SCHEMA_VERSION}; "
+                  f"run python -m scripts.migrate_db")
+        # Learn which layout user_activities actually uses
+        self.create_activity_collection()
+    
+    @property
+    def activities_are_timeseries(self):
+        return self.activity_storage == 'timeseries'
+    
+    def create_activity_collection(self):
+        """Create user_activities in the configured storage layout if it does not exist yet"""
+        existing = {info['name']: info for info in self.db.list_collections(filter={'name': 'user_activities'})}
+        if 'user_activities' in existing:
+            is_timeseries = existing['user_activities'].get('type') == 'timeseries'
+            if is_timeseries != self.activities_are_timeseries:
+                print(f"⚠️  user_activities does not match ACTIVITY_STORAGE={self.activity_storage}; "
+                      f"run python -m scripts.migrate_activity_storage")
+                self.activity_storage = 'timeseries' if is_timeseries else 'standard'
+            return
+        if self.activities_are_timeseries:
+            # Bucketed per user: each bucket holds one user's activities for a time span
+            self.db.create_collection('user_activities', timeseries={
+                'timeField': 'timestamp',
+                'metaField': 'user_id',
+                'granularity': 'minutes'
+            })
+            print("✅ Created user_activities as a time-series collection")
+    
+    def mark_rollups_live(self, since):
+        """Record when activities first started being rolled up on write"""
+        # The backfill only replays activities inserted before this moment; the earliest claim wins
+        self.db.meta.update_one(
+            {'_id': 'daily_stats'},
+            {'$min': {'live_since': since}},
+            upsert=True
+        )
+    
+    def create_covering_indexes(self):
+        """Index every field the stats and streak pipelines read, so they never fetch documents"""
+        self.db.user_activities.create_index(
+            [("user_id", ASCENDING), ("timestamp", DESCENDING), ("pose_id", ASCENDING),
+             ("pose_name", ASCENDING), ("session_id", ASCENDING), ("duration_seconds", ASCENDING)],
+            name=COVERING_INDEX_NAME
+        )
+        # The covering index has the same prefix, and nothing queries by pose_name alone
+        existing = self.db.user_activities.index_information()
+        for name in ("user_id_1_timestamp_-1", "pose_name_1"):
+            if name in existing:
+                self.db.user_activities.drop_index(name)
+    
+    def create_session_history_index(self):
+        """Index session history in its keyset order, (created_at, _id) newest first"""
+        self.db.sessions.create_index([("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)])
+        # Same prefix as the new index
+        if "user_id_1_created_at_-1" in self.db.sessions.index_information():
+            self.db.sessions.drop_index("user_id_1_created_at_-1")
+    
+    def create_job_indexes(self):
+        """Index the job queue for claiming and deduplication, and expire finished jobs after a week"""
+        self.db.jobs.create_index([("state", ASCENDING), ("priority", DESCENDING), ("run_at", ASCENDING)])
+        self.db.jobs.create_index(
+            [("dedupe_key", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"dedupe_key": {"$exists": True}}
+        )
+        self.db.jobs.create_index(
+            [("finished_at", ASCENDING)],
+            expireAfterSeconds=7 * 24 * 3600,
+            partialFilterExpression={"state": "done"}
+        )
+    
+    def create_analytics_indexes(self):
+        """Unique keys the analytics $merge stages match on, plus lookups by day and by user"""
+        self.db.analytics_pose_daily.create_index([("date", ASCENDING), ("pose", ASCENDING)], unique=True)
+        self.db.analytics_daily_users.create_index([("user_id", ASCENDING), ("date", ASCENDING)], unique=True)
+        self.db.analytics_daily_users.create_index([("date", ASCENDING)])
     
     def create_indexes(self):
         """Create all necessary database indexes"""
@@ -45,11 +133,28 @@ class Database:
             self.db.user_activities.create_index([("user_id", ASCENDING), ("timestamp", DESCENDING)])
             self.db.user_activities.create_index([("pose_name", ASCENDING)])
             self.db.user_activities.create_index([("session_id", ASCENDING)])        
+            # Client record ids make batched uploads idempotent
+            if self.activities_are_timeseries:
+                # Time-series collections can't enforce uniqueness; inserts check this index first
+                self.db.user_activities.create_index([("user_id", ASCENDING), ("record_id", ASCENDING)])
+            else:
+                self.db.user_activities.create_index(
+                    [("user_id", ASCENDING), ("record_id", ASCENDING)],
+                    unique=True,
+                    partialFilterExpression={"record_id": {"$exists": True}}
+                )
+
+            # Per-user daily rollups, maintained on write
+            self.db.user_daily_stats.create_index([("user_id", ASCENDING), ("date", DESCENDING)], unique=True)
+
+            # Materialized leaderboard, keyed by user id
+            self.db.leaderboard.create_index([("rank", ASCENDING)])
 
             print("✅ Database indexes created!")
         
         except Exception as e:
             print(f"❌ Error creating indexes: {e}")
+            raise
 
 # Create global database instance
 db = Database()
\ No newline at end of file
@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+import zlib
+
+from bson.objectid import ObjectId
+
+from .database import db
+from .pose_catalog import get_activity_pose_name, get_pose_names
+
+EXPORT_FIELDS = ['timestamp', 'pose', 'english_name', 'sanskrit_name', 'confidence', 'duration_seconds', 'session_id']
+# Rows buffered before a chunk is handed to the response
+ROWS_PER_CHUNK = 500
+
+
+def iter_export_rows(user_id, batch_size=1000):
+    """Yield a user's activities oldest first, one export row at a time"""
+    activities = db.db.user_activities.find(
+        {'user_id': ObjectId(user_id)},
+        {'_id': 0, 'timestamp': 1, 'pose_id': 1, 'pose_name': 1, 'confidence': 1,
+         'duration_seconds': 1, 'session_id': 1}
+    ).sort('timestamp', 1).batch_size(batch_size)
+
+    for activity in activities:
+        pose_name = get_activity_pose_name(activity)
+        names = get_pose_names(pose_name)
+        yield {
+            'timestamp': activity['timestamp'].isoformat() + 'Z',
+            'pose': pose_name,
+            'english_name': names['english'],
+            'sanskrit_name': names['sanskrit'],
+            'confidence': round(activity.get('confidence', 0), 4),
+            'duration_seconds': activity.get('duration_seconds', 0),
+            'session_id': str(activity.get('session_id', ''))
+        }
+
+def stream_csv(rows):
+    """Render rows as CSV text chunks"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def stream_ndjson(rows):
+    """Render rows as newline-delimited JSON chunks"""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row))
+        if len(lines) == ROWS_PER_CHUNK:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+def gzip_chunks(chunks):
+    """Compress text chunks into a gzip stream as they are produced"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
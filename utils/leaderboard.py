@@ -0,0 +1,130 @@
+import threading
+import time
+from datetime import datetime
+
+from bson.objectid import ObjectId
+
+from config import Config
+from .database import db
+
+LEADERBOARD_SIZE = 20
+LEADERBOARD_JOB = 'refresh_leaderboard'
+# Extra ranked entries read so accounts closed since the last refresh can be dropped from the top
+CLOSED_ACCOUNT_SLACK = 20
+
+
+class Leaderboard:
+    """Global ranking by total asanas, materialized into the `leaderboard` collection.
+
+    A recurring background job ranks every user with one aggregation and
+    $merges the result into `leaderboard` (keyed by user id), so a user's
+    own rank is a primary-key lookup and requests never run the ranking.
+    The top entries are kept as an in-memory snapshot, reloaded from the
+    collection once it gets stale.
+    """
+
+    def __init__(self, refresh_interval=60):
+        self.refresh_interval = refresh_interval
+        self.snapshot = None
+        self.loaded_at = 0
+        self.lock = threading.Lock()
+        self.jobs = None
+
+    def schedule(self, jobs):
+        """Recompute the ranking as a recurring job on a JobRunner"""
+        self.jobs = jobs
+        jobs.register(LEADERBOARD_JOB, self._run_job)
+        try:
+            self._enqueue()
+        except Exception as e:
+            print(f"⚠️ Could not schedule leaderboard refreshes: {e}")
+
+    def _enqueue(self, delay=0):
+        # Every process schedules the job; keying runs by slot keeps one queued per interval
+        self.jobs.enqueue_recurring(LEADERBOARD_JOB, self.refresh_interval, delay=delay, priority=1)
+
+    def _run_job(self, job):
+        # Queue the next run first, so the recurrence survives a failed refresh
+        self._enqueue(self.refresh_interval)
+        self.refresh()
+
+    def refresh(self):
+        """Recompute the ranking into the leaderboard collection"""
+        refreshed_at = datetime.utcnow()
+        if Config.STATS_FROM_ROLLUPS:
+            # One document per user per day instead of one per logged asana
+            source, total = db.db.user_daily_stats, {'$sum': '$count'}
+        else:
+            source, total = db.db.user_activities, {'$sum': 1}
+        source.aggregate([
+            {'$group': {'_id': '$user_id', 'total_asanas': total}},
+            # Closed accounts keep their data until the purge job runs; leave them out of the ranking
+            {'$lookup': {
+                'from': 'users',
+                'localField': '_id',
+                'foreignField': '_id',
+                'as': 'user',
+                'pipeline': [{'$project': {'status.deleted_at': 1}}]
+            }},
+            {'$match': {'user': {'$ne': []}, 'user.status.deleted_at': {'$exists': False}}},
+            {'$unset': 'user'},
+            {'$setWindowFields': {
+                'sortBy': {'total_asanas': -1},
+                'output': {'rank': {'$rank': {}}}
+            }},
+            {'$set': {'refreshed_at': refreshed_at}},
+            {'$merge': {'into': 'leaderboard', 'on': '_id', 'whenMatched': 'replace', 'whenNotMatched': 'insert'}}
+        ])
+        # Users who no longer have activities were not part of this refresh
+        db.db.leaderboard.delete_many({'refreshed_at': {'$lt': refreshed_at}})
+
+    def load_top(self):
+        """Read the top-N snapshot from the materialized ranking"""
+        top = list(db.db.leaderboard.aggregate([
+            {'$sort': {'rank': 1}},
+            {'$limit': LEADERBOARD_SIZE + CLOSED_ACCOUNT_SLACK},
+            {'$lookup': {
+                'from': 'users',
+                'localField': '_id',
+                'foreignField': '_id',
+                'as': 'user',
+                'pipeline': [{'$project': {'username': 1, 'status.deleted_at': 1}}]
+            }},
+            {'$unwind': '$user'},
+            # Accounts closed since the last refresh
+            {'$match': {'user.status.deleted_at': {'$exists': False}}},
+            {'$limit': LEADERBOARD_SIZE},
+            {'$project': {'total_asanas': 1, 'rank': 1, 'username': '$user.username'}}
+        ]))
+
+        with self.lock:
+            self.snapshot = [{
+                'user_id': str(entry['_id']),
+                'username': entry['username'],
+                'total_asanas': entry['total_asanas'],
+                'rank': entry['rank']
+            } for entry in top]
+            self.loaded_at = time.time()
+            return self.snapshot
+
+    def get_top(self):
+        """Return the top entries, reloading a stale snapshot with one indexed read"""
+        with self.lock:
+            snapshot = self.snapshot
+            stale = time.time() - self.loaded_at > self.refresh_interval
+        if snapshot is None or stale:
+            return self.load_top()
+        return snapshot
+
+    def get_user_rank(self, user_id):
+        """Look up a user's materialized rank, or None if they have no activities"""
+        entry = db.db.leaderboard.find_one({'_id': ObjectId(user_id)})
+        if not entry:
+            return None
+        return {
+            'rank': entry['rank'],
+            'total_asanas': entry['total_asanas'],
+            'refreshed_at': entry['refreshed_at'].isoformat()
+        }
+
+leaderboard = Leaderboard(Config.LEADERBOARD_REFRESH_SECONDS)
@@ -0,0 +1,36 @@
+import threading
+from collections import deque
+
+
+class LatencyTracker:
+    """Keep a sliding window of latency samples and report percentiles"""
+
+    def __init__(self, window=1000):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def record(self, seconds):
+        with self.lock:
+            self.samples.append(seconds)
+            self.count += 1
+
+    def summary(self):
+        """Return sample count and p50/p90/p99/max in milliseconds"""
+        with self.lock:
+            values = sorted(self.samples)
+            count = self.count
+
+        def percentile(pct):
+            if not values:
+                return 0.0
+            index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+            return round(values[index] * 1000, 2)
+
+        return {
+            'count': count,
+            'p50_ms': percentile(50),
+            'p90_ms': percentile(90),
+            'p99_ms': percentile(99),
+            'max_ms': round(values[-1] * 1000, 2) if values else 0.0
+        }
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+# Applied schema version lives in meta under this id
+SCHEMA_META_ID = 'schema'
+
+
+def _create_indexes(database):
+    database.create_activity_collection()
+    database.create_indexes()
+
+def _mark_rollups_live(database):
+    # Superseded: marking at migration time could postdate live rollup writes, so the
+    # first rollup write records live_since (utils/daily_stats.write_rollups)
+    pass
+
+def _create_covering_indexes(database):
+    database.create_covering_indexes()
+
+def _create_session_history_index(database):
+    database.create_session_history_index()
+
+def _create_job_indexes(database):
+    database.create_job_indexes()
+
+def _create_analytics_indexes(database):
+    database.create_analytics_indexes()
+
+# Append new steps with the next version; never edit or renumber an applied one
+MIGRATIONS = [
+    (1, 'Create collections and indexes', _create_indexes),
+    (2, 'Record when daily rollups went live', _mark_rollups_live),
+    (3, 'Replace user_activities indexes with a covering stats index', _create_covering_indexes),
+    (4, 'Index sessions for keyset pagination', _create_session_history_index),
+    (5, 'Index the background job queue', _create_job_indexes),
+    (6, 'Index the analytics summary collections', _create_analytics_indexes),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(database):
+    """Return the schema version applied to the database (0 if none)"""
+    state = database.db.meta.find_one({'_id': SCHEMA_META_ID}, {'version': 1})
+    return state['version'] if state else 0
+
+def apply_migrations(database):
+    """Apply every pending migration in order and return the resulting version"""
+    version = get_schema_version(database)
+    for step, description, migrate in MIGRATIONS:
+        if step <= version:
+            continue
+        print(f"⏫ Applying migration {step}: {description}")
+        migrate(database)
+        database.db.meta.update_one(
+            {'_id': SCHEMA_META_ID},
+            {'$set': {'version': step},
+             '$push': {'history': {'version': step, 'description': description, 'applied_at': datetime.utcnow()}}},
+            upsert=True
+        )
+        version = step
+    return version
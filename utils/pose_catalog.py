@@ -0,0 +1,216 @@
+"""Catalog of the yoga poses the model can detect"""
+
+# Traditional Sanskrit pose names mapping
+traditional_names = {
+    "Akarna_Dhanurasana": "Akarna Dhanurasana",
+    "Bharadvajas_Twist_pose_or_Bharadvajasana_I_": "Bharadvajasana I",
+    "Boat_Pose_or_Paripurna_Navasana_": "Paripurna Navasana",
+    "Bound_Angle_Pose_or_Baddha_Konasana_": "Baddha Konasana",
+    "Bow_Pose_or_Dhanurasana_": "Dhanurasana",
+    "Bridge_Pose_or_Setu_Bandha_Sarvangasana_": "Setu Bandha Sarvangasana",
+    "Camel_Pose_or_Ustrasana_": "Ustrasana",
+    "Cat_Cow_Pose_or_Marjaryasana_": "Marjaryasana",
+    "Chair_Pose_or_Utkatasana_": "Utkatasana",
+    "Child_Pose_or_Balasana_": "Balasana",
+    "Cobra_Pose_or_Bhujangasana_": "Bhujangasana",
+    "Cockerel_Pose": "Kukkutasana",
+    "Corpse_Pose_or_Savasana_": "Savasana",
+    "Cow_Face_Pose_or_Gomukhasana_": "Gomukhasana",
+    "Crane_(Crow)_Pose_or_Bakasana_": "Bakasana",
+    "Dolphin_Plank_Pose_or_Makara_Adho_Mukha_Svanasana_": "Makara Adho Mukha Svanasana",
+    "Dolphin_Pose_or_Ardha_Pincha_Mayurasana_": "Ardha Pincha Mayurasana",
+    "Downward-Facing_Dog_pose_or_Adho_Mukha_Svanasana_": "Adho Mukha Svanasana",
+    "Eagle_Pose_or_Garudasana_": "Garudasana",
+    "Eight-Angle_Pose_or_Astavakrasana_": "Astavakrasana",
+    "Extended_Puppy_Pose_or_Uttana_Shishosana_": "Uttana Shishosana",
+    "Extended_Revolved_Side_Angle_Pose_or_Utthita_Parsvakonasana_": "Utthita Parsvakonasana",
+    "Extended_Revolved_Triangle_Pose_or_Utthita_Trikonasana_": "Utthita Trikonasana",
+    "Feathered_Peacock_Pose_or_Pincha_Mayurasana_": "Pincha Mayurasana",
+    "Firefly_Pose_or_Tittibhasana_": "Tittibhasana",
+    "Fish_Pose_or_Matsyasana_": "Matsyasana",
+    "Four-Limbed_Staff_Pose_or_Chaturanga_Dandasana_": "Chaturanga Dandasana",
+    "Frog_Pose_or_Bhekasana": "Bhekasana",
+    "Garland_Pose_or_Malasana_": "Malasana",
+    "Gate_Pose_or_Parighasana_": "Parighasana",
+    "Half_Lord_of_the_Fishes_Pose_or_Ardha_Matsyendrasana_": "Ardha Matsyendrasana",
+    "Half_Moon_Pose_or_Ardha_Chandrasana_": "Ardha Chandrasana",
+    "Handstand_pose_or_Adho_Mukha_Vrksasana_": "Adho Mukha Vrksasana",
+    "Happy_Baby_Pose_or_Ananda_Balasana_": "Ananda Balasana",
+    "Head-to-Knee_Forward_Bend_pose_or_Janu_Sirsasana_": "Janu Sirsasana",
+    "Heron_Pose_or_Krounchasana_": "Krounchasana",
+    "Intense_Side_Stretch_Pose_or_Parsvottanasana_": "Parsvottanasana",
+    "Legs-Up-the-Wall_Pose_or_Viparita_Karani_": "Viparita Karani",
+    "Locust_Pose_or_Salabhasana_": "Salabhasana",
+    "Lord_of_the_Dance_Pose_or_Natarajasana_": "Natarajasana",
+    "Low_Lunge_pose_or_Anjaneyasana_": "Anjaneyasana",
+    "Noose_Pose_or_Pasasana_": "Pasasana",
+    "Peacock_Pose_or_Mayurasana_": "Mayurasana",
+    "Pigeon_Pose_or_Kapotasana_": "Kapotasana",
+    "Plank_Pose_or_Kumbhakasana_": "Kumbhakasana",
+    "Plow_Pose_or_Halasana_": "Halasana",
+    "Pose_Dedicated_to_the_Sage_Koundinya_or_Eka_Pada_Koundinyanasana_I_and_II": "Eka Pada Koundinyanasana",
+    "Rajakapotasana": "Rajakapotasana",
+    "Reclining_Hand-to-Big-Toe_Pose_or_Supta_Padangusthasana_": "Supta Padangusthasana",
+    "Revolved_Head-to-Knee_Pose_or_Parivrtta_Janu_Sirsasana_": "Parivrtta Janu Sirsasana",
+    "Scale_Pose_or_Tolasana_": "Tolasana",
+    "Scorpion_pose_or_vrischikasana": "Vrischikasana",
+    "Seated_Forward_Bend_pose_or_Paschimottanasana_": "Paschimottanasana",
+    "Shoulder-Pressing_Pose_or_Bhujapidasana_": "Bhujapidasana",
+    "Side-Reclining_Leg_Lift_pose_or_Anantasana_": "Anantasana",
+    "Side_Crane_(Crow)_Pose_or_Parsva_Bakasana_": "Parsva Bakasana",
+    "Side_Plank_Pose_or_Vasisthasana_": "Vasisthasana",
+    "Sitting pose 1 (normal)": "Sukhasana",
+    "Split pose": "Hanumanasana",
+    "Staff_Pose_or_Dandasana_": "Dandasana",
+    "Standing_Forward_Bend_pose_or_Uttanasana_": "Uttanasana",
+    "Standing_Split_pose_or_Urdhva_Prasarita_Eka_Padasana_": "Urdhva Prasarita Eka Padasana",
+    "Standing_big_toe_hold_pose_or_Utthita_Padangusthasana": "Utthita Padangusthasana",
+    "Supported_Headstand_pose_or_Salamba_Sirsasana_": "Salamba Sirsasana",
+    "Supported_Shoulderstand_pose_or_Salamba_Sarvangasana_": "Salamba Sarvangasana",
+    "Supta_Baddha_Konasana_": "Supta Baddha Konasana",
+    "Supta_Virasana_Vajrasana": "Supta Virasana",
+    "Tortoise_Pose": "Kurmasana",
+    "Tree_Pose_or_Vrksasana_": "Vrksasana",
+    "Upward_Bow_(Wheel)_Pose_or_Urdhva_Dhanurasana_": "Urdhva Dhanurasana",
+    "Upward_Facing_Two-Foot_Staff_Pose_or_Dwi_Pada_Viparita_Dandasana_": "Dwi Pada Viparita Dandasana",
+    "Upward_Plank_Pose_or_Purvottanasana_": "Purvottanasana",
+    "Virasana_or_Vajrasana": "Vajrasana",
+    "Warrior_III_Pose_or_Virabhadrasana_III_": "Virabhadrasana III",
+    "Warrior_II_Pose_or_Virabhadrasana_II_": "Virabhadrasana II",
+    "Warrior_I_Pose_or_Virabhadrasana_I_": "Virabhadrasana I",
+    "Wide-Angle_Seated_Forward_Bend_pose_or_Upavistha_Konasana_": "Upavistha Konasana",
+    "Wide-Legged_Forward_Bend_pose_or_Prasarita_Padottanasana_": "Prasarita Padottanasana",
+    "Wild_Thing_pose_or_Camatkarasana_": "Camatkarasana",
+    "Wind_Relieving_pose_or_Pawanmuktasana": "Pawanmuktasana",
+    "Yogic_sleep_pose": "Yoga Nidra",
+    "viparita_virabhadrasana_or_reverse_warrior_pose": "Viparita Virabhadrasana"
+}
+
+# Stable integer ids stored in user_activities instead of the label string.
+# Append new poses with the next id; never renumber or reuse an id.
+pose_ids = {
+    "Akarna_Dhanurasana": 1,
+    "Bharadvajas_Twist_pose_or_Bharadvajasana_I_": 2,
+    "Boat_Pose_or_Paripurna_Navasana_": 3,
+    "Bound_Angle_Pose_or_Baddha_Konasana_": 4,
+    "Bow_Pose_or_Dhanurasana_": 5,
+    "Bridge_Pose_or_Setu_Bandha_Sarvangasana_": 6,
+    "Camel_Pose_or_Ustrasana_": 7,
+    "Cat_Cow_Pose_or_Marjaryasana_": 8,
+    "Chair_Pose_or_Utkatasana_": 9,
+    "Child_Pose_or_Balasana_": 10,
+    "Cobra_Pose_or_Bhujangasana_": 11,
+    "Cockerel_Pose": 12,
+    "Corpse_Pose_or_Savasana_": 13,
+    "Cow_Face_Pose_or_Gomukhasana_": 14,
+    "Crane_(Crow)_Pose_or_Bakasana_": 15,
+    "Dolphin_Plank_Pose_or_Makara_Adho_Mukha_Svanasana_": 16,
+    "Dolphin_Pose_or_Ardha_Pincha_Mayurasana_": 17,
+    "Downward-Facing_Dog_pose_or_Adho_Mukha_Svanasana_": 18,
+    "Eagle_Pose_or_Garudasana_": 19,
+    "Eight-Angle_Pose_or_Astavakrasana_": 20,
+    "Extended_Puppy_Pose_or_Uttana_Shishosana_": 21,
+    "Extended_Revolved_Side_Angle_Pose_or_Utthita_Parsvakonasana_": 22,
+    "Extended_Revolved_Triangle_Pose_or_Utthita_Trikonasana_": 23,
+    "Feathered_Peacock_Pose_or_Pincha_Mayurasana_": 24,
+    "Firefly_Pose_or_Tittibhasana_": 25,
+    "Fish_Pose_or_Matsyasana_": 26,
+    "Four-Limbed_Staff_Pose_or_Chaturanga_Dandasana_": 27,
+    "Frog_Pose_or_Bhekasana": 28,
+    "Garland_Pose_or_Malasana_": 29,
+    "Gate_Pose_or_Parighasana_": 30,
+    "Half_Lord_of_the_Fishes_Pose_or_Ardha_Matsyendrasana_": 31,
+    "Half_Moon_Pose_or_Ardha_Chandrasana_": 32,
+    "Handstand_pose_or_Adho_Mukha_Vrksasana_": 33,
+    "Happy_Baby_Pose_or_Ananda_Balasana_": 34,
+    "Head-to-Knee_Forward_Bend_pose_or_Janu_Sirsasana_": 35,
+    "Heron_Pose_or_Krounchasana_": 36,
+    "Intense_Side_Stretch_Pose_or_Parsvottanasana_": 37,
+    "Legs-Up-the-Wall_Pose_or_Viparita_Karani_": 38,
+    "Locust_Pose_or_Salabhasana_": 39,
+    "Lord_of_the_Dance_Pose_or_Natarajasana_": 40,
+    "Low_Lunge_pose_or_Anjaneyasana_": 41,
+    "Noose_Pose_or_Pasasana_": 42,
+    "Peacock_Pose_or_Mayurasana_": 43,
+    "Pigeon_Pose_or_Kapotasana_": 44,
+    "Plank_Pose_or_Kumbhakasana_": 45,
+    "Plow_Pose_or_Halasana_": 46,
+    "Pose_Dedicated_to_the_Sage_Koundinya_or_Eka_Pada_Koundinyanasana_I_and_II": 47,
+    "Rajakapotasana": 48,
+    "Reclining_Hand-to-Big-Toe_Pose_or_Supta_Padangusthasana_": 49,
+    "Revolved_Head-to-Knee_Pose_or_Parivrtta_Janu_Sirsasana_": 50,
+    "Scale_Pose_or_Tolasana_": 51,
+    "Scorpion_pose_or_vrischikasana": 52,
+    "Seated_Forward_Bend_pose_or_Paschimottanasana_": 53,
+    "Shoulder-Pressing_Pose_or_Bhujapidasana_": 54,
+    "Side-Reclining_Leg_Lift_pose_or_Anantasana_": 55,
+    "Side_Crane_(Crow)_Pose_or_Parsva_Bakasana_": 56,
+    "Side_Plank_Pose_or_Vasisthasana_": 57,
+    "Sitting pose 1 (normal)": 58,
+    "Split pose": 59,
+    "Staff_Pose_or_Dandasana_": 60,
+    "Standing_Forward_Bend_pose_or_Uttanasana_": 61,
+    "Standing_Split_pose_or_Urdhva_Prasarita_Eka_Padasana_": 62,
+    "Standing_big_toe_hold_pose_or_Utthita_Padangusthasana": 63,
+    "Supported_Headstand_pose_or_Salamba_Sirsasana_": 64,
+    "Supported_Shoulderstand_pose_or_Salamba_Sarvangasana_": 65,
+    "Supta_Baddha_Konasana_": 66,
+    "Supta_Virasana_Vajrasana": 67,
+    "Tortoise_Pose": 68,
+    "Tree_Pose_or_Vrksasana_": 69,
+    "Upward_Bow_(Wheel)_Pose_or_Urdhva_Dhanurasana_": 70,
+    "Upward_Facing_Two-Foot_Staff_Pose_or_Dwi_Pada_Viparita_Dandasana_": 71,
+    "Upward_Plank_Pose_or_Purvottanasana_": 72,
+    "Virasana_or_Vajrasana": 73,
+    "Warrior_III_Pose_or_Virabhadrasana_III_": 74,
+    "Warrior_II_Pose_or_Virabhadrasana_II_": 75,
+    "Warrior_I_Pose_or_Virabhadrasana_I_": 76,
+    "Wide-Angle_Seated_Forward_Bend_pose_or_Upavistha_Konasana_": 77,
+    "Wide-Legged_Forward_Bend_pose_or_Prasarita_Padottanasana_": 78,
+    "Wild_Thing_pose_or_Camatkarasana_": 79,
+    "Wind_Relieving_pose_or_Pawanmuktasana": 80,
+    "Yogic_sleep_pose": 81,
+    "viparita_virabhadrasana_or_reverse_warrior_pose": 82
+}
+pose_labels = {pose_id: pose_name for pose_name, pose_id in pose_ids.items()}
+
+
+def get_traditional_name(pose_name):
+    """Get traditional Sanskrit name for a pose"""
+    return traditional_names.get(pose_name, pose_name)
+
+def get_pose_names(pose_name):
+    """Get both English and Sanskrit names for a pose"""
+    # Get Sanskrit name from mapping
+    sanskrit_name = traditional_names.get(pose_name, pose_name)
+    
+    # Extract English name from the original pose_name
+    # Format: "English_Name_or_Sanskrit_Name_" or just "Sanskrit_Name"
+    english_name = pose_name.replace('_', ' ').strip()
+    
+    # If the pose name contains "or", split and get the English part
+    if '_or_' in pose_name:
+        parts = pose_name.split('_or_')
+        english_name = parts[0].replace('_', ' ').strip()
+    else:
+        # If no "or", use the cleaned up version
+        english_name = english_name.rstrip('_').strip()
+    
+    return {
+        'sanskrit': sanskrit_name,
+        'english': english_name
+    }
+
+def get_catalog_utterances():
+    """Get every distinct pose name the TTS system may be asked to speak"""
+    return sorted(set(traditional_names.values()))
+
+def get_pose_id(pose_name):
+    """Get the catalog id for a pose label, or None if it is not in the catalog"""
+    return pose_ids.get(pose_name)
+
+def get_activity_pose_name(activity):
+    """Get the pose label of an activity stored in either the compact or the legacy schema"""
+    if 'pose_id' in activity:
+        return pose_labels.get(activity['pose_id'], str(activity['pose_id']))
+    return activity['pose_name']
@@ -4,10 +4,26 @@ from bson.objectid import ObjectId
 from datetime import datetime, timezone
 from pymongo import DESCENDING
 from .database import db
+from .user_cache import user_cache
+from .pose_catalog import get_traditional_name, get_pose_id, pose_labels
+from .daily_stats import write_rollups, record_activity_rollup, get_activity_stats_from_rollups, get_streak_from_rollups
+from pymongo.errors import BulkWriteError
+from config import Config
 from datetime import datetime, timedelta, timezone
 from bson.objectid import ObjectId
+import base64
+import hashlib
 import pytz
 
+# Activities are logged and bucketed by day in Indian Standard Time
+ACTIVITY_TIMEZONE_NAME = 'Asia/Kolkata'
+ACTIVITY_TIMEZONE = pytz.timezone(ACTIVITY_TIMEZONE_NAME)
+
+DUPLICATE_KEY_ERROR = 11000
+
+# Active days fetched per cursor batch; a year-long streak still needs one round trip
+STREAK_BATCH_SIZE = 400
+
 class User(UserMixin):
     def __init__(self, user_data):
         self.id = str(user_data['_id'])
@@ -17,9 +33,10 @@ class User(UserMixin):
         self.user_data = user_data
     
     @staticmethod
-    def create_user(username, email, password):
+    def create_user(username, email, password, password_hash=None):
         """Create a new user in database"""
-        password_hash = generate_password_hash(password)
+        if password_hash is None:
+            password_hash = generate_password_hash(password)
         user_data = {
             "username": username,
             "email": email,
@@ -57,7 +74,27 @@ class User(UserMixin):
 
     @staticmethod
     def _wrap(user_doc):
-        return User(user_doc) if user_doc else None
+        # Closed accounts stay in the collection until their data is purged
+        if not user_doc or user_doc.get('status', {}).get('deleted_at'):
+            return None
+        return User(user_doc)
+
+    @staticmethod
+    def mark_deleted(user_id):
+        """Close an account at once, freeing its username and email; the data is purged later"""
+        placeholder = f"deleted-{user_id}"
+        result = db.db.users.update_one(
+            {"_id": ObjectId(user_id), "status.deleted_at": {"$exists": False}},
+            {"$set": {
+                "username": placeholder,
+                "email": placeholder,
+                "status.is_active": False,
+                "status.deleted_at": datetime.utcnow(),
+                "timestamps.updated_at": datetime.utcnow()
+            }}
+        )
+        user_cache.invalidate(user_id)
+        return result.modified_count > 0
 
     @staticmethod
     def find_by_username(username):
@@ -76,15 +113,24 @@ class User(UserMixin):
         return User._wrap(user_doc)
 
     @staticmethod
-    def find_by_id(user_id):
-        """Find a user by id"""
+    def find_by_id(user_id, fresh=False):
+        """Find a user by id, served from the per-process user cache unless `fresh` is set.
+
+        Credential checks pass fresh=True: another process may have changed
+        the password within the cache's TTL.
+        """
         if db.db is None:
             return None
+        user_doc = None if fresh else user_cache.get(user_id)
+        if user_doc is not None:
+            return User._wrap(user_doc)
         try:
             obj_id = ObjectId(user_id)
         except Exception:
             return None
         user_doc = db.db.users.find_one({"_id": obj_id})
+        if user_doc:
+            user_cache.put(user_id, user_doc)
         return User._wrap(user_doc)
 
     def check_password(self, password):
@@ -103,119 +149,269 @@ class User(UserMixin):
                 "$inc": {"status.login_count": 1}
             }
         )
+        user_cache.invalidate(self.id)
 
-def get_user_sessions(user_id):
-    """Get all sessions for a user"""
-    sessions = db.db.sessions.find({'user_id': ObjectId(user_id)}).sort('created_at', DESCENDING)
-    return [{
+# Only the fields the progress API returns
+SESSION_FIELDS = {'session_type': 1, 'progress': 1, 'activity': 1, 'created_at': 1}
+SESSION_PAGE_SIZE = 50
+MAX_SESSION_PAGE_SIZE = 200
+
+def encode_session_cursor(session):
+    """Make an opaque cursor pointing just past this session"""
+    position = f"{session['created_at'].isoformat()}|{session['_id']}"
+    return base64.urlsafe_b64encode(position.encode('utf-8')).decode('ascii')
+
+def decode_session_cursor(token):
+    """Turn a cursor back into its (created_at, _id) position; raises ValueError if malformed"""
+    try:
+        created_at, session_id = base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8').split('|')
+        return datetime.fromisoformat(created_at), ObjectId(session_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def find_user_sessions(user_id, after=None):
+    """Open a cursor over a user's sessions, newest first, starting after a (created_at, _id) position"""
+    query = {'user_id': ObjectId(user_id)}
+    if after:
+        created_at, session_id = after
+        # Keyset pagination: _id breaks ties between sessions created at the same instant
+        query['$or'] = [
+            {'created_at': {'$lt': created_at}},
+            {'created_at': created_at, '_id': {'$lt': session_id}}
+        ]
+    return db.db.sessions.find(query, SESSION_FIELDS).sort([('created_at', DESCENDING), ('_id', DESCENDING)])
+
+def format_session(session):
+    return {
         'session_id': str(session['_id']),
         'session_type': session.get('session_type', 'unknown'),
         'progress': session.get('progress', {}),
         'activity': session.get('activity', {}),
         'created_at': session['created_at'].isoformat()
-    } for session in sessions]
+    }
+
+def get_user_sessions_page(user_id, limit=SESSION_PAGE_SIZE, after=None):
+    """Get one page of a user's sessions and the cursor for the next page (None on the last)"""
+    sessions = list(find_user_sessions(user_id, after).limit(limit + 1))
+    next_cursor = encode_session_cursor(sessions[limit - 1]) if len(sessions) > limit else None
+    return [format_session(session) for session in sessions[:limit]], next_cursor
+
+def iter_user_sessions(user_id, after=None, batch_size=200):
+    """Yield a user's sessions one at a time straight from the database cursor"""
+    for session in find_user_sessions(user_id, after).batch_size(batch_size):
+        yield format_session(session)
+
+def get_user_sessions(user_id):
+    """Get all sessions for a user"""
+    return list(iter_user_sessions(user_id))
+
+def to_session_key(session_id):
+    """Store a session id as an ObjectId; client-generated ids map to a stable 12-byte hash"""
+    if session_id is None:
+        return ObjectId()
+    if isinstance(session_id, ObjectId):
+        return session_id
+    if len(session_id) == 24 and ObjectId.is_valid(session_id):
+        return ObjectId(session_id)
+    return ObjectId(hashlib.sha256(session_id.encode('utf-8')).digest()[:12])
+
+def resolve_pose_key(pose_key):
+    """Map a grouped pose key (catalog id or legacy label) to the pose label"""
+    if isinstance(pose_key, int):
+        return pose_labels.get(pose_key, str(pose_key))
+    return pose_key
+
+def build_activity(user_id, pose_name, confidence, session_id=None, duration_seconds=0, record_id=None, timestamp=None):
+    """Build the compact user_activities document for one performed asana"""
+    activity = {
+        'user_id': ObjectId(user_id),
+        'confidence': float(confidence),
+        'session_id': to_session_key(session_id),
+        'duration_seconds': duration_seconds,
+        'timestamp': timestamp or datetime.now(timezone.utc)
+    }
+    # Catalog poses are stored by id; names are resolved from the catalog on read
+    pose_id = get_pose_id(pose_name)
+    if pose_id is None:
+        activity['pose_name'] = pose_name
+    else:
+        activity['pose_id'] = pose_id
+    if record_id:
+        # Client-generated id; a unique index makes retried uploads no-ops
+        activity['record_id'] = record_id
+    return activity
+
+def insert_activities(activities):
+    """Insert a batch of activities in one bulk write, skipping records already stored.
+    
+    Returns (inserted, duplicates); only newly inserted records reach the daily rollups.
+    """
+    pending = activities
+    if db.activities_are_timeseries:
+        # No unique index on time-series collections: skip record ids already stored
+        record_ids = [activity['record_id'] for activity in activities if activity.get('record_id')]
+        seen = {activity['record_id'] for activity in db.db.user_activities.find(
+            {'user_id': activities[0]['user_id'], 'record_id': {'$in': record_ids}},
+            {'record_id': 1}
+        )} if record_ids else set()
+        pending = []
+        for activity in activities:
+            record_id = activity.get('record_id')
+            if record_id is None or record_id not in seen:
+                if record_id is not None:
+                    seen.add(record_id)
+                pending.append(activity)
+    
+    failed = set()
+    duplicates = len(activities) - len(pending)
+    try:
+        if pending:
+            db.db.user_activities.insert_many(pending, ordered=False)
+    except BulkWriteError as e:
+        for error in e.details['writeErrors']:
+            failed.add(error['index'])
+            if error['code'] == DUPLICATE_KEY_ERROR:
+                duplicates += 1
+            else:
+                print(f"Error inserting activity: {error.get('errmsg')}")
+    
+    inserted = [activity for index, activity in enumerate(pending) if index not in failed]
+    if inserted:
+        try:
+            write_rollups(inserted)
+        except Exception as e:
+            print(f"Error updating daily rollups: {e}")
+    return len(inserted), duplicates
 
 def log_user_activity(user_id, pose_name, confidence, session_id=None, duration_seconds=0):
     """Log when a user performs a yoga asana"""
     try:
-        # Use Indian Standard Time (IST, UTC+5:30)
-        from datetime import timezone, timedelta
-        ist = timezone(timedelta(hours=5, minutes=30))
-        ist_time = datetime.now(ist)
-        
-        activity_data = {
-            'user_id': ObjectId(user_id),
-            'pose_name': pose_name,
-            'traditional_name': get_traditional_name(pose_name),
-            'confidence': float(confidence),
-            'session_id': session_id or str(ObjectId()),
-            'duration_seconds': duration_seconds,
-            'timestamp': ist_time
-        }
+        activity_data = build_activity(user_id, pose_name, confidence, session_id, duration_seconds)
         
         result = db.db.user_activities.insert_one(activity_data)
+        try:
+            record_activity_rollup(activity_data)
+        except Exception as e:
+            print(f"Error updating daily rollup: {e}")
         return str(result.inserted_id)
     except Exception as e:
         print(f"Error logging user activity: {e}")
         return None
 
+# Fields the stats and streak pipelines read; the covering index holds all of them
+ACTIVITY_STATS_FIELDS = {'_id': 0, 'timestamp': 1, 'pose_id': 1, 'pose_name': 1, 'session_id': 1, 'duration_seconds': 1}
+
+def build_activity_stats_pipeline(user_id, start_date, week_start):
+    """Build the dashboard statistics aggregation for one user"""
+    in_period = {'$match': {'timestamp': {'$gte': start_date}}}
+    # Compact documents carry pose_id, older ones still carry the pose_name label
+    pose_key = {'$ifNull': ['$pose_id', '$pose_name']}
+    
+    return [
+        {'$match': {
+            'user_id': ObjectId(user_id),
+            'timestamp': {'$gte': min(start_date, week_start)}
+        }},
+        # Projecting only indexed fields lets the scan skip fetching documents
+        {'$project': ACTIVITY_STATS_FIELDS},
+        {'$facet': {
+            'totals': [
+                in_period,
+                {'$group': {
+                    '_id': None,
+                    'total_asanas': {'$sum': 1},
+                    'poses': {'$addToSet': pose_key}
+                }}
+            ],
+            'daily_activity': [
+                {'$match': {'timestamp': {'$gte': week_start}}},
+                {'$group': {
+                    '_id': {'$dateTrunc': {
+                        'date': '$timestamp',
+                        'unit': 'day',
+                        'timezone': ACTIVITY_TIMEZONE_NAME
+                    }},
+                    'count': {'$sum': 1}
+                }}
+            ],
+            # Per-pose counts; merged and ranked below once keys are resolved
+            'top_asanas': [
+                in_period,
+                {'$group': {
+                    '_id': pose_key,
+                    'count': {'$sum': 1},
+                    'last_practiced': {'$max': '$timestamp'}
+                }}
+            ],
+            # Session statistics
+            'recent_sessions': [
+                in_period,
+                {'$group': {
+                    '_id': '$session_id',
+                    'asanas_count': {'$sum': 1},
+                    'total_duration': {'$sum': '$duration_seconds'},
+                    'session_date': {'$min': '$timestamp'}
+                }},
+                {'$sort': {'session_date': -1}},
+                {'$limit': 10}
+            ]
+        }}
+    ]
+
 def get_user_activity_stats(user_id, days=30):
-    """Get user activity statistics for the last N days"""
+    """Get user activity statistics for the last N days in a single aggregation"""
     try:
-        start_date = datetime.utcnow() - timedelta(days=days)
+        if Config.STATS_FROM_ROLLUPS:
+            return get_activity_stats_from_rollups(user_id, days)
         
-        # Total asanas performed
-        total_asanas = db.db.user_activities.count_documents({
-            'user_id': ObjectId(user_id),
-            'timestamp': {'$gte': start_date}
-        })
+        now = datetime.now(ACTIVITY_TIMEZONE)
+        start_date = now - timedelta(days=days)
         
-        # Unique asanas performed
-        unique_asanas = db.db.user_activities.distinct('pose_name', {
-            'user_id': ObjectId(user_id),
-            'timestamp': {'$gte': start_date}
-        })
+        # Daily activity covers the last 7 local (IST) days, including today
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        week_start = ACTIVITY_TIMEZONE.localize(today.replace(tzinfo=None) - timedelta(days=6))
+        pipeline = build_activity_stats_pipeline(user_id, start_date, week_start)
         
-        # Daily activity (last 7 days)
-        daily_activity = []
-        for i in range(7):
-            day = datetime.utcnow() - timedelta(days=i)
-            day_start = day.replace(hour=0, minute=0, second=0, microsecond=0)
-            day_end = day.replace(hour=23, minute=59, second=59, microsecond=999999)
-            
-            day_count = db.db.user_activities.count_documents({
-                'user_id': ObjectId(user_id),
-                'timestamp': {'$gte': day_start, '$lte': day_end}
+        result = next(db.db.user_activities.aggregate(pipeline))
+        totals = result['totals'][0] if result['totals'] else {}
+        
+        # The same pose may appear under both its id and its label until migration finishes
+        poses = {}
+        for entry in result['top_asanas']:
+            pose_name = resolve_pose_key(entry['_id'])
+            merged = poses.setdefault(pose_name, {
+                '_id': pose_name,
+                'count': 0,
+                'traditional_name': get_traditional_name(pose_name),
+                'last_practiced': entry['last_practiced']
             })
-            
+            merged['count'] += entry['count']
+            merged['last_practiced'] = max(merged['last_practiced'], entry['last_practiced'])
+        top_asanas = sorted(poses.values(), key=lambda entry: entry['count'], reverse=True)[:5]
+        
+        for session in result['recent_sessions']:
+            session['_id'] = str(session['_id'])
+        
+        # $dateTrunc returns the UTC instant of local midnight
+        counts_by_day = {
+            pytz.utc.localize(bucket['_id']).astimezone(ACTIVITY_TIMEZONE).date(): bucket['count']
+            for bucket in result['daily_activity']
+        }
+        daily_activity = []
+        for i in range(6, -1, -1):
+            day = (today - timedelta(days=i)).date()
             daily_activity.append({
                 'date': day.strftime('%Y-%m-%d'),
                 'day_name': day.strftime('%a'),
-                'count': day_count
+                'count': counts_by_day.get(day, 0)
             })
         
-        # Most practiced asanas
-        pipeline = [
-            {'$match': {
-                'user_id': ObjectId(user_id),
-                'timestamp': {'$gte': start_date}
-            }},
-            {'$group': {
-                '_id': '$pose_name',
-                'count': {'$sum': 1},
-                'traditional_name': {'$first': '$traditional_name'},
-                'last_practiced': {'$max': '$timestamp'}
-            }},
-            {'$sort': {'count': -1}},
-            {'$limit': 5}
-        ]
-        
-        top_asanas = list(db.db.user_activities.aggregate(pipeline))
-        
-        # Session statistics
-        session_stats = db.db.user_activities.aggregate([
-            {'$match': {
-                'user_id': ObjectId(user_id),
-                'timestamp': {'$gte': start_date}
-            }},
-            {'$group': {
-                '_id': '$session_id',
-                'asanas_count': {'$sum': 1},
-                'total_duration': {'$sum': '$duration_seconds'},
-                'session_date': {'$first': '$timestamp'}
-            }},
-            {'$sort': {'session_date': -1}},
-            {'$limit': 10}
-        ])
-        
-        sessions = list(session_stats)
-        
         return {
-            'total_asanas': total_asanas,
-            'unique_asanas': len(unique_asanas),
-            'daily_activity': list(reversed(daily_activity)),
+            'total_asanas': totals.get('total_asanas', 0),
+            'unique_asanas': len({resolve_pose_key(key) for key in totals.get('poses', [])}),
+            'daily_activity': daily_activity,
             'top_asanas': top_asanas,
-            'recent_sessions': sessions,
+            'recent_sessions': result['recent_sessions'],
             'period_days': days
         }
         
@@ -230,118 +426,37 @@ def get_user_activity_stats(user_id, days=30):
             'period_days': days
         }
 
+def build_streak_pipeline(user_id):
+    """Build the aggregation listing a user's distinct active days"""
+    return [
+        {'$match': {'user_id': ObjectId(user_id)}},
+        {'$project': {'_id': 0, 'timestamp': 1}},
+        {'$group': {'_id': {'$dateToString': {
+            'format': '%Y-%m-%d',
+            'date': '$timestamp',
+            'timezone': ACTIVITY_TIMEZONE_NAME
+        }}}},
+        {'$sort': {'_id': -1}}
+    ]
+
 def get_user_streak(user_id):
     """Calculate user's current streak of consecutive days with activity"""
     try:
-        # Check last 30 days for streak calculation
-        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        streak = 0
+        if Config.STATS_FROM_ROLLUPS:
+            return get_streak_from_rollups(user_id)
         
-        for i in range(30):
-            check_date = today - timedelta(days=i)
-            day_start = check_date
-            day_end = check_date.replace(hour=23, minute=59, second=59, microsecond=999999)
-            
-            has_activity = db.db.user_activities.count_documents({
-                'user_id': ObjectId(user_id),
-                'timestamp': {'$gte': day_start, '$lte': day_end}
-            }) > 0
-            
-            if has_activity:
-                streak += 1
-            else:
+        # One aggregation yields the user's distinct active days (IST), newest first
+        active_days = db.db.user_activities.aggregate(build_streak_pipeline(user_id), batchSize=STREAK_BATCH_SIZE)
+        
+        expected_day = datetime.now(ACTIVITY_TIMEZONE).date()
+        streak = 0
+        for day in active_days:
+            if day['_id'] != expected_day.strftime('%Y-%m-%d'):
                 break
+            streak += 1
+            expected_day -= timedelta(days=1)
         
         return streak
     except Exception as e:
         print(f"Error calculating streak: {e}")
         return 0
-
-def get_traditional_name(pose_name):
-    """Get traditional Sanskrit name for a pose"""
-    traditional_names = {
-        "Akarna_Dhanurasana": "Akarna Dhanurasana",
-        "Bharadvajas_Twist_pose_or_Bharadvajasana_I_": "Bharadvajasana I",
-        "Boat_Pose_or_Paripurna_Navasana_": "Paripurna Navasana",
-        "Bound_Angle_Pose_or_Baddha_Konasana_": "Baddha Konasana",
-        "Bow_Pose_or_Dhanurasana_": "Dhanurasana",
-        "Bridge_Pose_or_Setu_Bandha_Sarvangasana_": "Setu Bandha Sarvangasana",
-        "Camel_Pose_or_Ustrasana_": "Ustrasana",
-        "Cat_Cow_Pose_or_Marjaryasana_": "Marjaryasana",
-        "Chair_Pose_or_Utkatasana_": "Utkatasana",
-        "Child_Pose_or_Balasana_": "Balasana",
-        "Cobra_Pose_or_Bhujangasana_": "Bhujangasana",
-        "Cockerel_Pose": "Kukkutasana",
-        "Corpse_Pose_or_Savasana_": "Savasana",
-        "Cow_Face_Pose_or_Gomukhasana_": "Gomukhasana",
-        "Crane_(Crow)_Pose_or_Bakasana_": "Bakasana",
-        "Dolphin_Plank_Pose_or_Makara_Adho_Mukha_Svanasana_": "Makara Adho Mukha Svanasana",
-        "Dolphin_Pose_or_Ardha_Pincha_Mayurasana_": "Ardha Pincha Mayurasana",
-        "Downward-Facing_Dog_pose_or_Adho_Mukha_Svanasana_": "Adho Mukha Svanasana",
-        "Eagle_Pose_or_Garudasana_": "Garudasana",
-        "Eight-Angle_Pose_or_Astavakrasana_": "Astavakrasana",
-        "Extended_Puppy_Pose_or_Uttana_Shishosana_": "Uttana Shishosana",
-        "Extended_Revolved_Side_Angle_Pose_or_Utthita_Parsvakonasana_": "Utthita Parsvakonasana",
-        "Extended_Revolved_Triangle_Pose_or_Utthita_Trikonasana_": "Utthita Trikonasana",
-        "Feathered_Peacock_Pose_or_Pincha_Mayurasana_": "Pincha Mayurasana",
-        "Firefly_Pose_or_Tittibhasana_": "Tittibhasana",
-        "Fish_Pose_or_Matsyasana_": "Matsyasana",
-        "Four-Limbed_Staff_Pose_or_Chaturanga_Dandasana_": "Chaturanga Dandasana",
-        "Frog_Pose_or_Bhekasana": "Bhekasana",
-        "Garland_Pose_or_Malasana_": "Malasana",
-        "Gate_Pose_or_Parighasana_": "Parighasana",
-        "Half_Lord_of_the_Fishes_Pose_or_Ardha_Matsyendrasana_": "Ardha Matsyendrasana",
-        "Half_Moon_Pose_or_Ardha_Chandrasana_": "Ardha Chandrasana",
-        "Handstand_pose_or_Adho_Mukha_Vrksasana_": "Adho Mukha Vrksasana",
-        "Happy_Baby_Pose_or_Ananda_Balasana_": "Ananda Balasana",
-        "Head-to-Knee_Forward_Bend_pose_or_Janu_Sirsasana_": "Janu Sirsasana",
-        "Heron_Pose_or_Krounchasana_": "Krounchasana",
-        "Intense_Side_Stretch_Pose_or_Parsvottanasana_": "Parsvottanasana",
-        "Legs-Up-the-Wall_Pose_or_Viparita_Karani_": "Viparita Karani",
-        "Locust_Pose_or_Salabhasana_": "Salabhasana",
-        "Lord_of_the_Dance_Pose_or_Natarajasana_": "Natarajasana",
-        "Low_Lunge_pose_or_Anjaneyasana_": "Anjaneyasana",
-        "Noose_Pose_or_Pasasana_": "Pasasana",
-        "Peacock_Pose_or_Mayurasana_": "Mayurasana",
-        "Pigeon_Pose_or_Kapotasana_": "Kapotasana",
-        "Plank_Pose_or_Kumbhakasana_": "Kumbhakasana",
-        "Plow_Pose_or_Halasana_": "Halasana",
-        "Pose_Dedicated_to_the_Sage_Koundinya_or_Eka_Pada_Koundinyanasana_I_and_II": "Eka Pada Koundinyanasana",
-        "Rajakapotasana": "Rajakapotasana",
-        "Reclining_Hand-to-Big-Toe_Pose_or_Supta_Padangusthasana_": "Supta Padangusthasana",
-        "Revolved_Head-to-Knee_Pose_or_Parivrtta_Janu_Sirsasana_": "Parivrtta Janu Sirsasana",
-        "Scale_Pose_or_Tolasana_": "Tolasana",
-        "Scorpion_pose_or_vrischikasana": "Vrischikasana",
-        "Seated_Forward_Bend_pose_or_Paschimottanasana_": "Paschimottanasana",
-        "Shoulder-Pressing_Pose_or_Bhujapidasana_": "Bhujapidasana",
-        "Side-Reclining_Leg_Lift_pose_or_Anantasana_": "Anantasana",
-        "Side_Crane_(Crow)_Pose_or_Parsva_Bakasana_": "Parsva Bakasana",
-        "Side_Plank_Pose_or_Vasisthasana_": "Vasisthasana",
-        "Sitting pose 1 (normal)": "Sukhasana",
-        "Split pose": "Hanumanasana",
-        "Staff_Pose_or_Dandasana_": "Dandasana",
-        "Standing_Forward_Bend_pose_or_Uttanasana_": "Uttanasana",
-        "Standing_Split_pose_or_Urdhva_Prasarita_Eka_Padasana_": "Urdhva Prasarita Eka Padasana",
-        "Standing_big_toe_hold_pose_or_Utthita_Padangusthasana": "Utthita Padangusthasana",
-        "Supported_Headstand_pose_or_Salamba_Sirsasana_": "Salamba Sirsasana",
-        "Supported_Shoulderstand_pose_or_Salamba_Sarvangasana_": "Salamba Sarvangasana",
-        "Supta_Baddha_Konasana_": "Supta Baddha Konasana",
-        "Supta_Virasana_Vajrasana": "Supta Virasana",
-        "Tortoise_Pose": "Kurmasana",
-        "Tree_Pose_or_Vrksasana_": "Vrksasana",
-        "Upward_Bow_(Wheel)_Pose_or_Urdhva_Dhanurasana_": "Urdhva Dhanurasana",
-        "Upward_Facing_Two-Foot_Staff_Pose_or_Dwi_Pada_Viparita_Dandasana_": "Dwi Pada Viparita Dandasana",
-        "Upward_Plank_Pose_or_Purvottanasana_": "Purvottanasana",
-        "Virasana_or_Vajrasana": "Vajrasana",
-        "Warrior_III_Pose_or_Virabhadrasana_III_": "Virabhadrasana III",
-        "Warrior_II_Pose_or_Virabhadrasana_II_": "Virabhadrasana II",
-        "Warrior_I_Pose_or_Virabhadrasana_I_": "Virabhadrasana I",
-        "Wide-Angle_Seated_Forward_Bend_pose_or_Upavistha_Konasana_": "Upavistha Konasana",
-        "Wide-Legged_Forward_Bend_pose_or_Prasarita_Padottanasana_": "Prasarita Padottanasana",
-        "Wild_Thing_pose_or_Camatkarasana_": "Camatkarasana",
-        "Wind_Relieving_pose_or_Pawanmuktasana": "Pawanmuktasana",
-        "Yogic_sleep_pose": "Yoga Nidra",
-        "viparita_virabhadrasana_or_reverse_warrior_pose": "Viparita Virabhadrasana"
-    }
-    
-    return traditional_names.get(pose_name, pose_name)
\ No newline at end of file
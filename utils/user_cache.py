@@ -0,0 +1,47 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from config import Config
+
+
+class UserCache:
+    """Per-process TTL/LRU cache of user documents for the Flask-Login loader.
+
+    Write paths in this process call `invalidate`; other worker processes
+    see a change once their entry expires after `ttl` seconds, so password
+    checks read the user from MongoDB instead. Callers get copies and can't
+    change a cached entry.
+    """
+
+    def __init__(self, ttl=60, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # user_id -> (expires_at, user_doc)
+        self.lock = threading.Lock()
+
+    def get(self, user_id):
+        """Return a cached user document, or None if missing or expired"""
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self.entries[user_id]
+                return None
+            self.entries.move_to_end(user_id)
+            return copy.deepcopy(entry[1])
+
+    def put(self, user_id, user_doc):
+        with self.lock:
+            self.entries[user_id] = (time.monotonic() + self.ttl, copy.deepcopy(user_doc))
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.entries.pop(str(user_id), None)
+
+user_cache = UserCache(Config.USER_CACHE_TTL, Config.USER_CACHE_SIZE)